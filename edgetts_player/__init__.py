@@ -0,0 +1,39 @@
+"""EdgeTTSPlayer 的无界面核心逻辑（解析、断句、缓存、合成、导出），供 GUI、命令行与脚本共用。
+
+本包不依赖 tkinter / pygame。公共接口按需延迟导入，因此 `import edgetts_player` 本身几乎没有开销。
+"""
+
+_LAZY_EXPORTS = {
+    'read_book_file': '.books',
+    'read_book_sections': '.books',
+    'iter_book_sections': '.books',
+    'open_book_sections': '.books',
+    'SUPPORTED_EXTENSIONS': '.books',
+    'register_parser': '.parsers',
+    'supported_extensions': '.parsers',
+    'SectionReader': '.parsers',
+    'split_text_to_chunks': '.chunking',
+    'split_text_with_positions': '.chunking',
+    'iter_chunk_spans': '.chunking',
+    'find_chunk_positions': '.chunking',
+    'AudioCache': '.audio_cache',
+    'VoiceCatalog': '.voices',
+    'load_voice_catalog': '.voices',
+    'BatchConverter': '.batch',
+    'load_book': '.api',
+    'convert_file': '.api',
+    'batch_convert': '.api',
+    'open_audio_cache': '.api',
+}
+
+__all__ = sorted(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,63 @@
+import asyncio
+
+from .audio_cache import AudioCache, DEFAULT_AUDIO_CACHE_MB
+from .batch import BatchConverter
+from .book_cache import load_cached_book, save_cached_book
+from .books import read_book_file, read_book_sections
+from .chunking import split_text_to_chunks, split_text_with_positions
+from .config import AUDIO_CACHE_DIR, DEFAULT_CHUNK_SIZE, DEFAULT_VOICE
+from .export import export_chunks, DEFAULT_EXPORT_CONCURRENCY
+
+
+def open_audio_cache(max_mb=DEFAULT_AUDIO_CACHE_MB, cache_dir=AUDIO_CACHE_DIR):
+    return AudioCache(cache_dir, max_mb * 1024 * 1024)
+
+
+def load_book(file_path, chunk_size=DEFAULT_CHUNK_SIZE, use_cache=True, progress=None):
+    """解析文件并断句，优先读取 .book_cache；use_cache 为 False 时不读写任何缓存。
+
+    progress(done, total) 报告解析进度（分节数 / PDF 页数），命中缓存时不回调。
+    返回 (content, chapters, chunks, chunk_positions, from_cache)
+    """
+    if use_cache:
+        cached = load_cached_book(file_path, chunk_size)
+        if cached:
+            return (*cached[:4], True)
+    content, chapters, section_starts = read_book_sections(file_path, progress, use_cache)
+    chunks, chunk_positions = split_text_with_positions(content, chunk_size)
+    if use_cache:
+        try:
+            save_cached_book(file_path, chunk_size, content, chapters, chunks, chunk_positions,
+                             section_starts)
+        except OSError:
+            pass
+    return content, chapters, chunks, chunk_positions, False
+
+
+def convert_file(input_path, output_path, voice=DEFAULT_VOICE, rate='+0%', volume='+0%',
+                 chunk_size=DEFAULT_CHUNK_SIZE, concurrency=DEFAULT_EXPORT_CONCURRENCY,
+                 cache=None, progress=None):
+    """将单个文件转换为 MP3（同步调用），返回片段数。
+
+    progress(done, total, audio_bytes) 在每个片段写入后回调。
+    """
+    _, _, chunks, _, _ = load_book(input_path, chunk_size)
+    if not chunks:
+        raise ValueError("文本内容为空")
+    cache = cache or open_audio_cache()
+    asyncio.run(export_chunks(cache, chunks, output_path, voice, rate, volume, progress,
+                              concurrency=concurrency))
+    return len(chunks)
+
+
+def batch_convert(jobs, voice=DEFAULT_VOICE, rate='+0%', volume='+0%',
+                  chunk_size=DEFAULT_CHUNK_SIZE, concurrency=DEFAULT_EXPORT_CONCURRENCY,
+                  parse_workers=None, cache=None, on_progress=None):
+    """批量转换（同步调用），jobs 为 [(输入路径, 输出路径), ...]，返回 BatchConverter 以便读取统计"""
+    converter = BatchConverter(
+        cache or open_audio_cache(), read_book_file, split_text_to_chunks,
+        voice, rate, volume, max_length=chunk_size, concurrency=concurrency,
+        parse_workers=parse_workers, on_progress=on_progress
+    )
+    asyncio.run(converter.run(jobs))
+    return converter
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+# 默认音频缓存上限 (MB)
+DEFAULT_AUDIO_CACHE_MB = 1024
+
+AUDIO_SUFFIX = '.mp3'
+# 写入中的临时文件（不以 AUDIO_SUFFIX 结尾，不会被当作缓存条目统计或淘汰）
+TMP_PREFIX = '.tmp_'
+TMP_SUFFIX = '.tmp'
+
+
+def make_audio_key(text, voice, rate, volume):
+    """根据 (文本, 语音, 语速, 音量) 计算内容寻址的缓存键。"""
+    raw = '\x1f'.join((voice, rate, volume, text))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """磁盘上的合成音频缓存，按内容哈希寻址，超出容量时按最近访问 (LRU) 淘汰。
+
+    - 文件按键的前两位分目录存放: <cache_dir>/ab/abcdef....mp3
+    - 写入先落到同目录临时文件再 os.replace，保证不会留下半截 MP3
+    - 命中时刷新 mtime 作为最近访问时间，淘汰时按 mtime 从旧到新删除
+    - 线程安全，可同时供播放线程和导出线程使用
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_AUDIO_CACHE_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None  # 首次需要时再扫描目录
+
+    # ---------- 路径 / 统计 ----------
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + AUDIO_SUFFIX)
+
+    def _iter_entries(self):
+        """遍历缓存文件，返回 [(mtime, size, path), ...]"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(AUDIO_SUFFIX) or entry.name.startswith(TMP_PREFIX):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _ensure_total(self):
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._iter_entries())
+
+    def stats(self):
+        """返回命中/未命中计数及当前占用"""
+        with self._lock:
+            entries = self._iter_entries()
+            self._total_bytes = sum(size for _, size, _ in entries)
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'bytes': self._total_bytes,
+                'entries': len(entries),
+                'max_bytes': self.max_bytes,
+            }
+
+    # ---------- 读写 ----------
+
+    def contains(self, key):
+        """仅检查是否已缓存，不计入命中统计、不刷新访问时间"""
+        return os.path.exists(self.path_for(key))
+
+    def get(self, key):
+        """命中返回缓存文件路径并刷新访问时间，未命中返回 None"""
+        path = self.path_for(key)
+        with self._lock:
+            try:
+                os.utime(path, None)
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return path
+
+    def put(self, key, data):
+        """原子写入一段音频数据，返回缓存文件路径"""
+        path = self.path_for(key)
+        shard_dir = os.path.dirname(path)
+        os.makedirs(shard_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=TMP_PREFIX, suffix=TMP_SUFFIX, dir=shard_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            with self._lock:
+                self._ensure_total()
+                try:
+                    old_size = os.path.getsize(path)
+                except OSError:
+                    old_size = 0
+                os.replace(tmp_path, path)
+                self._total_bytes += len(data) - old_size
+                if self._total_bytes > self.max_bytes:
+                    self._evict_locked(keep=path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return path
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._ensure_total()
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def evict(self):
+        """手动触发一次淘汰"""
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self, keep=None):
+        entries = self._iter_entries()
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                # Windows 下正在播放的文件可能无法删除，跳过即可
+                continue
+        self._total_bytes = total
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._iter_entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
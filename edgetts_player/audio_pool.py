@@ -0,0 +1,138 @@
+"""播放用的内存音频缓冲池：合成结果直接收进可复用的缓冲区，不经过磁盘。
+
+- 池内同时存放的音频总字节数不超过 max_bytes，超出时由调用方改写磁盘缓存
+- 缓冲区释放后留在空闲列表中供下一片段复用，只追加写入、不缩小容量；
+  空闲缓冲区的总容量同样不超过 max_bytes
+- 线程安全：合成在事件循环线程写入，播放线程读取并释放
+"""
+import io
+import threading
+
+# 默认内存池上限 (MB)
+DEFAULT_AUDIO_POOL_MB = 64
+# 空闲列表最多保留的缓冲区个数
+MAX_FREE_BUFFERS = 8
+
+
+class PooledAudio:
+    """池中的一段音频，buffer 的前 size 字节有效。用完须 release()，也可用作上下文管理器"""
+
+    __slots__ = ('_pool', 'buffer', 'size')
+
+    def __init__(self, pool, buffer):
+        self._pool = pool
+        self.buffer = buffer
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def write(self, data):
+        """追加数据，超出池的上限时不写入并返回 False"""
+        return self._pool._write(self, data)
+
+    def getvalue(self):
+        return bytes(memoryview(self.buffer)[:self.size])
+
+    def open(self):
+        """返回只读、可 seek 的类文件对象（直接读缓冲区，不复制）"""
+        return _BufferReader(memoryview(self.buffer)[:self.size])
+
+    def release(self):
+        """归还缓冲区，可重复调用"""
+        self._pool._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class _BufferReader(io.RawIOBase):
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+class AudioBufferPool:
+    """有上限的内存音频缓冲池，acquire() 取得一个空的 PooledAudio"""
+
+    def __init__(self, max_bytes=DEFAULT_AUDIO_POOL_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0     # 已写入、尚未释放的音频字节数
+        self.spills = 0         # 因超出上限改写磁盘的次数（由调用方计数）
+        self._free = []
+        self._free_bytes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            buffer = self._free.pop() if self._free else bytearray()
+            self._free_bytes -= len(buffer)
+        return PooledAudio(self, buffer)
+
+    def _write(self, audio, data):
+        n = len(data)
+        with self._lock:
+            if audio.buffer is None or self.used_bytes + n > self.max_bytes:
+                return False
+            self.used_bytes += n
+        end = audio.size + n
+        if end <= len(audio.buffer):
+            audio.buffer[audio.size:end] = data  # 复用已有容量，不重新分配
+        else:
+            del audio.buffer[audio.size:]
+            audio.buffer += data
+        audio.size = end
+        return True
+
+    def _release(self, audio):
+        with self._lock:
+            if audio.buffer is None:
+                return
+            self.used_bytes -= audio.size
+            capacity = len(audio.buffer)
+            if len(self._free) < MAX_FREE_BUFFERS and self._free_bytes + capacity <= self.max_bytes:
+                self._free.append(audio.buffer)
+                self._free_bytes += capacity
+            audio.buffer = None
+            audio.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'used_bytes': self.used_bytes,
+                'free_buffers': len(self._free),
+                'max_bytes': self.max_bytes,
+                'spills': self.spills,
+            }
@@ -0,0 +1,121 @@
+"""编辑内容的后台自动保存。
+
+- 纯文本格式（.txt / .md）直接原子替换源文件
+- 其他格式（EPUB、PDF、HTML 等）写到旁路文件 <源文件>.edited.txt，不覆盖原文件；
+  旁路文件比源文件新时，下次打开优先加载它
+- 旁路文件按纯文本解析只有一个分节，原书的分节与章节偏移另存于 <旁路文件>.layout.json，
+  重新打开时恢复，播放历史中的分节位置仍然有效
+- submit 只记录每个路径的最新内容，后台线程合并连续提交后写盘
+"""
+import json
+import os
+import threading
+
+TEXT_EXTENSIONS = ('.txt', '.md')
+EDITED_SUFFIX = '.edited.txt'
+LAYOUT_SUFFIX = '.layout.json'
+
+
+def save_target(file_path):
+    """编辑内容应写入的路径"""
+    if os.path.splitext(file_path)[1].lower() in TEXT_EXTENSIONS:
+        return file_path
+    return file_path + EDITED_SUFFIX
+
+
+def resolve_source(file_path):
+    """打开文件时实际读取的路径：存在比源文件新的旁路编辑文件时返回它"""
+    target = save_target(file_path)
+    if target != file_path:
+        try:
+            if os.path.getmtime(target) >= os.path.getmtime(file_path):
+                return target
+        except OSError:
+            pass
+    return file_path
+
+
+def write_text_atomic(path, text):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def save_layout(path, text_len, section_starts, chapters):
+    """保存旁路文件 path 对应的分节起始偏移与章节 (标题, 偏移)，text_len 用于校验与文本是否一致"""
+    data = {
+        'length': text_len,
+        'section_starts': list(section_starts),
+        'chapters': [[title, offset] for title, offset in chapters],
+    }
+    write_text_atomic(path + LAYOUT_SUFFIX, json.dumps(data, ensure_ascii=False))
+
+
+def load_layout(path, text_len):
+    """读取旁路文件的分节与章节，返回 (章节列表, 分节起始偏移)；不存在、已损坏或与文本长度不符时返回 None"""
+    try:
+        with open(path + LAYOUT_SUFFIX, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data['length'] != text_len:
+            return None
+        section_starts = [int(p) for p in data['section_starts']]
+        chapters = [(str(title), int(offset)) for title, offset in data['chapters']]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not section_starts or any(not 0 <= p <= text_len for p in section_starts):
+        return None
+    return chapters, section_starts
+
+
+class AutoSaver:
+    """后台写盘线程。on_saved(path, error) 在写盘线程中回调，error 为 None 表示成功"""
+
+    def __init__(self, on_saved=None):
+        self.on_saved = on_saved
+        self._cond = threading.Condition()
+        self._pending = {}  # 路径 -> (最新内容, 分节布局)
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, path, text, layout=None):
+        """提交待保存内容；同一路径尚未写盘的旧内容被覆盖。
+        layout 为 (分节起始偏移, 章节列表) 时在文本之后一并写入 save_layout()"""
+        with self._cond:
+            self._pending[path] = (text, layout)
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                path, (text, layout) = self._pending.popitem()
+                self._busy = True
+            error = None
+            try:
+                write_text_atomic(path, text)
+                if layout is not None:
+                    save_layout(path, len(text), *layout)
+            except OSError as e:
+                error = e
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+            if self.on_saved:
+                self.on_saved(path, error)
+
+    def flush(self, timeout=None):
+        """等待所有已提交内容写盘完成"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout=5):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
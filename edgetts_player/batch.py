@@ -0,0 +1,194 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .export import export_chunks, DEFAULT_EXPORT_CONCURRENCY
+from .pipeline import MP3_BYTES_PER_SECOND
+
+DEFAULT_ACTIVE_FILES = 2
+
+
+def _parse_and_split(parse, chunker, file_path, max_length):
+    """在子进程中解析文件并断句，返回片段列表"""
+    text, _ = parse(file_path)
+    text = text.strip()
+    if not text:
+        return []
+    return chunker(text, max_length)
+
+
+class BatchFileStatus:
+    """批量转换中单个文件的进度与吞吐统计"""
+
+    def __init__(self, index, input_path, output_path):
+        self.index = index
+        self.input_path = input_path
+        self.output_path = output_path
+        self.state = 'queued'   # queued / parsing / synthesizing / done / skipped / failed
+        self.error = None
+        self.chunks_total = 0
+        self.chunks_done = 0
+        self.chars_total = 0
+        self.chars_done = 0
+        self.audio_bytes = 0
+        self.started = None
+        self.finished = None
+        self._char_offsets = [0]
+
+    @property
+    def name(self):
+        return os.path.basename(self.input_path)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def audio_seconds(self):
+        return self.audio_bytes / MP3_BYTES_PER_SECOND
+
+    @property
+    def chars_per_second(self):
+        elapsed = self.elapsed
+        return self.chars_done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def realtime_factor(self):
+        """每秒墙钟时间生成的音频秒数"""
+        elapsed = self.elapsed
+        return self.audio_seconds / elapsed if elapsed > 0 else 0.0
+
+    def _set_chunks(self, chunks):
+        self.chunks_total = len(chunks)
+        offsets = [0]
+        for chunk in chunks:
+            offsets.append(offsets[-1] + len(chunk))
+        self._char_offsets = offsets
+        self.chars_total = offsets[-1]
+
+    def _on_progress(self, done, total, audio_bytes):
+        self.chunks_done = done
+        self.chars_done = self._char_offsets[done]
+        self.audio_bytes = audio_bytes
+
+
+class BatchConverter:
+    """多文件并发转换引擎。
+
+    - 文件解析与断句在进程池中进行，与其他文件的合成重叠
+    - 所有文件共享同一个合成并发上限 (concurrency)
+    - 同时进行合成的文件不超过 active_files 个，使前面的文件尽早完成
+    - 已解析、等待合成的文件数受限，避免一次性把整个文件夹的文本读进内存
+    - on_progress(status, batch) 在每个文件状态或进度变化时于事件循环线程中回调
+    """
+
+    def __init__(self, cache, parse, chunker, voice, rate, volume, max_length=200,
+                 concurrency=DEFAULT_EXPORT_CONCURRENCY, active_files=DEFAULT_ACTIVE_FILES,
+                 parse_workers=None, on_progress=None):
+        self.cache = cache
+        self.parse = parse
+        self.chunker = chunker
+        self.voice = voice
+        self.rate = rate
+        self.volume = volume
+        self.max_length = max_length
+        self.concurrency = max(1, concurrency)
+        self.active_files = max(1, active_files)
+        self.parse_workers = parse_workers
+        self.on_progress = on_progress
+        self.files = []
+        self.started = None
+        self.finished = None
+
+    # ---------- 汇总统计 ----------
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def completed(self):
+        return sum(1 for f in self.files if f.state in ('done', 'skipped', 'failed'))
+
+    @property
+    def succeeded(self):
+        return sum(1 for f in self.files if f.state == 'done')
+
+    @property
+    def chars_per_second(self):
+        elapsed = self.elapsed
+        return sum(f.chars_done for f in self.files) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def realtime_factor(self):
+        elapsed = self.elapsed
+        return sum(f.audio_seconds for f in self.files) / elapsed if elapsed > 0 else 0.0
+
+    # ---------- 执行 ----------
+
+    def _notify(self, status):
+        if self.on_progress:
+            self.on_progress(status, self)
+
+    async def run(self, jobs):
+        """jobs 为 [(输入路径, 输出路径), ...]，返回每个文件的 BatchFileStatus 列表"""
+        self.files = [BatchFileStatus(i, src, dst) for i, (src, dst) in enumerate(jobs)]
+        self.started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        workers = self.parse_workers or os.cpu_count() or 1
+        synth_semaphore = asyncio.Semaphore(self.concurrency)
+        file_slots = asyncio.Semaphore(self.active_files)
+        admission = asyncio.Semaphore(self.active_files + workers)
+
+        async def _convert(status, executor):
+            async with admission:
+                await _convert_admitted(status, executor)
+
+        async def _convert_admitted(status, executor):
+            status.state = 'parsing'
+            status.started = time.monotonic()
+            self._notify(status)
+            try:
+                chunks = await loop.run_in_executor(
+                    executor, _parse_and_split, self.parse, self.chunker,
+                    status.input_path, self.max_length
+                )
+                if not chunks:
+                    status.state = 'skipped'
+                    return
+                status._set_chunks(chunks)
+                async with file_slots:
+                    status.state = 'synthesizing'
+                    self._notify(status)
+
+                    def _progress(done, total, audio_bytes):
+                        status._on_progress(done, total, audio_bytes)
+                        self._notify(status)
+
+                    await export_chunks(
+                        self.cache, chunks, status.output_path, self.voice, self.rate, self.volume,
+                        _progress, concurrency=self.concurrency, semaphore=synth_semaphore
+                    )
+                status.state = 'done'
+            except asyncio.CancelledError:
+                status.state = 'failed'
+                status.error = 'cancelled'
+                raise
+            except Exception as e:
+                status.state = 'failed'
+                status.error = str(e)
+            finally:
+                status.finished = time.monotonic()
+                self._notify(status)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            try:
+                await asyncio.gather(*(_convert(status, executor) for status in self.files))
+            finally:
+                self.finished = time.monotonic()
+        return self.files
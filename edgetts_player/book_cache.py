@@ -0,0 +1,345 @@
+"""解析与断句缓存（.book_cache），分两层:
+
+- 文本层（每个文件一份）: {hash}_text.txt[.zlib|.xz] 解析出的全文（可选压缩），
+  {hash}_book.json 章节、分节起始偏移与压缩方式
+- 断句层（每个 断句字数 一份，可并存）: {hash}_{chunk_size}.idx 二进制片段偏移表，
+  其后附各章节首个片段序号（章节 ↔ 片段导航索引）
+
+修改断句字数时只需对缓存的全文重新断句，不必重新解析原文件。
+打开缓存时偏移表直接 mmap，不解析、不逐个创建片段对象，片段文本按需从全文切片。
+
+同一文件的所有缓存（含 PDF 逐页缓存）以文件哈希为前缀，作为一个条目参与容量管理:
+命中时刷新 mtime，写入后按最近访问 (LRU) 淘汰，使总大小与条目数不超过上限。
+写入均为临时文件 + os.replace，写入与淘汰在跨进程文件锁内进行。
+"""
+import hashlib
+import json
+import lzma
+import mmap
+import os
+import shutil
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from .chunk_index import ChunkSpans, ChunkTexts, pack_spans
+from .chunking import iter_chunk_spans
+from .config import BOOK_CACHE_COMPRESSION, CACHE_DIR
+from .locking import FileLock
+from .navigation import chapter_first_chunks
+
+CACHE_VERSION = 8
+
+# 默认容量上限
+DEFAULT_BOOK_CACHE_MB = 512
+DEFAULT_BOOK_CACHE_ENTRIES = 200
+
+LOCK_FILENAME = '.lock'
+# 超过此时长的临时文件视为崩溃残留
+STALE_TMP_SECONDS = 3600
+
+INDEX_MAGIC = b'ETPI'
+# 魔数, 版本, 字节序(0 小端 / 1 大端), 偏移类型码, 断句字数, 片段数, 全文字符数, 章节数
+_HEADER = struct.Struct('<4sHB1sIQQI')  # 32 字节，偏移表按 8 字节对齐
+
+# 压缩方式 -> (文本文件后缀, 压缩函数, 解压函数)
+TEXT_CODECS = {
+    None: ('.txt', lambda b: b, lambda b: b),
+    'zlib': ('.txt.zlib', lambda b: zlib.compress(b, 6), zlib.decompress),
+    'lzma': ('.txt.xz', lzma.compress, lzma.decompress),
+}
+
+
+_limits = {'max_bytes': DEFAULT_BOOK_CACHE_MB * 1024 * 1024, 'max_entries': DEFAULT_BOOK_CACHE_ENTRIES}
+_stats = {'hits': 0, 'misses': 0}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def get_file_hash(file_path):
+    stat = os.stat(file_path)
+    key = f"{os.path.abspath(file_path)}_{stat.st_size}_{stat.st_mtime}"
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+def _index_path(file_hash, chunk_size, cache_dir):
+    return os.path.join(cache_dir, f"{file_hash}_{chunk_size}.idx")
+
+
+def _book_meta_path(file_hash, cache_dir):
+    return os.path.join(cache_dir, f"{file_hash}_book.json")
+
+
+def _text_path(file_hash, cache_dir, compression):
+    return os.path.join(cache_dir, f"{file_hash}_text{TEXT_CODECS[compression][0]}")
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _touch(path):
+    """刷新 mtime 作为最近访问时间"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def cache_lock(cache_dir=CACHE_DIR):
+    """缓存目录的跨进程锁（同一进程内可重入）"""
+    key = os.path.abspath(cache_dir)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = FileLock(os.path.join(key, LOCK_FILENAME))
+        return lock
+
+
+# ---------- 文本层 ----------
+
+def load_cached_text(file_path, cache_dir=CACHE_DIR):
+    """读取文本层缓存，命中返回 (content, chapters, section_starts)，否则返回 None"""
+    file_hash = get_file_hash(file_path)
+    try:
+        with open(_book_meta_path(file_hash, cache_dir), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('cache_version') != CACHE_VERSION:
+            raise ValueError('cache version mismatch')
+        compression = meta.get('compression')
+        with open(_text_path(file_hash, cache_dir, compression), 'rb') as f:
+            content = TEXT_CODECS[compression][2](f.read()).decode('utf-8')
+        if len(content) != meta.get('text_len'):
+            raise ValueError('cached text truncated')
+    except Exception:
+        _stats['misses'] += 1
+        return None
+    _stats['hits'] += 1
+    _touch(_book_meta_path(file_hash, cache_dir))
+    return content, meta.get('chapters'), meta.get('section_starts') or [0]
+
+
+def save_cached_text(file_path, content, chapters, section_starts=None, cache_dir=CACHE_DIR,
+                     compression=BOOK_CACHE_COMPRESSION, prune=True):
+    """写入文本层缓存。compression: None / 'zlib' / 'lzma'，压缩缓存的全文；
+    prune 为 False 时不在写入后淘汰（由调用方最后统一淘汰一次）"""
+    os.makedirs(cache_dir, exist_ok=True)
+    file_hash = get_file_hash(file_path)
+    data = TEXT_CODECS[compression][1](content.encode('utf-8'))
+    meta = json.dumps({
+        'cache_version': CACHE_VERSION,
+        'compression': compression,
+        'text_len': len(content),
+        'chapters': chapters,
+        'section_starts': section_starts or [0],
+    }, ensure_ascii=False).encode('utf-8')
+    with cache_lock(cache_dir):
+        _write_atomic(_text_path(file_hash, cache_dir, compression), data)
+        # 最后写元数据：元数据存在即表示全文已完整写入
+        _write_atomic(_book_meta_path(file_hash, cache_dir), meta)
+        if prune:
+            prune_cache(cache_dir, keep=file_hash)
+
+
+# ---------- 断句层 ----------
+
+def _map_index(index_path, chunk_size, text_len):
+    """映射断句索引，返回 ChunkSpans；格式、版本或对应的全文不符返回 None"""
+    with open(index_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    views = []
+    try:
+        magic, version, big_endian, typecode, size, count, length, chapters = _HEADER.unpack_from(mm, 0)
+        if (magic != INDEX_MAGIC or version != CACHE_VERSION or big_endian != (sys.byteorder == 'big')
+                or size != chunk_size or length != text_len):
+            return None
+        views.append(memoryview(mm))
+        views.append(views[-1][_HEADER.size:])
+        views.append(views[-1].cast(typecode.decode('ascii')))
+        flat = views[-1]
+        if len(flat) != 2 * count + chapters:
+            return None
+        spans = ChunkSpans(flat[:2 * count], flat[2 * count:] if chapters else None)
+        # 映射交给 ChunkSpans，随其回收
+        views, mm = [], None
+        return spans
+    finally:
+        # 任何失败（含头部损坏、类型码非法）都释放视图并关闭映射，不留下打开的映射
+        for view in reversed(views):
+            view.release()
+        if mm is not None:
+            mm.close()
+
+
+def load_cached_chunks(file_path, chunk_size, content, cache_dir=CACHE_DIR):
+    """读取断句层缓存，命中返回 (chunks, chunk_positions) 两个只读序列视图，否则返回 None"""
+    index_path = _index_path(get_file_hash(file_path), chunk_size, cache_dir)
+    try:
+        spans = _map_index(index_path, chunk_size, len(content))
+    except Exception:
+        return None
+    if spans is None:
+        return None
+    _touch(index_path)
+    return ChunkTexts(content, spans), spans
+
+
+def save_cached_chunks(file_path, chunk_size, content, chunk_positions, cache_dir=CACHE_DIR,
+                       chapters=None, prune=True):
+    """写入断句层缓存（只存偏移，片段均为 content 的切片），有章节时附带各章节首个片段序号；
+    prune 同 save_cached_text"""
+    os.makedirs(cache_dir, exist_ok=True)
+    flat = pack_spans(chunk_positions)
+    count = len(flat) // 2
+    first_chunks = chapter_first_chunks(chapters, chunk_positions) if chapters and count else []
+    flat.extend(first_chunks)
+    header = _HEADER.pack(INDEX_MAGIC, CACHE_VERSION, sys.byteorder == 'big',
+                          flat.typecode.encode('ascii'), chunk_size, count, len(content),
+                          len(first_chunks))
+    file_hash = get_file_hash(file_path)
+    with cache_lock(cache_dir):
+        _write_atomic(_index_path(file_hash, chunk_size, cache_dir), header + flat.tobytes())
+        if prune:
+            prune_cache(cache_dir, keep=file_hash)
+
+
+# ---------- 整本 ----------
+
+def load_cached_book(file_path, chunk_size, cache_dir=CACHE_DIR):
+    """读取缓存，命中返回 (content, chapters, chunks, chunk_positions, section_starts)，否则返回 None。
+
+    全文已缓存但没有该断句字数的索引时，直接对缓存的全文断句并补写索引。
+    """
+    cached = load_cached_text(file_path, cache_dir)
+    if cached is None:
+        return None
+    content, chapters, section_starts = cached
+    indexed = load_cached_chunks(file_path, chunk_size, content, cache_dir)
+    if indexed is None:
+        positions = list(iter_chunk_spans(content, chunk_size))
+        try:
+            save_cached_chunks(file_path, chunk_size, content, positions, cache_dir, chapters)
+        except OSError:
+            pass
+        indexed = [content[s:e] for s, e in positions], positions
+    return (content, chapters, *indexed, section_starts)
+
+
+def save_cached_book(file_path, chunk_size, content, chapters, chunks, chunk_positions,
+                     section_starts=None, cache_dir=CACHE_DIR, compression=BOOK_CACHE_COMPRESSION):
+    """写入文本层与该断句字数的断句层缓存，两层都写完后只淘汰一次（每次淘汰都要遍历整个缓存目录）"""
+    with cache_lock(cache_dir):
+        save_cached_text(file_path, content, chapters, section_starts, cache_dir, compression, prune=False)
+        save_cached_chunks(file_path, chunk_size, content, chunk_positions, cache_dir, chapters, prune=False)
+        prune_cache(cache_dir, keep=get_file_hash(file_path))
+
+
+# ---------- 容量管理 ----------
+
+def _scan_entries(cache_dir):
+    """按条目汇总缓存文件，返回 {条目键: [最近访问时间, 字节数, [路径, ...], 是否书籍条目]}。
+
+    书籍条目以文件哈希为键；子目录（如 EPUB 条目缓存）中的每个文件各为一个条目，只计字节不计条目数。
+    崩溃残留的临时文件直接删除。
+    """
+    entries = {}
+    now = time.time()
+    for root, dirs, files in os.walk(cache_dir):
+        top = os.path.samefile(root, cache_dir)
+        for name in files:
+            if top and name == LOCK_FILENAME:
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith('.tmp'):
+                if now - st.st_mtime > STALE_TMP_SECONDS:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                continue
+            key = name.split('_', 1)[0] if top else path
+            entry = entries.setdefault(key, [0.0, 0, [], top])
+            entry[0] = max(entry[0], st.st_mtime)
+            entry[1] += st.st_size
+            entry[2].append(path)
+    return entries
+
+
+def set_cache_limits(max_bytes=None, max_entries=None):
+    """设置容量上限（字节数 / 书籍条目数），None 表示不修改"""
+    if max_bytes is not None:
+        _limits['max_bytes'] = max_bytes
+    if max_entries is not None:
+        _limits['max_entries'] = max_entries
+
+
+def prune_cache(cache_dir=CACHE_DIR, max_bytes=None, max_entries=None, keep=None):
+    """按最近访问淘汰，直到总字节数与书籍条目数都不超过上限，返回 (淘汰条目数, 释放字节数)。
+
+    keep 为不淘汰的文件哈希（如刚写入的条目）。
+    """
+    max_bytes = _limits['max_bytes'] if max_bytes is None else max_bytes
+    max_entries = _limits['max_entries'] if max_entries is None else max_entries
+    if not os.path.isdir(cache_dir):
+        return 0, 0
+    removed = freed = 0
+    with cache_lock(cache_dir):
+        entries = _scan_entries(cache_dir)
+        total = sum(e[1] for e in entries.values())
+        books = sum(1 for e in entries.values() if e[3])
+        for key, (_, size, paths, is_book) in sorted(entries.items(), key=lambda kv: kv[1][0]):
+            if total <= max_bytes and books <= max_entries:
+                break
+            if key == keep or (not is_book and total <= max_bytes):
+                continue
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # 可能仍被其他进程映射，下次再删
+            total -= size
+            freed += size
+            removed += 1
+            books -= is_book
+    return removed, freed
+
+
+def cache_stats(cache_dir=CACHE_DIR):
+    """缓存统计: 本进程命中/未命中次数、命中率，以及磁盘上的字节数、书籍条目数与上限"""
+    entries = _scan_entries(cache_dir) if os.path.isdir(cache_dir) else {}
+    hits, misses = _stats['hits'], _stats['misses']
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        'bytes': sum(e[1] for e in entries.values()),
+        'entries': sum(1 for e in entries.values() if e[3]),
+        'max_bytes': _limits['max_bytes'],
+        'max_entries': _limits['max_entries'],
+    }
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """删除全部解析缓存"""
+    if not os.path.isdir(cache_dir):
+        return
+    with cache_lock(cache_dir):
+        for entry in os.scandir(cache_dir):
+            if entry.name == LOCK_FILENAME:
+                continue
+            try:
+                if entry.is_dir():
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.remove(entry.path)
+            except OSError:
+                pass
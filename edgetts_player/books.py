@@ -0,0 +1,64 @@
+import pathlib
+
+from .parsers import WholeBookReader, get_parser, open_sections, read_all_sections, supported_extensions
+
+# 支持的文件扩展名（内置格式；register_parser 之后可调用 supported_extensions() 获取最新列表）
+SUPPORTED_EXTENSIONS = supported_extensions()
+
+
+def _read_plain_text(path):
+    return path.read_text(encoding='utf-8'), None
+
+
+def open_book_sections(file_path, use_cache=True):
+    """打开文档的分节读取器（EPUB 为 spine 条目，PDF 为页，MOBI 为 HTML 文件，其余为整本）。
+
+    返回的 SectionReader 需要 close()，也可用作上下文管理器。
+    use_cache 为 False 时不读写 .book_cache 中的逐分节缓存（EPUB 条目、PDF 逐页文本）。
+    """
+    path = pathlib.Path(file_path)
+    reader = open_sections(path.suffix, path, use_cache)
+    if reader is None:
+        # 未登记的扩展名按 UTF-8 纯文本读取
+        reader = WholeBookReader(_read_plain_text, path)
+    return reader
+
+
+def iter_book_sections(file_path, priority=None):
+    """逐个分节解析文档，生成 (分节序号, 标题或 None, 文本)。
+
+    priority 给定时先解析该分节（如上次播放位置所在章节），其余分节再按顺序补齐。
+    """
+    with open_book_sections(file_path) as reader:
+        count = len(reader)
+        if priority is not None and 0 <= priority < count:
+            title, text = reader.read(priority)
+            yield priority, title, text
+        for i in range(count):
+            if i == priority:
+                continue
+            title, text = reader.read(i)
+            yield i, title, text
+
+
+def read_book_sections(file_path, progress=None, use_cache=True):
+    """读取全部分节，返回 (纯文本, 章节列表, 各分节起始偏移)。
+
+    progress(done, total) 报告已读取的分节数（PDF 为页数）。
+    """
+    with open_book_sections(file_path, use_cache) as reader:
+        return read_all_sections(reader, progress)
+
+
+def read_book_file(file_path):
+    """根据文件扩展名读取内容，返回 (纯文本, 章节列表)。
+
+    章节列表格式: [(标题, 起始字符偏移), ...] 或 None
+    支持: .txt .md .html .htm .epub .mobi .pdf .docx，以及通过 register_parser 登记的格式
+    未登记的扩展名按 UTF-8 纯文本读取。
+    """
+    path = pathlib.Path(file_path)
+    parser = get_parser(path.suffix)
+    if parser is None:
+        return _read_plain_text(path)
+    return parser(path)
@@ -0,0 +1,70 @@
+"""片段偏移表：以扁平的无符号整数数组 [start0, end0, start1, end1, ...] 存放断句结果。
+
+数组可以是 array('I')，也可以是直接映射缓存文件的 memoryview，
+片段文本按需从原文切片得到，不为每个片段预先创建 Python 对象。
+"""
+from array import array
+from collections.abc import Sequence
+from itertools import chain
+
+
+def pack_spans(positions):
+    """[(start, end), ...] -> 扁平 array；偏移超出 32 位时改用 64 位"""
+    flat = array('I')
+    try:
+        flat.extend(chain.from_iterable(positions))
+    except OverflowError:
+        flat = array('Q', chain.from_iterable(positions))
+    return flat
+
+
+class ChunkSpans(Sequence):
+    """片段 (start, end) 的只读序列视图。
+
+    chapter_chunks 为断句缓存中一并保存的各章节首个片段序号（导航索引），没有时为 None。
+    """
+
+    def __init__(self, flat, chapter_chunks=None):
+        self._flat = flat
+        self.chapter_chunks = chapter_chunks
+
+    def __len__(self):
+        return len(self._flat) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('chunk index out of range')
+        return self._flat[2 * index], self._flat[2 * index + 1]
+
+    @property
+    def starts(self):
+        """各片段起始偏移（升序），可直接用于 bisect"""
+        return self._flat[0::2]
+
+
+class ChunkTexts(Sequence):
+    """片段文本的只读序列视图，取值时才从原文切片"""
+
+    def __init__(self, text, spans):
+        self._text = text
+        self._spans = spans
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start, end = self._spans[index]
+        return self._text[start:end]
+
+
+def span_starts(positions):
+    """各片段起始偏移；ChunkSpans 直接返回数组视图，不逐个复制"""
+    if isinstance(positions, ChunkSpans):
+        return positions.starts
+    return [p[0] for p in positions]
@@ -0,0 +1,182 @@
+import bisect
+import re
+
+from .chunk_index import span_starts
+
+# 断句标点（零宽匹配：断点位于标点或换行之后）
+SENTENCE_END_CHARS = '。！？；…!?;\n'
+SENTENCE_DELIMITERS = re.compile(r'(?<=[。！？；…!?;])|(?<=\n)')
+CLAUSE_DELIMITERS = re.compile(r'(?<=[，、,])')
+
+
+def _trim(text, start, end):
+    """收缩 [start, end) 去掉首尾空白，返回新的 (start, end)"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _iter_spans(text, pattern, start, end):
+    """按零宽分隔符切分 text[start:end]，生成去掉首尾空白后非空的 (start, end)"""
+    prev = start
+    for m in pattern.finditer(text, start, end):
+        pos = m.start()
+        if pos > prev:
+            s, e = _trim(text, prev, pos)
+            if s < e:
+                yield s, e
+            prev = pos
+    if prev < end:
+        s, e = _trim(text, prev, end)
+        if s < e:
+            yield s, e
+
+
+def iter_chunk_spans(text, max_length=200, start=0):
+    """按标点断句，单遍生成各片段在原文中的 (start, end)。
+
+    片段按句子合并；超长句再按逗号等分句，分句仍超长时硬切。
+    长度按去掉首尾空白的各句（分句）字数之和计算，不计句间的空白与换行，
+    与早期按拼接后的字符串计长的断句结果一致，保存的片段序号不会错位。
+    只记录偏移、不拼接字符串，片段文本即 text[start:end]（句间的换行等原样保留）。
+    start 须为句子开头，用于从中途续断句。
+    """
+    buf_start = buf_end = None
+    buf_len = 0
+
+    for s, e in _iter_spans(text, SENTENCE_DELIMITERS, start, len(text)):
+        if e - s > max_length:
+            if buf_start is not None:
+                yield buf_start, buf_end
+                buf_start = None
+            for cs, ce in _iter_spans(text, CLAUSE_DELIMITERS, s, e):
+                if buf_start is not None and buf_len + ce - cs <= max_length:
+                    buf_end = ce
+                    buf_len += ce - cs
+                    continue
+                if buf_start is not None:
+                    yield buf_start, buf_end
+                while ce - cs > max_length:
+                    yield cs, cs + max_length
+                    cs += max_length
+                buf_start, buf_end, buf_len = cs, ce, ce - cs
+            continue
+
+        if buf_start is not None and buf_len + e - s <= max_length:
+            buf_end = e
+            buf_len += e - s
+        else:
+            if buf_start is not None:
+                yield buf_start, buf_end
+            buf_start, buf_end, buf_len = s, e, e - s
+
+    if buf_start is not None:
+        yield buf_start, buf_end
+
+
+def split_text_with_positions(text, max_length=200):
+    """断句并返回 (片段列表, [(start, end), ...])，位置精确对应原文"""
+    positions = list(iter_chunk_spans(text, max_length))
+    return [text[s:e] for s, e in positions], positions
+
+
+def split_text_to_chunks(text, max_length=200):
+    """按标点断句，将文本拆为不超过 max_length 的片段列表。"""
+    return [text[s:e] for s, e in iter_chunk_spans(text, max_length)]
+
+
+def find_chunk_positions(full_text, chunks):
+    """将每个 chunk 映射回原文中的 (start, end) 字符偏移（兼容旧接口）。
+
+    split_text_to_chunks 的片段都是原文切片，按顺序查找即可精确定位；
+    新代码请直接用 split_text_with_positions，免去这次查找。
+    """
+    positions = []
+    search_start = 0
+    for chunk in chunks:
+        pos = full_text.find(chunk, search_start)
+        if pos == -1:
+            pos = search_start
+        end = min(pos + len(chunk), len(full_text))
+        positions.append((pos, end))
+        search_start = end
+    return positions
+
+
+# ---------- 增量断句 ----------
+
+_BLOCK = 4096
+
+
+def edit_span(old_text, new_text):
+    """比较编辑前后的文本，返回 (start, old_end, new_end)：
+    只有 old_text[start:old_end] 被替换成了 new_text[start:new_end]。"""
+    n = min(len(old_text), len(new_text))
+    p = 0
+    while p < n and old_text[p:p + _BLOCK] == new_text[p:p + _BLOCK]:
+        p += _BLOCK
+    p = min(p, n)
+    while p < n and old_text[p] == new_text[p]:
+        p += 1
+    q, limit = 0, n - p
+    lo, ln = len(old_text), len(new_text)
+    while q < limit and old_text[lo - q - _BLOCK:lo - q] == new_text[ln - q - _BLOCK:ln - q] \
+            and q + _BLOCK <= limit:
+        q += _BLOCK
+    while q < limit and old_text[lo - q - 1] == new_text[ln - q - 1]:
+        q += 1
+    return p, lo - q, ln - q
+
+
+def _sentence_anchor(text, pos):
+    """若 pos 是句子开头，返回决定这一点的字符位置（前一个非空白字符，文首为 -1），否则返回 None"""
+    j = pos - 1
+    while j >= 0 and text[j].isspace() and text[j] != '\n':
+        j -= 1
+    if j < 0 or text[j] in SENTENCE_END_CHARS:
+        return j
+    return None
+
+
+def rechunk_edit(new_text, positions, start, old_end, new_end, max_length=200):
+    """编辑后增量断句，只重新切分受影响的区域。
+
+    positions 为编辑前全文的片段位置，(start, old_end, new_end) 来自 edit_span。
+    从编辑点前一个片段所在的句首开始重新断句，直到在编辑区之后与旧片段边界重新对齐，
+    其后的旧片段只平移偏移。
+    返回 (新片段位置列表, 首个变化的片段序号, 被替换的旧片段数, 新生成的片段数)。
+    """
+    delta = new_end - old_end
+    starts = span_starts(positions)
+    count = len(positions)
+    # 从编辑点所在句子的首个片段再往前退一句：前一句是否与这一句合并取决于这一句的长度。
+    # 只在句首片段处重启（超长句的分句片段要从整句开始重切）；编辑点之前新旧文本相同，在新文本上判断即可
+    i = max(0, bisect.bisect_right(starts, start) - 1)
+    for step in range(2):
+        if step:
+            i = max(0, i - 1)
+        while i > 0 and _sentence_anchor(new_text, starts[i]) is None:
+            i -= 1
+    restart = starts[i] if 0 < i < count else 0
+
+    generated = []
+    j = count
+    for s, e in iter_chunk_spans(new_text, max_length, restart):
+        if s > new_end:
+            anchor = _sentence_anchor(new_text, s)
+            if anchor is not None and anchor >= new_end:
+                k = bisect.bisect_left(starts, s - delta, i)
+                if k < count and starts[k] == s - delta:
+                    j = k
+                    break
+        generated.append((s, e))
+
+    result = list(positions[:i])
+    result.extend(generated)
+    if delta:
+        result.extend((a + delta, b + delta) for a, b in positions[j:])
+    else:
+        result.extend(positions[j:])
+    return result, i, j - i, len(generated)
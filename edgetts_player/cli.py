@@ -0,0 +1,234 @@
+"""无界面命令行入口: python -m edgetts_player {convert,batch,chunk,inspect,cache,voices} ...
+
+语速/音量使用 edge-tts 的格式，负值请写成 --rate=-10% 以免被当作选项。
+"""
+import argparse
+import json
+import os
+import pathlib
+import sys
+
+from .config import DEFAULT_CHUNK_SIZE, DEFAULT_VOICE
+
+
+def _add_voice_args(parser, synthesize=True):
+    """语音、语速、音量与断句字数；synthesize 为 False 时（只查看不合成）不注册 --concurrency"""
+    parser.add_argument('--voice', default=DEFAULT_VOICE, help=f"语音名称 (默认 {DEFAULT_VOICE})")
+    parser.add_argument('--rate', default='+0%', help="语速，如 +20%% 或 --rate=-10%%")
+    parser.add_argument('--volume', default='+0%', help="音量，如 +10%% 或 --volume=-10%%")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="断句最大字数")
+    if synthesize:
+        parser.add_argument('--concurrency', type=int, default=None, help="同时合成的片段数")
+
+
+def _print_progress(prefix, done, total):
+    sys.stderr.write(f"\r{prefix} {done}/{total} 片段")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def cmd_convert(args):
+    from .api import convert_file
+    from .export import DEFAULT_EXPORT_CONCURRENCY
+
+    output = args.output or str(pathlib.Path(args.input).with_suffix('.mp3'))
+    name = os.path.basename(args.input)
+    total = convert_file(
+        args.input, output, voice=args.voice, rate=args.rate, volume=args.volume,
+        chunk_size=args.chunk_size, concurrency=args.concurrency or DEFAULT_EXPORT_CONCURRENCY,
+        progress=None if args.quiet else lambda done, tot, _b: _print_progress(name, done, tot)
+    )
+    print(f"{output} ({total} 片段)")
+    return 0
+
+
+def cmd_batch(args):
+    from .api import batch_convert
+    from .export import DEFAULT_EXPORT_CONCURRENCY
+
+    jobs = []
+    for path in args.inputs:
+        out_dir = args.output_dir or os.path.dirname(os.path.abspath(path))
+        jobs.append((path, os.path.join(out_dir, pathlib.Path(path).stem + '.mp3')))
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    def _on_progress(status, batch):
+        if args.quiet:
+            return
+        if status.state in ('done', 'skipped', 'failed'):
+            detail = f": {status.error}" if status.error else ""
+            sys.stderr.write(f"[{batch.completed}/{len(jobs)}] {status.state:<7} {status.name}{detail}\n")
+
+    converter = batch_convert(
+        jobs, voice=args.voice, rate=args.rate, volume=args.volume, chunk_size=args.chunk_size,
+        concurrency=args.concurrency or DEFAULT_EXPORT_CONCURRENCY,
+        parse_workers=args.parse_workers, on_progress=_on_progress
+    )
+    print(f"成功 {converter.succeeded}/{len(jobs)} · 用时 {converter.elapsed:.1f}s · "
+          f"{converter.chars_per_second:.0f} 字/秒 · {converter.realtime_factor:.1f}x 实时")
+    return 0 if converter.succeeded == sum(1 for f in converter.files if f.state != 'skipped') else 1
+
+
+def cmd_chunk(args):
+    from .api import load_book
+
+    _, _, chunks, positions, _ = load_book(args.input, args.chunk_size, use_cache=not args.no_cache)
+    if args.json:
+        json.dump([{'index': i, 'start': s, 'end': e, 'text': c}
+                   for i, (c, (s, e)) in enumerate(zip(chunks, positions))],
+                  sys.stdout, ensure_ascii=False, indent=1)
+        sys.stdout.write('\n')
+    else:
+        # 片段文本保留原文中的换行与制表符，转义后每个片段仍占一行
+        for i, (chunk, (start, end)) in enumerate(zip(chunks, positions), 1):
+            print(f"{i}\t{start}-{end}\t{chunk!r}")
+    return 0
+
+
+def cmd_inspect(args):
+    from .api import load_book, open_audio_cache
+    from .audio_cache import make_audio_key
+    from .book_cache import get_file_hash
+
+    content, chapters, chunks, _, from_cache = load_book(args.input, args.chunk_size)
+    cache = open_audio_cache()
+    cached_audio = sum(1 for c in chunks
+                       if cache.contains(make_audio_key(c, args.voice, args.rate, args.volume)))
+    info = {
+        'path': os.path.abspath(args.input),
+        'format': pathlib.Path(args.input).suffix.lower(),
+        'size_bytes': os.path.getsize(args.input),
+        'file_hash': get_file_hash(args.input),
+        'book_cache_hit': from_cache,
+        'chars': len(content),
+        'chunk_size': args.chunk_size,
+        'chunks': len(chunks),
+        'audio_cached_chunks': cached_audio,
+        'chapters': [{'title': t, 'offset': o} for t, o in (chapters or [])],
+    }
+    if args.json:
+        json.dump(info, sys.stdout, ensure_ascii=False, indent=1)
+        sys.stdout.write('\n')
+        return 0
+    for key in ('path', 'format', 'size_bytes', 'file_hash', 'book_cache_hit', 'chars',
+                'chunk_size', 'chunks', 'audio_cached_chunks'):
+        print(f"{key:<20}{info[key]}")
+    print(f"{'chapters':<20}{len(info['chapters'])}")
+    for ch in info['chapters']:
+        print(f"  {ch['offset']:>10}  {ch['title']}")
+    return 0
+
+
+def cmd_cache(args):
+    from . import book_cache
+    from .api import open_audio_cache
+
+    if args.action == 'clear':
+        book_cache.clear_cache()
+        open_audio_cache().clear()
+        print("已清空解析缓存与音频缓存")
+        return 0
+    if args.action == 'prune':
+        removed, freed = book_cache.prune_cache(
+            max_bytes=None if args.max_mb is None else args.max_mb * 1024 * 1024,
+            max_entries=args.max_entries)
+        print(f"淘汰 {removed} 个条目，释放 {freed / 1024 / 1024:.1f} MB")
+        return 0
+    info = {'book_cache': book_cache.cache_stats(), 'audio_cache': open_audio_cache().stats()}
+    if args.json:
+        json.dump(info, sys.stdout, ensure_ascii=False, indent=1)
+        sys.stdout.write('\n')
+        return 0
+    for name, stats in info.items():
+        print(name)
+        for key, value in stats.items():
+            print(f"  {key:<18}{value:.2f}" if isinstance(value, float) else f"  {key:<18}{value}")
+    return 0
+
+
+def cmd_voices(args):
+    import asyncio
+    from .voices import VoiceCatalog, fetch_voices, load_voice_catalog, save_cached_voices
+
+    catalog, stale = load_voice_catalog()
+    if args.refresh or (stale and not args.offline):
+        try:
+            voices = asyncio.run(fetch_voices())
+        except Exception as e:
+            if args.refresh:
+                raise
+            print(f"刷新语音列表失败，使用本地缓存: {e}", file=sys.stderr)
+        else:
+            save_cached_voices(voices)
+            catalog = VoiceCatalog(voices)
+    voices = catalog.filter(args.locale, args.gender)
+    if args.json:
+        json.dump(voices, sys.stdout, ensure_ascii=False, indent=1)
+        sys.stdout.write('\n')
+        return 0
+    for v in voices:
+        print(f"{v['ShortName']:<40}{v['Gender']:<8}{v['Locale']}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m edgetts_player',
+                                     description="EdgeTTSPlayer 命令行（无界面）")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('convert', help="将单个文件转换为 MP3")
+    p.add_argument('input')
+    p.add_argument('-o', '--output', help="输出 MP3 路径（默认与输入同名）")
+    p.add_argument('-q', '--quiet', action='store_true')
+    _add_voice_args(p)
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser('batch', help="批量转换多个文件")
+    p.add_argument('inputs', nargs='+')
+    p.add_argument('-d', '--output-dir', help="输出目录（默认与各输入文件同目录）")
+    p.add_argument('--parse-workers', type=int, default=None, help="解析进程数（默认 CPU 核数）")
+    p.add_argument('-q', '--quiet', action='store_true')
+    _add_voice_args(p)
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser('chunk', help="输出断句结果")
+    p.add_argument('input')
+    p.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    p.add_argument('--json', action='store_true')
+    p.add_argument('--no-cache', action='store_true', help="不读写 .book_cache")
+    p.set_defaults(func=cmd_chunk)
+
+    p = sub.add_parser('inspect', help="查看文件解析、章节与缓存情况")
+    p.add_argument('input')
+    p.add_argument('--json', action='store_true')
+    _add_voice_args(p, synthesize=False)
+    p.set_defaults(func=cmd_inspect)
+
+    p = sub.add_parser('cache', help="查看或清理 .book_cache / .audio_cache")
+    p.add_argument('action', nargs='?', choices=('stats', 'prune', 'clear'), default='stats')
+    p.add_argument('--max-mb', type=int, default=None, help="prune: 解析缓存容量上限 (MB)")
+    p.add_argument('--max-entries', type=int, default=None, help="prune: 解析缓存最多保留的书籍数")
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_cache)
+
+    p = sub.add_parser('voices', help="列出可用语音（读取本地缓存，过期时联网刷新）")
+    p.add_argument('--locale', help="语言或地区前缀，如 zh、zh-CN、en-US")
+    p.add_argument('--gender', choices=('Female', 'Male'))
+    p.add_argument('--refresh', action='store_true', help="强制联网刷新")
+    p.add_argument('--offline', action='store_true', help="只读本地缓存，不联网")
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_voices)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
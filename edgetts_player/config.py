@@ -0,0 +1,28 @@
+import os
+
+# 程序所在目录（缓存与播放历史都放在这里）
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 解析文本 / 断句缓存目录
+CACHE_DIR = os.path.join(APP_DIR, '.book_cache')
+
+# 解析缓存中全文的压缩方式: None / 'zlib' / 'lzma'（压缩可省磁盘，但打开缓存时需解压）
+BOOK_CACHE_COMPRESSION = None
+
+# 合成音频缓存目录（按 文本+语音+语速+音量 寻址）
+AUDIO_CACHE_DIR = os.path.join(APP_DIR, '.audio_cache')
+
+# 播放历史文件
+HISTORY_FILE = os.path.join(APP_DIR, '.playback_history.json')
+
+# 语音目录缓存文件
+VOICE_CACHE_FILE = os.path.join(APP_DIR, '.voice_cache.json')
+
+# edge-tts 默认中文语音
+DEFAULT_VOICE = "zh-CN-XiaoxiaoNeural"
+
+# 默认断句最大字数
+DEFAULT_CHUNK_SIZE = 200
+
+# 合成服务的 websocket 地址，留空使用 edge-tts 默认地址；可指向本地模拟服务 (python -m edgetts_player.fake_tts)
+SYNTH_WSS_URL = os.environ.get('EDGETTS_PLAYER_WSS_URL') or None
@@ -0,0 +1,131 @@
+import asyncio
+import glob
+import hashlib
+import json
+import os
+
+from .audio_cache import make_audio_key
+from .synth import synthesize_cached_bytes
+
+DEFAULT_EXPORT_CONCURRENCY = 4
+
+MANIFEST_SUFFIX = '.manifest.json'
+PART_SUFFIX = '.part'
+MANIFEST_VERSION = 1
+
+
+def export_job_id(chunks, voice, rate, volume):
+    """由全部片段的音频缓存键计算导出任务 ID，文本或语音参数任一变化都会改变它。"""
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(make_audio_key(chunk, voice, rate, volume).encode('ascii'))
+    return h.hexdigest()
+
+
+def find_resumable_export(output_dir, job_id):
+    """在输出目录中查找同一任务未完成的导出，返回其输出路径或 None"""
+    for manifest_path in glob.glob(os.path.join(glob.escape(output_dir), '*' + MANIFEST_SUFFIX)):
+        manifest = _read_manifest(manifest_path)
+        if manifest and manifest.get('job_id') == job_id:
+            output_path = manifest_path[:-len(MANIFEST_SUFFIX)]
+            if os.path.exists(output_path + PART_SUFFIX):
+                return output_path
+    return None
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(manifest_path, manifest):
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+def strip_id3(data):
+    """去掉 MP3 数据首尾的 ID3 标签，只保留音频帧，便于直接拼接。"""
+    if data[:3] == b'ID3' and len(data) >= 10:
+        # ID3v2 头: 'ID3' + 版本(2) + 标志(1) + syncsafe 长度(4)
+        size = 0
+        for b in data[6:10]:
+            size = (size << 7) | (b & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        data = data[10 + size + footer:]
+    if len(data) >= 128 and data[-128:-125] == b'TAG':
+        data = data[:-128]
+    return data
+
+
+async def export_chunks(cache, chunks, output_path, voice, rate, volume, progress=None,
+                        concurrency=DEFAULT_EXPORT_CONCURRENCY, semaphore=None):
+    """并发合成各片段（优先读取音频缓存），按顺序拼接 MP3 帧写入 output_path，不重新编码。
+
+    - 最多 concurrency 个片段同时合成，已合成未写出的片段不超过 2 * concurrency 个；
+      它们以字节保存在内存中，不持有可能被淘汰的缓存文件路径
+    - 写出进度记录在 <output_path>.manifest.json，中断后以相同参数再次调用会从断点继续
+    - semaphore 可由调用方传入，用于多个导出任务共享同一个全局并发上限
+    - progress(done, total, audio_bytes) 在每个片段写入后回调，audio_bytes 为已写出的音频字节数
+    """
+    total = len(chunks)
+    part_path = output_path + PART_SUFFIX
+    manifest_path = output_path + MANIFEST_SUFFIX
+    job_id = export_job_id(chunks, voice, rate, volume)
+
+    done = 0
+    written = 0
+    manifest = _read_manifest(manifest_path)
+    if (manifest and manifest.get('job_id') == job_id and os.path.exists(part_path)
+            and os.path.getsize(part_path) >= manifest.get('bytes', 0)):
+        done = manifest.get('done', 0)
+        written = manifest.get('bytes', 0)
+    manifest = {'version': MANIFEST_VERSION, 'job_id': job_id, 'total': total,
+                'done': done, 'bytes': written}
+
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+    window = max(1, concurrency) * 2
+    pending = {}
+
+    async def _synthesize(idx):
+        async with semaphore:
+            return strip_id3(await synthesize_cached_bytes(cache, chunks[idx], voice, rate, volume))
+
+    if progress and done:
+        progress(done, total, written)
+    try:
+        with open(part_path, 'r+b' if done else 'wb') as out:
+            # 丢弃上次中断时写了一半、尚未记入清单的数据
+            out.truncate(written)
+            out.seek(written)
+            for i in range(done, total):
+                for j in range(i, min(total, i + window)):
+                    if j not in pending:
+                        pending[j] = asyncio.ensure_future(_synthesize(j))
+                data = await pending.pop(i)
+                out.write(data)
+                out.flush()
+                manifest['done'] = i + 1
+                manifest['bytes'] = manifest['bytes'] + len(data)
+                _write_manifest(manifest_path, manifest)
+                if progress:
+                    progress(i + 1, total, manifest['bytes'])
+    finally:
+        for task in pending.values():
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+
+    os.replace(part_path, output_path)
+    try:
+        os.remove(manifest_path)
+    except OSError:
+        pass
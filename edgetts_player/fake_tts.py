@@ -0,0 +1,172 @@
+"""本地模拟的 edge-tts websocket 服务，可注入延迟与故障，用于不联网地验证合成的容错与并发控制。
+
+    python -m edgetts_player.fake_tts --port 8765 --latency 0.3 --jitter 2 --fail-rate 0.2
+    EDGETTS_PLAYER_WSS_URL='ws://127.0.0.1:8765/edge/v1?TrustedClientToken=fake' python main.py
+
+音频为静音 MP3 帧（24kHz 48kbps 单声道，与 edge-tts 的输出格式相同），时长按字数计算，
+同一文本每次返回的字节完全相同。每个请求以 fail_rate 的概率注入一种故障（从 faults 中随机选取）:
+
+- reject: 握手返回 HTTP 429（限流）
+- drop: 不发送音频直接断开
+- stall: 发送一半音频后不再响应
+- corrupt: 发送一半音频后发送非法消息
+"""
+import argparse
+import asyncio
+import random
+import re
+import uuid
+from xml.sax.saxutils import unescape
+
+FAULTS = ('reject', 'drop', 'stall', 'corrupt')
+
+# MPEG-2 Layer III, 48 kbps, 24 kHz, 单声道, 无 CRC；边信息全零即一帧静音 (144 字节, 24 ms)
+SILENT_FRAME = b'\xff\xf3\x64\xc4' + b'\x00' * 140
+FRAME_SECONDS = 0.024
+# 每条音频消息包含的帧数
+FRAMES_PER_MESSAGE = 20
+DEFAULT_SECONDS_PER_CHAR = 0.2
+
+_PROSODY_RE = re.compile(r'<prosody[^>]*>(.*?)</prosody>', re.DOTALL)
+
+
+def _text_message(request_id, path, body=''):
+    return (f"X-RequestId:{request_id}\r\nContent-Type:application/json; charset=utf-8\r\n"
+            f"Path:{path}\r\n\r\n{body}")
+
+
+def _binary_message(request_id, path, data):
+    header = f"X-RequestId:{request_id}\r\nContent-Type:audio/mpeg\r\nPath:{path}\r\n".encode()
+    return len(header).to_bytes(2, 'big') + header + data
+
+
+class FakeTTSServer:
+    """模拟的合成服务。latency 为收到请求到开始发送音频的固定延迟，另加 [0, jitter) 的随机延迟 (s)"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, fail_rate=0.0,
+                 faults=FAULTS, seconds_per_char=DEFAULT_SECONDS_PER_CHAR, seed=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.faults = tuple(faults)
+        self.seconds_per_char = seconds_per_char
+        self.requests = 0
+        self.injected = dict.fromkeys(FAULTS, 0)
+        self._random = random.Random(seed)
+        self._runner = None
+
+    @property
+    def url(self):
+        """供 EDGETTS_PLAYER_WSS_URL 使用的地址（edge-tts 会在其后追加 &ConnectionId=... 等参数）"""
+        return f"ws://{self.host}:{self.port}/edge/v1?TrustedClientToken=fake"
+
+    def audio_for(self, text):
+        """该文本对应的完整音频"""
+        frames = max(1, round(len(text) * self.seconds_per_char / FRAME_SECONDS))
+        return SILENT_FRAME * frames
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _pick_fault(self):
+        if self.faults and self._random.random() < self.fail_rate:
+            fault = self._random.choice(self.faults)
+            self.injected[fault] += 1
+            return fault
+        return None
+
+    async def _handle(self, request):
+        from aiohttp import web, WSMsgType
+
+        self.requests += 1
+        fault = self._pick_fault()
+        if fault == 'reject':
+            return web.Response(status=429, text='Too Many Requests')
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        text = None
+        async for msg in ws:
+            if msg.type == WSMsgType.TEXT and 'Path:ssml' in msg.data:
+                m = _PROSODY_RE.search(msg.data)
+                text = unescape(m.group(1)) if m else ''
+                break
+        if text is None:
+            return ws
+        await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        if fault == 'drop':
+            await ws.close()
+            return ws
+
+        request_id = uuid.uuid4().hex
+        audio = self.audio_for(text)
+        step = len(SILENT_FRAME) * FRAMES_PER_MESSAGE
+        half = len(audio) // 2
+        try:
+            await ws.send_str(_text_message(request_id, 'turn.start', '{}'))
+            for offset in range(0, len(audio), step):
+                if fault in ('stall', 'corrupt') and offset >= half > 0:
+                    if fault == 'corrupt':
+                        await ws.send_bytes(_binary_message(request_id, 'bogus', b'\x00'))
+                    else:
+                        await ws.receive()  # 直到客户端超时断开
+                    break
+                await ws.send_bytes(_binary_message(request_id, 'audio', audio[offset:offset + step]))
+            else:
+                await ws.send_str(_text_message(request_id, 'turn.end', '{}'))
+            await ws.close()
+        except ConnectionResetError:
+            pass  # 客户端已断开（超时或对冲请求被取消）
+        return ws
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m edgetts_player.fake_tts',
+                                     description="本地模拟的 edge-tts 服务（注入延迟与故障）")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2, help="首块音频前的固定延迟 (s)")
+    parser.add_argument('--jitter', type=float, default=0.5, help="额外的随机延迟上限 (s)")
+    parser.add_argument('--fail-rate', type=float, default=0.1, help="注入故障的概率 (0-1)")
+    parser.add_argument('--faults', default=','.join(FAULTS), help="可注入的故障类型，逗号分隔")
+    parser.add_argument('--seconds-per-char', type=float, default=DEFAULT_SECONDS_PER_CHAR,
+                        help="每字对应的音频时长 (s)")
+    args = parser.parse_args(argv)
+
+    async def _serve():
+        server = FakeTTSServer(args.host, args.port, args.latency, args.jitter, args.fail_rate,
+                               [f for f in args.faults.split(',') if f], args.seconds_per_char)
+        async with server:
+            print(f"EDGETTS_PLAYER_WSS_URL='{server.url}'", flush=True)
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
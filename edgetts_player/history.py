@@ -0,0 +1,143 @@
+"""播放历史与全局设置的存储。
+
+启动时读入内存一次，之后读写都在内存中完成；修改先标记为脏，
+延迟 flush_delay 秒合并后以 JSON 行追加到日志文件（<历史文件>.journal），每次写入 O(1)，
+与历史中的书籍数量无关。日志超过 compact_bytes 时合并回快照（原 .playback_history.json，格式不变）。
+
+- 快照用临时文件 + os.replace 写入；日志只追加，崩溃时最多丢失未落盘的最后一行
+- 追加与合并在跨进程文件锁内进行，多个实例同时运行时按写入顺序后写者生效
+"""
+import json
+import os
+import threading
+
+from .config import HISTORY_FILE
+from .locking import FileLock
+
+JOURNAL_SUFFIX = '.journal'
+DEFAULT_FLUSH_DELAY = 2.0
+DEFAULT_COMPACT_BYTES = 256 * 1024
+
+
+def _read_state(path):
+    """读取快照并重放日志，返回 (dict, 日志字节数)"""
+    data = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        pass
+    if not isinstance(data, dict):
+        data = {}
+    journal_bytes = 0
+    try:
+        with open(path + JOURNAL_SUFFIX, 'rb') as f:
+            for line in f:
+                journal_bytes += len(line)
+                try:
+                    key, value = json.loads(line)
+                except (ValueError, TypeError):
+                    continue  # 崩溃时写了一半的行
+                if value is None:
+                    data.pop(key, None)
+                else:
+                    data[key] = value
+    except OSError:
+        pass
+    return data, journal_bytes
+
+
+class HistoryStore:
+    """内存中的历史记录，延迟批量持久化。可在任意线程调用"""
+
+    def __init__(self, path=HISTORY_FILE, flush_delay=DEFAULT_FLUSH_DELAY,
+                 compact_bytes=DEFAULT_COMPACT_BYTES):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.compact_bytes = compact_bytes
+        self._file_lock = FileLock(path + '.lock')
+        self._lock = threading.Lock()
+        self._dirty = {}
+        self._timer = None
+        self._data, self._journal_bytes = _read_state(path)
+
+    def get(self, key, default=None):
+        """返回记录；值为 dict 时请勿原地修改，修改后用 set 写回"""
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key, value):
+        """更新记录（值需可 JSON 序列化），延迟落盘；值未变化时不产生写入"""
+        with self._lock:
+            if self._data.get(key) == value:
+                return
+            self._data[key] = value
+            self._dirty[key] = value
+            self._schedule_locked()
+
+    def delete(self, key):
+        with self._lock:
+            if key not in self._data:
+                return
+            del self._data[key]
+            self._dirty[key] = None
+            self._schedule_locked()
+
+    def _schedule_locked(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """把积累的修改追加到日志；日志过大时合并回快照"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+        lines = ''.join(json.dumps([k, v], ensure_ascii=False) + '\n' for k, v in dirty.items())
+        data = lines.encode('utf-8')
+        try:
+            with self._file_lock:
+                with open(self.path + JOURNAL_SUFFIX, 'a+b') as f:
+                    if f.seek(0, os.SEEK_END) > 0:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b'\n':
+                            data = b'\n' + data  # 上次崩溃留下半行，另起一行
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_bytes += len(data)
+                if self._journal_bytes >= self.compact_bytes:
+                    self.compact()
+        except OSError:
+            # 写入失败时保留修改，下次再试
+            with self._lock:
+                for k, v in dirty.items():
+                    self._dirty.setdefault(k, v)
+                self._schedule_locked()
+
+    def compact(self):
+        """把快照与日志（含其他实例写入的部分）合并为新快照，并清空日志"""
+        with self._file_lock:
+            merged, _ = _read_state(self.path)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            open(self.path + JOURNAL_SUFFIX, 'wb').close()
+            self._journal_bytes = 0
+        with self._lock:
+            # 带上其他实例的修改，本实例尚未落盘的修改优先
+            merged.update((k, v) for k, v in self._dirty.items() if v is not None)
+            for k, v in self._dirty.items():
+                if v is None:
+                    merged.pop(k, None)
+            self._data = merged
+
+    def close(self):
+        """退出前调用：立即写入所有修改"""
+        self.flush()
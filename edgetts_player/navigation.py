@@ -0,0 +1,109 @@
+"""章节检测与章节 ↔ 片段导航索引。
+
+- detect_chapters: 没有目录的格式（TXT / PDF / DOCX / MOBI 等）用一个预编译正则单遍扫描全文，
+  识别 "第N章/回/卷"、"Chapter N"、Markdown 标题等行；识别不到时退回按分节（PDF 为页）划分
+- NavigationIndex: 章节起始偏移与片段起始偏移均为升序，两个方向都用二分查找，
+  章节数、片段数再大也是 O(log n)。片段会跨行合并，章节标题常落在片段中间，
+  因此章节对应的是包含其起始偏移的片段，从该片段播放不会漏掉标题
+"""
+import re
+from bisect import bisect_right
+
+from .chunk_index import span_starts
+
+# 行首（允许缩进）的章节标题，整行不超过约 50 字，避免把正文句子当作标题
+CHAPTER_HEADING_RE = re.compile(
+    r'^[ \t　]*('
+    r'第[零〇一二两三四五六七八九十百千万\d]{1,8}[章节回卷部集篇]'
+    r'|(?:chapter|part|book)\s+(?:\d{1,4}|[ivxlc]{1,8})\b'
+    r'|#{1,3}[ \t]'
+    r'|(?:序章|序言|楔子|引子|尾声|后记|番外)'
+    r')[^\n]{0,40}$',
+    re.MULTILINE | re.IGNORECASE,
+)
+
+# 至少识别出这么多标题才采用，否则视为误判
+MIN_DETECTED_CHAPTERS = 2
+TITLE_MAX_CHARS = 40
+
+
+def detect_chapters(text, section_starts=None, section_label='节'):
+    """检测章节，返回 [(标题, 起始字符偏移), ...] 或 None。
+
+    section_starts 为各分节起始偏移（PDF 为各页），标题检测不到时按分节生成章节。
+    """
+    chapters = []
+    for m in CHAPTER_HEADING_RE.finditer(text):
+        title = m.group(0).strip().lstrip('#').strip()
+        chapters.append((title[:TITLE_MAX_CHARS], m.start(1)))
+    if len(chapters) >= MIN_DETECTED_CHAPTERS:
+        return chapters
+    if not section_starts or len(section_starts) < 2:
+        return None
+    chapters = []
+    last = -1
+    for i, start in enumerate(section_starts, 1):
+        if start == last or start >= len(text):
+            continue  # 空分节与下一个分节起始偏移相同
+        last = start
+        line = text[start:start + 200].strip().split('\n', 1)[0].strip()
+        chapters.append((f"第 {i} {section_label} {line[:TITLE_MAX_CHARS]}".rstrip(), start))
+    return chapters if len(chapters) >= MIN_DETECTED_CHAPTERS else None
+
+
+def chapter_first_chunks(chapters, positions):
+    """各章节的首个片段序号（包含章节起始偏移的片段）"""
+    starts = span_starts(positions)
+    return [max(bisect_right(starts, offset) - 1, 0) for _, offset in chapters]
+
+
+class NavigationIndex:
+    """章节 ↔ 片段的双向索引。
+
+    first_chunks 为各章节首个片段序号，可来自断句缓存；省略或与章节数不符时按偏移二分计算。
+    """
+
+    def __init__(self, chapters, positions, first_chunks=None):
+        self.chapters = chapters
+        self._chunk_count = len(positions)
+        if first_chunks is None or len(first_chunks) != len(chapters):
+            first_chunks = chapter_first_chunks(chapters, positions)
+        self.first_chunks = first_chunks
+
+    @classmethod
+    def build(cls, chapters, positions):
+        """章节或片段为空时返回 None；片段序列带缓存的 chapter_chunks 时直接使用"""
+        if not chapters or not len(positions):
+            return None
+        return cls(chapters, positions, getattr(positions, 'chapter_chunks', None))
+
+    def __len__(self):
+        return len(self.first_chunks)
+
+    def chunk_for_chapter(self, chapter):
+        """章节的首个片段序号"""
+        return self.first_chunks[chapter]
+
+    def chapter_for_chunk(self, chunk):
+        """片段所属章节（首个片段不晚于它的最后一个章节），在第一章之前返回 0"""
+        return max(bisect_right(self.first_chunks, chunk) - 1, 0)
+
+    def chunk_range(self, chapter):
+        """章节覆盖的片段序号区间 [first, end)；多个章节落在同一片段时各自包含该片段"""
+        first = self.first_chunks[chapter]
+        if chapter + 1 < len(self.first_chunks):
+            return first, max(self.first_chunks[chapter + 1], first + 1)
+        return first, self._chunk_count
+
+    def contains(self, chapter, chunk):
+        """片段是否在章节范围内"""
+        first, end = self.chunk_range(chapter)
+        return first <= chunk < end
+
+
+def filter_chapters(chapters, keyword):
+    """标题包含关键词（不区分大小写）的章节序号列表（升序），关键词为空返回 None 表示全部"""
+    keyword = keyword.strip().casefold()
+    if not keyword:
+        return None
+    return [i for i, (title, _) in enumerate(chapters) if keyword in title.casefold()]
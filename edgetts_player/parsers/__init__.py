@@ -0,0 +1,167 @@
+"""按扩展名注册的格式解析器。
+
+解析器签名为 parse(path: pathlib.Path) -> (纯文本, 章节列表或 None)。
+内置解析器以 "模块:函数" 字符串登记，只有首次打开该格式时才导入对应模块
+及其依赖库（BeautifulSoup、ebooklib、PyPDF2 等），因此只打开 .txt 时不会加载它们。
+新格式调用 register_parser 即可接入，无需修改 read_book_file。
+
+支持按章节/页随机读取的格式还可登记 sections 打开函数，返回 SectionReader，
+用于流式加载：先解析需要的分节，其余分节在后台补齐。
+不使用磁盘缓存时（如 load_book(use_cache=False)）以 sections(path, cache_dir=None) 调用。
+"""
+import importlib
+import multiprocessing
+import os
+
+_REGISTRY = {}  # 扩展名 -> [解析函数 或 "模块:函数", 分节打开函数 或 "模块:函数" 或 None]
+
+
+class SectionReader:
+    """可按分节（章节 / 页）随机读取的文档。
+
+    子类实现 __len__ 与 read(index)，read 返回 (标题或 None, 文本)，文本为空的分节在拼接时跳过。
+    批量读取走 read_many，可由子类改为并行实现（如 PDF 多进程逐页提取）。
+    has_chapters 为 True 时，拼接结果带章节列表（标题为 None 的分节按序号命名）；
+    否则拼接后检测章节标题，检测不到时按分节生成章节，标题中分节称为 section_label。
+    """
+
+    has_chapters = False
+    chapters = None
+    section_label = '节'
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def read(self, index):
+        raise NotImplementedError
+
+    def read_many(self, indices, progress=None):
+        """按给定顺序读取多个分节，progress(done, total) 在每个分节读完后回调"""
+        indices = list(indices)
+        parts = []
+        for i in indices:
+            parts.append(self.read(i))
+            if progress:
+                progress(len(parts), len(indices))
+        return parts
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class WholeBookReader(SectionReader):
+    """把只支持整本解析的 parse(path) 包装为单一分节"""
+
+    def __init__(self, parse, path):
+        self._parse = parse
+        self._path = path
+
+    def __len__(self):
+        return 1
+
+    def read(self, index):
+        text, self.chapters = self._parse(self._path)
+        return None, text
+
+
+def assemble_sections(reader, parts):
+    """按分节顺序拼接 [(标题, 文本), ...]，返回 (全文, 章节列表或 None, 各分节起始偏移)。
+
+    空分节不占位，其起始偏移与下一个分节相同，便于用 bisect 由字符偏移反查分节。
+    格式本身没有目录时用 detect_chapters 检测章节。
+    """
+    texts = []
+    chapters = [] if reader.has_chapters else None
+    section_starts = []
+    current_pos = 0
+    for title, text in parts:
+        section_starts.append(current_pos)
+        if not text:
+            continue
+        if chapters is not None:
+            chapters.append((title or f"章节 {len(chapters) + 1}", current_pos))
+        texts.append(text)
+        current_pos += len(text) + 1  # +1 是因为后面用 \n join
+    if chapters is None and reader.chapters is not None:
+        chapters = reader.chapters
+    text = '\n'.join(texts)
+    if not chapters:
+        from ..navigation import detect_chapters
+        chapters = detect_chapters(text, section_starts, reader.section_label)
+    return text, chapters, section_starts
+
+
+def read_all_sections(reader, progress=None):
+    """读取全部分节并按顺序拼接"""
+    return assemble_sections(reader, reader.read_many(range(len(reader)), progress))
+
+
+def pool_workers(workers=None):
+    """并行解析使用的进程数；已在其他进程池（如批量转换的解析进程）中时返回 1，避免嵌套进程池"""
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return max(1, workers or os.cpu_count() or 1)
+
+
+def _normalize_ext(ext):
+    ext = ext.lower()
+    return ext if ext.startswith('.') else '.' + ext
+
+
+def _resolve(target):
+    if isinstance(target, str):
+        module_name, _, func_name = target.partition(':')
+        target = getattr(importlib.import_module(module_name), func_name)
+    return target
+
+
+def register_parser(extensions, parser, sections=None):
+    """登记解析器。parser / sections 为可调用对象，或 'package.module:function' 形式的延迟导入目标。
+
+    sections(path, cache_dir=...) 返回 SectionReader，cache_dir 为 None 时不得读写磁盘缓存；
+    省略时整本解析视为单一分节。
+    """
+    if isinstance(extensions, str):
+        extensions = (extensions,)
+    for ext in extensions:
+        _REGISTRY[_normalize_ext(ext)] = [parser, sections]
+
+
+def get_parser(ext):
+    """返回扩展名对应的解析函数（必要时此时才导入模块），未登记返回 None"""
+    entry = _REGISTRY.get(_normalize_ext(ext))
+    if entry is None:
+        return None
+    entry[0] = _resolve(entry[0])
+    return entry[0]
+
+
+def open_sections(ext, path, use_cache=True):
+    """打开文档的分节读取器，未登记的扩展名返回 None；use_cache 为 False 时不读写逐分节缓存"""
+    entry = _REGISTRY.get(_normalize_ext(ext))
+    if entry is None:
+        return None
+    if entry[1] is None:
+        return WholeBookReader(get_parser(ext), path)
+    entry[1] = _resolve(entry[1])
+    if use_cache:
+        return entry[1](path)
+    return entry[1](path, cache_dir=None)
+
+
+def supported_extensions():
+    return tuple(_REGISTRY)
+
+
+register_parser(('.txt', '.md'), __name__ + '.text_parser:parse')
+register_parser(('.html', '.htm'), __name__ + '.html_parser:parse')
+register_parser('.epub', __name__ + '.epub_parser:parse', __name__ + '.epub_parser:open_sections')
+register_parser('.mobi', __name__ + '.mobi_parser:parse', __name__ + '.mobi_parser:open_sections')
+register_parser('.pdf', __name__ + '.pdf_parser:parse', __name__ + '.pdf_parser:open_sections')
+register_parser('.docx', __name__ + '.docx_parser:parse')
@@ -0,0 +1,9 @@
+from docx import Document as DocxDocument
+
+
+def parse(path):
+    """DOCX: python-docx 段落提取"""
+    doc = DocxDocument(str(path))
+    texts = [p.text for p in doc.paragraphs if p.text.strip()]
+    text = '\n'.join(texts)
+    return text, None
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+import ebooklib
+from ebooklib import epub
+
+from . import SectionReader, pool_workers, read_all_sections
+from ..config import CACHE_DIR
+
+SIMPLE_CHAPTER_RE = re.compile(r'^第[零一二三四五六七八九十百千万\d]+[章节回卷部]$')
+
+# 条目缓存目录：按条目 HTML 内容哈希存放提取结果，与 EPUB 文件本身无关，
+# 重新打包、只改了少数章节的 EPUB 只需重新解析改动的条目
+ITEM_CACHE_DIRNAME = 'epub_items'
+# 标题推断规则变化时递增，使旧的条目缓存失效
+EXTRACT_VERSION = 1
+# 待解析条目少于此值时直接在当前进程解析，避免进程池启动开销
+PARALLEL_MIN_ITEMS = 16
+
+
+def extract_item(content):
+    """解析一个 spine 条目的 HTML，返回 (标题或 None, 文本)"""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # 清理无关标签
+    for tag in soup(['script', 'style']):
+        tag.decompose()
+
+    item_text = soup.get_text(separator='\n', strip=True)
+    if not item_text:
+        return None, ''
+
+    lines = [line.strip() for line in item_text.split('\n') if line.strip()]
+
+    # 1. 尝试从 h1-h3 提取（合并前三个头，防止标题被拆分如 <h2>第一章</h2> <h2>惊蛰</h2>）
+    headers = soup.find_all(['h1', 'h2', 'h3'])
+    header_texts = [h.get_text().strip() for h in headers if h.get_text().strip()]
+    title_text = " ".join(header_texts[:3])
+
+    # 2. 如果没有标题，尝试用 title 标签
+    if not title_text or len(title_text) > 100:
+        title_tag = soup.find('title')
+        title_text = title_tag.get_text().strip() if title_tag else ""
+
+    # 3. 如果提取出来只有 "第N章" 等，尝试去正文找副标题
+    is_simple_chapter = SIMPLE_CHAPTER_RE.match(title_text.strip())
+    if is_simple_chapter and lines:
+        # 往后找，寻找正文中第一章的下一行，考虑换行符和段落
+        for i in range(min(5, len(lines) - 1)):
+            # 如果找到了这行，而且下一行不是很长，很可能就是具体的小标题
+            if lines[i] == title_text.strip():
+                if len(lines[i+1]) <= 20:
+                    title_text += " " + lines[i+1]
+                break
+
+    # 4. 终极兜底策略：如果标题还是无效或空，截取正文；仍为空时由拼接方按序号命名
+    if not title_text or len(title_text) > 100 or title_text.lower().startswith('unknown'):
+        if lines:
+            fallback = " ".join(lines[:2])
+            title_text = fallback[:40] + ("..." if len(fallback) > 40 else "")
+        else:
+            title_text = None
+
+    return title_text, item_text
+
+
+def item_key(content):
+    """条目缓存键：提取规则版本 + HTML 内容的 sha1"""
+    return hashlib.sha1(b'v%d\0' % EXTRACT_VERSION + content).hexdigest()
+
+
+class EpubSections(SectionReader):
+    """EPUB: 每个 spine 条目为一个分节，可按任意顺序解析。
+
+    - 解析结果按条目内容哈希缓存在 .book_cache/epub_items/，cache_dir 为 None 时不读写缓存
+    - read_many 在条目较多时用进程池并行解析，按 spine 顺序返回
+    """
+
+    has_chapters = True
+
+    def __init__(self, path, workers=None, cache_dir=CACHE_DIR):
+        book = epub.read_epub(str(path))
+
+        # 使用 spine 保证阅读顺序
+        spine_items = []
+        for item_id, _ in book.spine:
+            item = book.get_item_with_id(item_id)
+            if item and isinstance(item, ebooklib.epub.EpubHtml):
+                spine_items.append(item)
+
+        if not spine_items:
+            # 兜底
+            spine_items = list(book.get_items_of_type(ebooklib.ITEM_DOCUMENT))
+        self._items = spine_items
+        self.workers = workers
+        self._cache_dir = None if cache_dir is None else os.path.join(cache_dir, ITEM_CACHE_DIRNAME)
+
+    def __len__(self):
+        return len(self._items)
+
+    # ---------- 条目缓存 ----------
+
+    def _cache_path(self, key):
+        return os.path.join(self._cache_dir, key[:2], key + '.json')
+
+    def _load_item(self, key):
+        if self._cache_dir is None:
+            return None
+        path = self._cache_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                title, text = json.load(f)
+            os.utime(path)  # 刷新最近访问时间，供 .book_cache 按 LRU 淘汰
+            return title, text
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _save_item(self, key, result):
+        if self._cache_dir is None:
+            return
+        path = self._cache_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    # ---------- 读取 ----------
+
+    def read(self, index):
+        content = self._items[index].get_content()
+        key = item_key(content)
+        result = self._load_item(key)
+        if result is None:
+            result = extract_item(content)
+            self._save_item(key, result)
+        return result
+
+    def read_many(self, indices, progress=None):
+        indices = list(indices)
+        total = len(indices)
+        results = {}
+        missing = []  # [(分节序号, 缓存键, HTML 内容), ...]
+        for i in indices:
+            content = self._items[i].get_content()
+            key = item_key(content)
+            cached = self._load_item(key)
+            if cached is None:
+                missing.append((i, key, content))
+            else:
+                results[i] = cached
+        done = total - len(missing)
+        if progress and done:
+            progress(done, total)
+
+        workers = pool_workers(self.workers)
+        if workers < 2 or len(missing) < PARALLEL_MIN_ITEMS:
+            extracted = (extract_item(content) for _, _, content in missing)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            chunksize = max(1, len(missing) // (workers * 4))
+            extracted = executor.map(extract_item, [content for _, _, content in missing],
+                                     chunksize=chunksize)
+        try:
+            # map 按提交顺序返回结果，即 spine 顺序
+            for (i, key, _), result in zip(missing, extracted):
+                results[i] = result
+                self._save_item(key, result)
+                done += 1
+                if progress:
+                    progress(done, total)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        return [results[i] for i in indices]
+
+
+def open_sections(path, cache_dir=CACHE_DIR):
+    return EpubSections(path, cache_dir=cache_dir)
+
+
+def parse(path, progress=None):
+    """EPUB: 按 spine 顺序提取各章节文本并推断章节标题（条目多时多进程并行）"""
+    with open_sections(path) as reader:
+        text, chapters, _ = read_all_sections(reader, progress)
+    return text, chapters
@@ -0,0 +1,14 @@
+from bs4 import BeautifulSoup
+
+
+def html_to_text(html):
+    """去掉 script/style 后提取 HTML 中的纯文本"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style']):
+        tag.decompose()
+    return soup.get_text(separator='\n', strip=True)
+
+
+def parse(path):
+    """网页: BeautifulSoup 提取文本"""
+    return html_to_text(path.read_text(encoding='utf-8')), None
@@ -0,0 +1,49 @@
+import pathlib
+import shutil
+import tempfile
+
+import mobi
+
+from . import SectionReader, read_all_sections
+from .html_parser import html_to_text
+
+
+class MobiSections(SectionReader):
+    """MOBI: 解包后的每个 HTML 文件为一个分节，关闭时删除解包目录"""
+
+    def __init__(self, path):
+        self._tmp_dir = tempfile.mkdtemp(prefix='mobi_extract_')
+        try:
+            extracted_path, _ = mobi.extract(str(path), self._tmp_dir)
+            extracted = pathlib.Path(extracted_path)
+            html_files = list(extracted.rglob('*.html')) + list(extracted.rglob('*.htm'))
+            if not html_files:
+                html_files = [extracted] if extracted.is_file() else []
+        except Exception:
+            self.close()
+            raise
+        self._html_files = html_files
+
+    def __len__(self):
+        return len(self._html_files)
+
+    def read(self, index):
+        try:
+            return None, html_to_text(self._html_files[index].read_text(encoding='utf-8', errors='ignore'))
+        except Exception:
+            return None, ''
+
+    def close(self):
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+def open_sections(path, cache_dir=None):
+    # 解包到临时目录，关闭时删除，不使用磁盘缓存
+    return MobiSections(path)
+
+
+def parse(path):
+    """MOBI: mobi 库解包后提取其中 HTML 的文本"""
+    with open_sections(path) as reader:
+        text, chapters, _ = read_all_sections(reader)
+    return text, chapters
@@ -0,0 +1,153 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PyPDF2 import PdfReader
+
+from . import SectionReader, pool_workers, read_all_sections
+from ..book_cache import get_file_hash
+from ..config import CACHE_DIR
+
+# 待提取页数少于此值时直接在当前进程提取，避免进程池启动开销
+PARALLEL_MIN_PAGES = 32
+# 每个子任务提取的页数，摊薄进程间通信开销
+PAGES_PER_TASK = 8
+# 并行提取时每完成这么多页追加一次逐页缓存，中断后可续用
+CACHE_FLUSH_PAGES = 200
+
+_worker_reader = None
+
+
+def _init_worker(path):
+    global _worker_reader
+    _worker_reader = PdfReader(path)
+
+
+def _extract_pages(indices):
+    return [(i, _worker_reader.pages[i].extract_text() or '') for i in indices]
+
+
+class PdfSections(SectionReader):
+    """PDF: 每页为一个分节。
+
+    - 逐页文本缓存在 .book_cache/<文件哈希>_pdf_pages.jsonl（首行为页数，其后每行 [页序号, 文本]），
+      新提取的页只追加写入；再次打开或中断后只提取缺失的页。cache_dir 为 None 时不读写缓存
+    - read_many 在页数较多时用进程池并行提取，按页序重组
+    """
+
+    section_label = '页'
+
+    def __init__(self, path, workers=None, cache_dir=CACHE_DIR):
+        self._path = str(path)
+        self._reader = PdfReader(self._path)
+        self._count = len(self._reader.pages)
+        self.workers = workers
+        self._cache_path = None
+        if cache_dir is not None:
+            self._cache_path = os.path.join(cache_dir, f"{get_file_hash(path)}_pdf_pages.jsonl")
+        self._cache_valid = False   # 缓存文件完整且页数相符，可直接追加
+        self._unsaved = []          # 已提取、尚未写入缓存的页序号
+        self._pages = self._load_page_cache()
+
+    def __len__(self):
+        return self._count
+
+    # ---------- 逐页缓存 ----------
+
+    def _load_page_cache(self):
+        pages = {}
+        if self._cache_path is None:
+            return pages
+        try:
+            with open(self._cache_path, 'r', encoding='utf-8') as f:
+                if json.loads(f.readline()).get('page_count') != self._count:
+                    return pages
+                for line in f:
+                    if not line.endswith('\n'):
+                        return pages  # 中断时写了一半的末行：保留已读的页，下次保存时整体重写
+                    i, text = json.loads(line)
+                    pages[int(i)] = text
+            self._cache_valid = True
+        except (OSError, ValueError, AttributeError, TypeError):
+            pass
+        return pages
+
+    def _save_page_cache(self):
+        """追加尚未写入的页；缓存文件不存在、页数不符或末行不完整时整体重写一次"""
+        if self._cache_path is None or not self._unsaved:
+            return
+        if self._cache_valid:
+            mode, lines = 'a', []
+            indices = self._unsaved
+        else:
+            mode, lines = 'w', [json.dumps({'page_count': self._count})]
+            indices = sorted(self._pages)
+        lines.extend(json.dumps([i, self._pages[i]], ensure_ascii=False) for i in indices)
+        try:
+            os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
+            with open(self._cache_path, mode, encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            self._cache_valid = True
+            self._unsaved = []
+        except OSError:
+            pass
+
+    # ---------- 读取 ----------
+
+    def read(self, index):
+        text = self._pages.get(index)
+        if text is None:
+            text = self._reader.pages[index].extract_text() or ''
+            self._pages[index] = text
+            self._unsaved.append(index)
+        return None, text
+
+    def read_many(self, indices, progress=None):
+        indices = list(indices)
+        total = len(indices)
+        missing = [i for i in indices if i not in self._pages]
+        done = total - len(missing)
+        if progress and done:
+            progress(done, total)
+
+        workers = pool_workers(self.workers)
+        if workers < 2 or len(missing) < PARALLEL_MIN_PAGES:
+            for i in missing:
+                self.read(i)
+                done += 1
+                if progress:
+                    progress(done, total)
+        else:
+            batches = [missing[k:k + PAGES_PER_TASK] for k in range(0, len(missing), PAGES_PER_TASK)]
+            since_flush = 0
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self._path,)) as executor:
+                futures = [executor.submit(_extract_pages, batch) for batch in batches]
+                for future in as_completed(futures):
+                    results = future.result()
+                    for i, text in results:
+                        self._pages[i] = text
+                        self._unsaved.append(i)
+                    done += len(results)
+                    since_flush += len(results)
+                    if since_flush >= CACHE_FLUSH_PAGES:
+                        self._save_page_cache()
+                        since_flush = 0
+                    if progress:
+                        progress(done, total)
+        return [(None, self._pages[i]) for i in indices]
+
+    def close(self):
+        # 正常结束与中断（异常、停止加载）都经过这里，补写剩余的页
+        self._save_page_cache()
+
+
+def open_sections(path, cache_dir=CACHE_DIR):
+    return PdfSections(path, cache_dir=cache_dir)
+
+
+def parse(path, progress=None):
+    """PDF: PyPDF2 逐页提取文本（页数多时多进程并行），progress(done, total) 报告已提取页数"""
+    with open_sections(path) as reader:
+        text, chapters, _ = read_all_sections(reader, progress)
+    return text, chapters
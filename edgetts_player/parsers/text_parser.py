@@ -0,0 +1,3 @@
+def parse(path):
+    """纯文本 / Markdown: 直接读取"""
+    return path.read_text(encoding='utf-8'), None
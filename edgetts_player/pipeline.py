@@ -0,0 +1,272 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+
+# edge-tts 默认输出 audio-24khz-48kbitrate-mono-mp3，用于由字节数估算音频时长
+MP3_BYTES_PER_SECOND = 48000 // 8
+
+DEFAULT_PREFETCH_DEPTH = 3
+DEFAULT_PREFETCH_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_PREFETCH_MAX_SECONDS = 600
+
+
+class AsyncLoopThread:
+    """在常驻后台线程中运行的 asyncio 事件循环，供各处提交协程。"""
+
+    def __init__(self, name='tts-loop'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """线程安全地提交协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """提交协程并阻塞等待结果"""
+        return self.submit(coro).result(timeout)
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+
+def _audio_size(result):
+    if isinstance(result, (str, os.PathLike)):
+        try:
+            return os.path.getsize(result)
+        except OSError:
+            return 0
+    try:
+        return len(result)  # bytes / PooledAudio
+    except TypeError:
+        return 0
+
+
+def _release(result):
+    """归还未交付的内存音频（PooledAudio）"""
+    release = getattr(result, 'release', None)
+    if release is not None:
+        release()
+
+
+def _release_task(task):
+    if not task.cancelled() and task.exception() is None:
+        _release(task.result())
+
+
+class PrefetchPipeline:
+    """N 路并发预取：在共享事件循环中提前合成后续片段，按顺序交付给播放线程。
+
+    - 同时处于 合成中/已就绪未取走 状态的片段不超过 depth 个
+    - 已就绪片段的总字节数 / 估算时长超过预算时暂停预取
+    - 紧接着要播放的片段始终允许合成，不受预算限制，避免卡死
+    - synthesize(text, voice, rate, volume) 为协程函数，返回音频路径、字节或 PooledAudio；
+      关闭时未交付的 PooledAudio 会被释放回内存池
+    - params() 在每个片段开始合成时调用，返回 (voice, rate, volume)，
+      因此播放中途调整语速/音量会作用到后续片段
+    - chunks 可以是按需规划的序列（如 AdaptiveChunkPlan），每次提交前重新读取 len()；
+      on_synthesized(idx, 合成耗时, 音频字节数) 在每个片段合成完成后回调，供规划器测量吞吐
+    """
+
+    def __init__(self, loop_thread, synthesize, chunks, start_index, params,
+                 depth=DEFAULT_PREFETCH_DEPTH,
+                 max_bytes=DEFAULT_PREFETCH_MAX_BYTES,
+                 max_seconds=DEFAULT_PREFETCH_MAX_SECONDS,
+                 on_synthesized=None):
+        self._loop_thread = loop_thread
+        self._on_synthesized = on_synthesized
+        self._synthesize = synthesize
+        self._chunks = chunks
+        self._params = params
+        self.depth = max(1, depth)
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+
+        self._next_index = start_index   # 下一个待提交合成的片段
+        self._consumed = start_index     # 下一个将被取走的片段
+        self._tasks = {}                 # idx -> asyncio.Task
+        self._sizes = {}                 # idx -> 已就绪音频字节数
+        self._buffered_bytes = 0
+        self._cond = asyncio.Condition()
+        self._closed = False
+        self._producer = loop_thread.submit(self._produce())
+
+    # ---------- 事件循环内部 ----------
+
+    def _has_room(self):
+        ahead = self._next_index - self._consumed
+        if ahead <= 0:
+            return True
+        if ahead >= self.depth:
+            return False
+        if self._buffered_bytes >= self.max_bytes:
+            return False
+        return self._buffered_bytes / MP3_BYTES_PER_SECOND < self.max_seconds
+
+    async def _produce(self):
+        while self._next_index < len(self._chunks):
+            async with self._cond:
+                await self._cond.wait_for(self._has_room)
+                idx = self._next_index
+                self._next_index += 1
+                voice, rate, volume = self._params()
+                self._tasks[idx] = asyncio.ensure_future(
+                    self._synthesize_one(idx, voice, rate, volume)
+                )
+                self._cond.notify_all()
+
+    async def _synthesize_one(self, idx, voice, rate, volume):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await self._synthesize(self._chunks[idx], voice, rate, volume)
+        size = _audio_size(result)
+        if self._on_synthesized is not None:
+            self._on_synthesized(idx, loop.time() - started, size)
+        async with self._cond:
+            self._sizes[idx] = size
+            self._buffered_bytes += size
+            self._cond.notify_all()
+        return result
+
+    async def _take(self, idx):
+        async with self._cond:
+            await self._cond.wait_for(lambda: idx in self._tasks)
+        task = self._tasks[idx]
+        delivered = False
+        try:
+            result = await asyncio.shield(task)
+            delivered = True
+            return result
+        finally:
+            if not delivered and not task.done():
+                # 取用被取消（停止播放）：合成完成后释放结果
+                task.add_done_callback(_release_task)
+            async with self._cond:
+                self._tasks.pop(idx, None)
+                self._buffered_bytes -= self._sizes.pop(idx, 0)
+                self._consumed = max(self._consumed, idx + 1)
+                self._cond.notify_all()
+
+    async def _cancel_all(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            _release(result)
+        self._tasks.clear()
+        self._sizes.clear()
+        self._buffered_bytes = 0
+
+    # ---------- 供播放线程调用 ----------
+
+    def buffered_seconds(self):
+        """已合成完成、尚未取走的音频估算时长 (s)"""
+        return self._buffered_bytes / MP3_BYTES_PER_SECOND
+
+    def next_to_take(self):
+        """播放线程下一个要取走的片段序号"""
+        return self._consumed
+
+    def ready_count(self):
+        """已合成完成、尚未取走的片段数"""
+        return len(self._sizes)
+
+    def is_ready(self, idx):
+        return idx in self._sizes
+
+    def get(self, idx, stop_event=None):
+        """阻塞等待第 idx 个片段的合成结果；stop_event 置位时返回 None。
+
+        合成失败时抛出对应异常。
+        """
+        fut = self._loop_thread.submit(self._take(idx))
+        while True:
+            try:
+                return fut.result(timeout=0.1)
+            except concurrent.futures.TimeoutError:
+                if stop_event is not None and stop_event.is_set():
+                    if not fut.cancel() and fut.exception() is None:
+                        _release(fut.result())  # 恰好已完成，结果不再交付
+                    return None
+
+    def close(self):
+        """停止预取并取消所有未完成的合成"""
+        if self._closed:
+            return
+        self._closed = True
+        self._producer.cancel()
+        try:
+            self._loop_thread.run(self._cancel_all(), timeout=2)
+        except Exception:
+            pass
+
+
+class ProgressiveAudio:
+    """边合成边读取：在共享事件循环中合成一个片段，播放线程可在合成完成前读取已收到的 MP3 字节。
+
+    用于首个片段，收到开头几百毫秒的音频即可开始解码播放，不必等整段合成完。
+    合成经由 SynthesisClient：开始收到音频前的失败会重试，中途断流时整段重新合成。
+    persist 为 True 时合成完成后写入音频缓存（内存播放模式下不落盘）。
+    """
+
+    def __init__(self, loop_thread, cache, text, voice, rate, volume, persist=True):
+        self._data = bytearray()
+        self._cond = threading.Condition()
+        self.done = False
+        self.error = None
+        self._future = loop_thread.submit(self._run(cache, text, voice, rate, volume, persist))
+
+    async def _run(self, cache, text, voice, rate, volume, persist):
+        from .audio_cache import make_audio_key
+        from .resilience import StreamInterrupted, get_client
+
+        client = get_client()
+        try:
+            try:
+                async for data in client.stream(text, voice, rate, volume):
+                    with self._cond:
+                        self._data += data
+                        self._cond.notify_all()
+            except StreamInterrupted:
+                # 中途断流：整段重新合成后替换。同一文本的合成结果开头相同，已播放的部分不受影响
+                data = await client.synthesize(text, voice, rate, volume)
+                with self._cond:
+                    self._data = bytearray(data)
+                    self._cond.notify_all()
+            if persist and self._data:
+                cache.put(make_audio_key(text, voice, rate, volume), bytes(self._data))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def wait(self, min_bytes, stop_event=None):
+        """阻塞到已收到至少 min_bytes 字节或合成结束，返回 (已收到的字节, 是否结束)。
+
+        stop_event 置位时返回 (None, True)；合成失败时抛出对应异常。
+        """
+        with self._cond:
+            while len(self._data) < min_bytes and not self.done:
+                if stop_event is not None and stop_event.is_set():
+                    return None, True
+                self._cond.wait(0.1)
+            if self.error is not None:
+                raise self.error
+            return bytes(self._data), self.done
+
+    def cancel(self):
+        self._future.cancel()
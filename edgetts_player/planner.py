@@ -0,0 +1,163 @@
+"""播放的合成单元规划。
+
+片段编号（断句结果）始终不变，用于进度保存、高亮与章节导航；合成单元是在其上规划的:
+
+- FixedChunkPlan: 每个片段为一个单元（原有行为）
+- AdaptiveChunkPlan: 自适应单元长度。首个单元只取起始片段开头的一两句，尽快出声；
+  之后按实测的 合成耗时 / 音频时长 比率放大单元（合并相邻片段，只在片段边界即句子边界合并），
+  紧接着要播放的单元规划时已缓冲的音频不足则缩小该单元。
+  已有音频缓存的片段不合并也不截断，单独成为一个单元，直接命中缓存；只有真正联网合成的单元参与测量
+
+单元以序列形式交给 PrefetchPipeline，在预取线程首次取用时才规划，因此可以使用最新的测量结果。
+"""
+import threading
+from collections.abc import Sequence
+
+from .chunking import iter_chunk_spans
+
+# 首个单元的目标字数
+ADAPTIVE_FIRST_CHARS = 40
+# 单元最大字数为断句字数的这么多倍
+ADAPTIVE_MAX_FACTOR = 4
+# 合成比播放快这么多倍（比率低于此值）时放大单元
+ADAPTIVE_GROW_RATIO = 0.5
+# 已缓冲的音频少于此时长 (s) 时缩小单元
+ADAPTIVE_LOW_BUFFER_SECONDS = 3.0
+# 比率的指数滑动平均系数
+ADAPTIVE_EWMA = 0.3
+
+
+class FixedChunkPlan(Sequence):
+    """从 start 开始，每个片段为一个单元"""
+
+    def __init__(self, chunks, start=0):
+        self._chunks = chunks
+        self._start = start
+
+    def __len__(self):
+        return max(len(self._chunks) - self._start, 0)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError('unit index out of range')
+        return self._chunks[self._start + index]
+
+    def chunk_range(self, index):
+        """单元覆盖的片段序号 (first, last)"""
+        return self._start + index, self._start + index
+
+    def record(self, index, synth_seconds, audio_seconds):
+        pass
+
+
+def _never_cached(text):
+    return False
+
+
+class AdaptiveChunkPlan(FixedChunkPlan):
+    """自适应长度的合成单元。
+
+    record() 反馈每个单元的合成耗时与音频时长（命中缓存的单元不计入）。
+    is_cached(text) 判断片段是否已有音频缓存；buffer_seconds() 返回当前已缓冲的音频时长，
+    next_to_play() 返回播放线程下一个要取走的单元序号，两者都提供时才在缓冲不足时缩小单元（均可选）。
+    len() 在规划完成前是上界（已规划单元数 + 剩余片段数），只会变小，大于 index 时第 index 个单元必然存在。
+    """
+
+    def __init__(self, chunks, start=0, max_chars=200 * ADAPTIVE_MAX_FACTOR,
+                 first_chars=ADAPTIVE_FIRST_CHARS, buffer_seconds=None, next_to_play=None, is_cached=None):
+        super().__init__(chunks, start)
+        self.max_chars = max_chars
+        self.buffer_seconds = buffer_seconds
+        self.next_to_play = next_to_play
+        self.is_cached = is_cached or _never_cached
+        self.ratio = None             # 合成耗时 / 音频时长 的滑动平均
+        self._target = first_chars
+        self._units = []              # [(文本, 首个片段, 最后片段, 规划时是否已缓存), ...]
+        self._cursor = start          # 下一个未规划的片段
+        self._partial = None          # 起始片段被截断时剩余部分的文本
+        self._lock = threading.Lock()
+        if len(self):
+            self[0]  # 先规划首个单元，此后 len() 只会变小
+
+    def __len__(self):
+        with self._lock:
+            pending = len(self._chunks) - self._cursor + (self._partial is not None)
+            return len(self._units) + max(pending, 0)
+
+    def __getitem__(self, index):
+        with self._lock:
+            while len(self._units) <= index and self._plan_next():
+                pass
+            if not 0 <= index < len(self._units):
+                raise IndexError('unit index out of range')
+            return self._units[index][0]
+
+    def chunk_range(self, index):
+        return self._units[index][1], self._units[index][2]
+
+    def record(self, index, synth_seconds, audio_seconds):
+        if audio_seconds <= 0 or self._units[index][3]:
+            return  # 命中缓存的耗时接近 0，不反映合成速度
+        ratio = synth_seconds / audio_seconds
+        with self._lock:
+            self.ratio = ratio if self.ratio is None else (
+                ADAPTIVE_EWMA * ratio + (1 - ADAPTIVE_EWMA) * self.ratio)
+
+    def _starving(self):
+        """正在规划的单元紧接着就要播放，而已缓冲的音频不足"""
+        if self.buffer_seconds is None or self.next_to_play is None or len(self._units) <= 1:
+            return False
+        return len(self._units) <= self.next_to_play() and self.buffer_seconds() < ADAPTIVE_LOW_BUFFER_SECONDS
+
+    def _next_target(self):
+        if self.ratio is None:
+            return self._target
+        if self.ratio < ADAPTIVE_GROW_RATIO:
+            return min(self._target * 2, self.max_chars)
+        if self.ratio > 1:
+            return max(self._target // 2, 1)
+        return self._target
+
+    def _plan_next(self):
+        """规划下一个单元，没有剩余片段时返回 False"""
+        if self._partial is not None:
+            # 起始片段截断后的剩余部分单独成为一个单元
+            index = self._cursor - 1
+            self._units.append((self._partial, index, index, False))
+            self._partial = None
+            return True
+        if self._cursor >= len(self._chunks):
+            return False
+        first_index = self._cursor
+        first = self._chunks[first_index]
+        if self.is_cached(first):
+            # 已缓存的片段原样成为一个单元
+            self._units.append((first, first_index, first_index, True))
+            self._cursor += 1
+            return True
+        if not self._units:
+            spans = iter_chunk_spans(first, self._target)
+            head = next(spans, None)
+            if head is not None and head[1] < len(first.rstrip()):
+                # 起始片段较长：先合成开头一两句（在句子/子句边界截断）
+                self._units.append((first[head[0]:head[1]], first_index, first_index, False))
+                self._partial = first[head[1]:].strip()
+                self._cursor += 1
+                if not self._partial:
+                    self._partial = None
+                return True
+        self._target = self._next_target()
+        # 缓冲快耗尽时只缩短这一个单元，尽快产出下一段音频；已规划的目标长度不变
+        target = max(self._target // 2, 1) if self._starving() else self._target
+        texts = [first]
+        size = len(first)
+        self._cursor += 1
+        while self._cursor < len(self._chunks):
+            text = self._chunks[self._cursor]
+            if size + 1 + len(text) > target or self.is_cached(text):
+                break
+            texts.append(text)
+            size += 1 + len(text)
+            self._cursor += 1
+        self._units.append((' '.join(texts), first_index, self._cursor - 1, False))
+        return True
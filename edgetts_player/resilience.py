@@ -0,0 +1,247 @@
+"""容错的合成客户端：超时、带抖动的指数退避重试、慢请求对冲与 AIMD 自适应并发。
+
+- 超时: 每次请求从发起到首块、以及相邻两块音频之间都不得超过 read_timeout，长文本不会被误判
+- 重试: 参数错误（ValueError / TypeError）以外的失败按 base_delay * 2^n 的全抖动退避重试，
+  服务端限流（HTTP 429 / 503）时退避加倍
+- 对冲: 记录成功请求每字的耗时，某次请求超过同长度文本耗时的 hedge_percentile 分位仍未完成时，
+  再发一份相同的请求，先完成者胜出，另一份取消
+- 自适应并发: 失败或限流时并发上限减半（间隔 DECREASE_COOLDOWN 内只减一次），
+  连续成功达到当前上限次数后加一
+
+各事件循环（播放用的常驻循环、导出/批量转换的 asyncio.run）各有一个客户端，由 get_client() 取得。
+"""
+import asyncio
+import random
+import time
+import weakref
+from collections import deque
+
+# 首块 / 相邻两块音频之间的最长等待 (s)
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_RETRIES = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+# 触发对冲的耗时分位与所需的最少样本数
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 10
+# 对冲前至少等待 (s)，避免短文本频繁重复请求
+HEDGE_MIN_DELAY = 1.0
+LATENCY_WINDOW = 100
+# 并发上限的初始值与范围
+DEFAULT_CONCURRENCY = 4
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 16
+# 两次减半之间的最短间隔 (s)，同一波失败只减一次
+DECREASE_COOLDOWN = 1.0
+
+THROTTLE_STATUSES = (429, 503)
+
+
+class StreamInterrupted(Exception):
+    """流式合成在已产出部分音频后中断（无法续传，需整段重新合成）；原始异常见 __cause__"""
+
+
+def is_throttled(error):
+    """服务端限流（握手被拒，HTTP 429 / 503）"""
+    return getattr(error, 'status', None) in THROTTLE_STATUSES
+
+
+def is_retriable(error):
+    """参数错误是确定性的，重试无用；其余（网络、超时、协议、未收到音频）都可重试"""
+    return not isinstance(error, (ValueError, TypeError))
+
+
+class AdaptiveLimiter:
+    """AIMD 并发上限，用作 async with 的上下文管理器"""
+
+    def __init__(self, initial=DEFAULT_CONCURRENCY, minimum=MIN_CONCURRENCY, maximum=MAX_CONCURRENCY):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = min(max(initial, minimum), maximum)
+        self.in_flight = 0
+        self._successes = 0
+        self._last_decrease = None
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        """加性增: 连续成功 limit 次后上限加一"""
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self._successes = 0
+
+    def on_failure(self):
+        """乘性减: 上限减半"""
+        self._successes = 0
+        now = time.monotonic()
+        if self._last_decrease is not None and now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.limit = max(self.limit // 2, self.minimum)
+
+
+class SynthesisClient:
+    """容错的合成客户端。
+
+    source(text, voice, rate, volume) 为逐块产出 MP3 字节的异步生成器函数，默认 synth.stream_audio。
+    """
+
+    def __init__(self, source=None, read_timeout=DEFAULT_READ_TIMEOUT, retries=DEFAULT_RETRIES,
+                 base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY,
+                 hedge_percentile=HEDGE_PERCENTILE, limiter=None):
+        if source is None:
+            from .synth import stream_audio
+            source = stream_audio
+        self._source = source
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_percentile = hedge_percentile
+        self.limiter = limiter or AdaptiveLimiter()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)   # 成功请求的 耗时 / 字数
+        self.counters = dict.fromkeys(
+            ('requests', 'attempts', 'failures', 'timeouts', 'throttled', 'retries',
+             'hedges', 'hedge_wins'), 0)
+
+    # ---------- 对外接口 ----------
+
+    async def synthesize(self, text, voice, rate, volume):
+        """合成一段文本，返回完整的 MP3 字节；重试用尽后抛出最后一次的异常"""
+        self.counters['requests'] += 1
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged(text, voice, rate, volume)
+            except Exception as e:
+                if not is_retriable(e) or attempt >= self.retries:
+                    raise
+                await self._backoff(attempt, e)
+                attempt += 1
+
+    async def stream(self, text, voice, rate, volume):
+        """流式合成，逐块产出 MP3 字节。
+
+        产出首块之前的失败照常重试；之后中断时抛出 StreamInterrupted，由调用方改用 synthesize() 整段重试。
+        """
+        self.counters['requests'] += 1
+        attempt = 0
+        while True:
+            received = False
+            source = self._attempt(text, voice, rate, volume)
+            try:
+                async for data in source:
+                    received = True
+                    yield data
+                return
+            except Exception as e:
+                if received:
+                    raise StreamInterrupted(str(e)) from e
+                if not is_retriable(e) or attempt >= self.retries:
+                    raise
+                error = e
+            finally:
+                await source.aclose()  # 调用方提前停止读取时也立即归还并发名额
+            await self._backoff(attempt, error)
+            attempt += 1
+
+    def hedge_delay(self, text):
+        """该文本的请求等待多久仍未完成时发起对冲，样本不足时返回 None（不对冲）"""
+        if self.hedge_percentile is None or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        samples = sorted(self._latencies)
+        per_char = samples[min(int(self.hedge_percentile * len(samples)), len(samples) - 1)]
+        return max(per_char * max(len(text), 1), HEDGE_MIN_DELAY)
+
+    def stats(self):
+        return dict(self.counters, concurrency=self.limiter.limit, in_flight=self.limiter.in_flight)
+
+    # ---------- 内部 ----------
+
+    async def _attempt(self, text, voice, rate, volume):
+        """单次请求（占用一个并发名额），带读取超时，并据结果调整并发上限与耗时样本"""
+        async with self.limiter:
+            self.counters['attempts'] += 1
+            started = time.monotonic()
+            source = self._source(text, voice, rate, volume)
+            try:
+                while True:
+                    try:
+                        data = await asyncio.wait_for(source.__anext__(), self.read_timeout)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        self.counters['timeouts'] += 1
+                        raise
+                    yield data
+            except Exception as e:
+                self.counters['failures'] += 1
+                if is_retriable(e):
+                    self.limiter.on_failure()
+                raise
+            finally:
+                await source.aclose()
+            self._latencies.append((time.monotonic() - started) / max(len(text), 1))
+            self.limiter.on_success()
+
+    async def _collect(self, text, voice, rate, volume):
+        buf = bytearray()
+        async for data in self._attempt(text, voice, rate, volume):
+            buf += data
+        return bytes(buf)
+
+    async def _hedged(self, text, voice, rate, volume):
+        """发起请求，超过对冲阈值仍未完成时再发一份，返回先成功的结果"""
+        primary = asyncio.ensure_future(self._collect(text, voice, rate, volume))
+        tasks = {primary}
+        try:
+            delay = self.hedge_delay(text)
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.counters['hedges'] += 1
+                    tasks.add(asyncio.ensure_future(self._collect(text, voice, rate, volume)))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.counters['hedge_wins'] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _backoff(self, attempt, error):
+        self.counters['retries'] += 1
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        if is_throttled(error):
+            self.counters['throttled'] += 1
+            delay = min(self.max_delay, delay * 2)
+        await asyncio.sleep(random.uniform(0, delay))
+
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """当前事件循环的合成客户端（不存在时创建），须在事件循环内调用"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = SynthesisClient()
+    return client
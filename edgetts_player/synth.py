@@ -0,0 +1,94 @@
+"""调用 edge-tts 合成。
+
+stream_audio 是单次、不重试的原始请求；其余函数都经由当前事件循环的 SynthesisClient
+（超时、重试、对冲与自适应并发，见 resilience.py）。
+"""
+from .audio_cache import make_audio_key
+from .config import SYNTH_WSS_URL
+from .resilience import StreamInterrupted, get_client
+
+
+async def stream_audio(text, voice, rate, volume):
+    """调用 edge-tts 合成一段文本，逐块产出 MP3 字节（单次请求，不重试）"""
+    import edge_tts  # 依赖 aiohttp，首次合成时再加载以加快启动
+
+    if SYNTH_WSS_URL:
+        edge_tts.communicate.WSS_URL = SYNTH_WSS_URL
+    communicate = edge_tts.Communicate(text, voice, rate=rate, volume=volume)
+    async for message in communicate.stream():
+        if message["type"] == "audio":
+            yield message["data"]
+
+
+async def synthesize_bytes(text, voice, rate, volume):
+    """调用 edge-tts 合成一段文本，返回完整的 MP3 字节。"""
+    return await get_client().synthesize(text, voice, rate, volume)
+
+
+async def synthesize_cached(cache, text, voice, rate, volume):
+    """先查音频缓存，未命中再合成并写入缓存，返回缓存文件路径。"""
+    key = make_audio_key(text, voice, rate, volume)
+    path = cache.get(key)
+    if path:
+        return path
+    data = await synthesize_bytes(text, voice, rate, volume)
+    return cache.put(key, data)
+
+
+async def synthesize_cached_bytes(cache, text, voice, rate, volume):
+    """同 synthesize_cached，但返回音频字节：命中缓存时立即读出，未命中时直接返回合成结果（同时写入缓存）。
+
+    结果要过一段时间才使用时（如导出时排队等待写出的片段）用它，避免持有的缓存路径先被 LRU 淘汰。
+    """
+    key = make_audio_key(text, voice, rate, volume)
+    path = cache.get(key)
+    if path:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            pass  # 刚被其他进程淘汰，重新合成
+    data = await synthesize_bytes(text, voice, rate, volume)
+    cache.put(key, data)
+    return data
+
+
+def _pool_write(audio, spilled, data):
+    """写入内存池，超出上限后改为累积到 spilled（bytearray），返回 spilled"""
+    if spilled is not None:
+        spilled.extend(data)
+    elif not audio.write(data):
+        spilled = bytearray(audio.getvalue())
+        spilled.extend(data)
+        audio.release()
+    return spilled
+
+
+async def synthesize_pooled(cache, pool, text, voice, rate, volume):
+    """内存模式：命中音频缓存时返回缓存文件路径，否则把音频直接收进内存池，返回 PooledAudio。
+
+    合成结果不写磁盘；内存池超出上限时才改为写入音频缓存并返回路径。
+    """
+    key = make_audio_key(text, voice, rate, volume)
+    path = cache.get(key)
+    if path:
+        return path
+    client = get_client()
+    audio = pool.acquire()
+    spilled = None
+    try:
+        try:
+            async for data in client.stream(text, voice, rate, volume):
+                spilled = _pool_write(audio, spilled, data)
+        except StreamInterrupted:
+            # 中途断流：丢弃已收到的部分，整段重新合成
+            audio.release()
+            audio = pool.acquire()
+            spilled = _pool_write(audio, None, await client.synthesize(text, voice, rate, volume))
+    except BaseException:
+        audio.release()
+        raise
+    if spilled is None:
+        return audio
+    pool.spills += 1
+    return cache.put(key, bytes(spilled))
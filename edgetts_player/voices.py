@@ -0,0 +1,151 @@
+"""语音目录：edge-tts 的全部语音，带有效期地缓存在磁盘上，按地区 / 性别建立索引。
+
+- 启动时直接读磁盘缓存（没有缓存时使用内置的常用中文语音），不等待网络
+- 缓存超过 VOICE_CACHE_TTL 后由调用方在后台 fetch_voices() 刷新，diff_voices() 比较差异后再更新界面
+- VoiceCatalog.filter(locale, gender): locale 可以是语言 (zh)、地区 (zh-CN) 或更细的方言 (zh-CN-liaoning)，
+  不区分大小写；各前缀与性别都预先建好索引
+"""
+import json
+import os
+import time
+
+from .config import VOICE_CACHE_FILE
+
+VOICE_CACHE_VERSION = 1
+# 缓存有效期 (s)
+VOICE_CACHE_TTL = 7 * 24 * 3600
+# 缓存中保留的字段
+VOICE_FIELDS = ('ShortName', 'Locale', 'Gender', 'FriendlyName')
+
+# 没有缓存又无法联网时可用的常用中文语音
+FALLBACK_VOICES = [
+    {'ShortName': name, 'Locale': name.rsplit('-', 1)[0], 'Gender': gender, 'FriendlyName': ''}
+    for name, gender in (
+        ('zh-CN-XiaoxiaoNeural', 'Female'),
+        ('zh-CN-XiaoyiNeural', 'Female'),
+        ('zh-CN-YunjianNeural', 'Male'),
+        ('zh-CN-YunxiNeural', 'Male'),
+        ('zh-CN-YunxiaNeural', 'Male'),
+        ('zh-CN-YunyangNeural', 'Male'),
+        ('zh-CN-liaoning-XiaobeiNeural', 'Female'),
+        ('zh-CN-shaanxi-XiaoniNeural', 'Female'),
+        ('zh-HK-HiuGaaiNeural', 'Female'),
+        ('zh-HK-HiuMaanNeural', 'Female'),
+        ('zh-HK-WanLungNeural', 'Male'),
+        ('zh-TW-HsiaoChenNeural', 'Female'),
+        ('zh-TW-HsiaoYuNeural', 'Female'),
+        ('zh-TW-YunJheNeural', 'Male'),
+    )
+]
+
+
+def normalize_voices(voices):
+    """只保留 VOICE_FIELDS，按 (Locale, ShortName) 排序并去重"""
+    seen = {}
+    for v in voices:
+        name = v.get('ShortName')
+        if name:
+            seen[name] = {field: v.get(field) or '' for field in VOICE_FIELDS}
+    return sorted(seen.values(), key=lambda v: (v['Locale'], v['ShortName']))
+
+
+def load_cached_voices(path=VOICE_CACHE_FILE):
+    """读取磁盘缓存，返回 (语音列表, 获取时间戳)；没有缓存或已损坏时返回 (None, None)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != VOICE_CACHE_VERSION:
+            return None, None
+        return normalize_voices(data['voices']), float(data['fetched_at'])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None, None
+
+
+def save_cached_voices(voices, path=VOICE_CACHE_FILE, fetched_at=None):
+    """写入磁盘缓存（临时文件 + os.replace）"""
+    data = {
+        'version': VOICE_CACHE_VERSION,
+        'fetched_at': time.time() if fetched_at is None else fetched_at,
+        'voices': normalize_voices(voices),
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def is_stale(fetched_at, ttl=VOICE_CACHE_TTL, now=None):
+    if fetched_at is None:
+        return True
+    now = time.time() if now is None else now
+    return not 0 <= now - fetched_at < ttl
+
+
+async def fetch_voices():
+    """联网获取全部语音（已规范化）"""
+    import edge_tts  # 依赖 aiohttp，需要时再加载
+
+    return normalize_voices(await edge_tts.list_voices())
+
+
+def diff_voices(old, new):
+    """比较两份语音列表，返回 (新增的 ShortName 列表, 移除的 ShortName 列表, 是否有任何变化)"""
+    old_map = {v['ShortName']: v for v in old}
+    new_map = {v['ShortName']: v for v in new}
+    added = sorted(new_map.keys() - old_map.keys())
+    removed = sorted(old_map.keys() - new_map.keys())
+    changed = bool(added or removed) or any(old_map[n] != new_map[n] for n in new_map.keys() & old_map.keys())
+    return added, removed, changed
+
+
+class VoiceCatalog:
+    """按地区前缀与性别建立索引的语音目录，语音按 (Locale, ShortName) 排序"""
+
+    def __init__(self, voices):
+        self.voices = normalize_voices(voices)
+        self._by_name = {}
+        self._by_locale = {}    # 语言 / 地区 / 方言前缀（小写） -> 语音序号列表（升序）
+        self._by_gender = {}    # 性别（小写） -> 语音序号集合
+        for i, v in enumerate(self.voices):
+            self._by_name[v['ShortName']] = i
+            parts = v['Locale'].casefold().split('-')
+            for n in range(1, len(parts) + 1):
+                self._by_locale.setdefault('-'.join(parts[:n]), []).append(i)
+            self._by_gender.setdefault(v['Gender'].casefold(), set()).add(i)
+
+    def __len__(self):
+        return len(self.voices)
+
+    def __iter__(self):
+        return iter(self.voices)
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def get(self, name):
+        i = self._by_name.get(name)
+        return None if i is None else self.voices[i]
+
+    def locales(self):
+        """全部地区（如 zh-CN），已排序"""
+        return sorted({v['Locale'] for v in self.voices})
+
+    def languages(self):
+        """全部语言代码（如 zh），已排序"""
+        return sorted({v['Locale'].split('-', 1)[0] for v in self.voices})
+
+    def filter(self, locale=None, gender=None):
+        """按地区前缀与性别筛选，参数为空表示不限"""
+        indices = range(len(self.voices))
+        if locale:
+            indices = self._by_locale.get(locale.casefold(), [])
+        if gender:
+            allowed = self._by_gender.get(gender.casefold(), set())
+            indices = [i for i in indices if i in allowed]
+        return [self.voices[i] for i in indices]
+
+
+def load_voice_catalog(path=VOICE_CACHE_FILE):
+    """从磁盘缓存建立目录，不联网。返回 (VoiceCatalog, 是否需要刷新)"""
+    voices, fetched_at = load_cached_voices(path)
+    return VoiceCatalog(voices or FALLBACK_VOICES), voices is None or is_stale(fetched_at)
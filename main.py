@@ -1,53 +1,82 @@
+import time
+
+# 进程启动时刻，用于统计冷启动耗时（须在其他重量级导入之前）
+_PROCESS_START = time.perf_counter()
+
+import io
 import pathlib
+import re
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
-import edge_tts
-import asyncio
+import bisect
 import threading
 import os
 import platform
 import webbrowser
-import re
-import tempfile
-import shutil
-import json
 from datetime import datetime
-import hashlib
+import multiprocessing
 
 import pygame
 
-# 缓存目录
-CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.book_cache')
-os.makedirs(CACHE_DIR, exist_ok=True)
+from edgetts_player.config import AUDIO_CACHE_DIR, DEFAULT_VOICE
+from edgetts_player.history import HistoryStore
+from edgetts_player.autosave import AutoSaver, resolve_source, save_target, load_layout
+from edgetts_player.book_cache import (load_cached_book, save_cached_book, prune_cache, set_cache_limits,
+                                       DEFAULT_BOOK_CACHE_MB)
+from edgetts_player.api import load_book
+from edgetts_player.books import read_book_file, open_book_sections
+from edgetts_player.parsers import assemble_sections
+from edgetts_player.chunking import split_text_to_chunks, split_text_with_positions, rechunk_edit
+from edgetts_player.chunk_index import ChunkTexts, span_starts
+from edgetts_player.navigation import NavigationIndex, filter_chapters
+from edgetts_player.audio_cache import AudioCache, DEFAULT_AUDIO_CACHE_MB
+from edgetts_player.synth import synthesize_cached, synthesize_pooled
+from edgetts_player.audio_pool import AudioBufferPool, PooledAudio, DEFAULT_AUDIO_POOL_MB
+from edgetts_player.export import (
+    export_chunks, export_job_id, find_resumable_export, DEFAULT_EXPORT_CONCURRENCY
+)
+from edgetts_player.batch import BatchConverter
+from edgetts_player.pipeline import (
+    AsyncLoopThread, PrefetchPipeline, ProgressiveAudio, DEFAULT_PREFETCH_DEPTH, MP3_BYTES_PER_SECOND
+)
+from edgetts_player.audio_cache import make_audio_key
+from edgetts_player.planner import AdaptiveChunkPlan, FixedChunkPlan, ADAPTIVE_MAX_FACTOR
+from edgetts_player.voices import VoiceCatalog, diff_voices, fetch_voices, load_voice_catalog, save_cached_voices
+
+# 冷启动预算：从进程启动到窗口可交互 (ms)
+STARTUP_BUDGET_MS = 1500
 
-def get_file_hash(file_path):
-    stat = os.stat(file_path)
-    key = f"{os.path.abspath(file_path)}_{stat.st_size}_{stat.st_mtime}"
-    return hashlib.md5(key.encode('utf-8')).hexdigest()
+# 高亮颜色
+HIGHLIGHT_BG = '#FFF3CD'       # 当前播放片段 - 浅黄色
+HIGHLIGHT_FG = '#856404'       # 当前播放片段 - 深棕色文字
 
-# 多格式解析
-from bs4 import BeautifulSoup
-import ebooklib
-from ebooklib import epub
-from PyPDF2 import PdfReader
-from docx import Document as DocxDocument
-import mobi
+# 文本超过此字数时预览改为窗口化：Text 中只保留当前位置附近的这么多字
+PREVIEW_WINDOW_CHARS = 200_000
+# 视图离窗口边缘不足此比例时，以当前位置为中心重新取窗口
+PREVIEW_EDGE_MARGIN = 0.15
 
+NEWLINE_RE = re.compile('\n')
 
-# edge-tts 默认中文语音
-DEFAULT_VOICE = "zh-CN-XiaoxiaoNeural"
+# 章节下拉列表最多列出的章节数，超出时只列当前章节附近的一段，提示用户输入筛选词
+CHAPTER_LIST_MAX = 300
 
-# 断句标点
-SENTENCE_DELIMITERS = re.compile(r'(?<=[。！？；…!?;])|(?<=\n)')
-CLAUSE_DELIMITERS = re.compile(r'(?<=[，、,])')
+# 停止编辑这么久之后才自动保存 (ms)
+AUTOSAVE_DELAY_MS = 1500
 
-# 播放历史文件
-HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.playback_history.json')
+# 首个片段渐进播放：收到约这么长的音频即开始播放，之后每次至少再收到这么多才续接 (s)
+PROGRESSIVE_HEAD_SECONDS = 0.4
+PROGRESSIVE_STEP_SECONDS = 0.5
+# 未合成完的 MP3 解码后，末尾这一段可能不完整，留到下次解码再播放 (s)
+PROGRESSIVE_TAIL_MARGIN = 0.05
 
-# 高亮颜色
-HIGHLIGHT_BG = '#FFF3CD'       # 当前播放片段 - 浅黄色
-HIGHLIGHT_FG = '#856404'       # 当前播放片段 - 深棕色文字
+# 语音筛选：默认只显示中文语音；性别选项 -> edge-tts 的 Gender
+DEFAULT_VOICE_LOCALE = 'zh'
+ALL_VOICES_LABEL = '全部'
+VOICE_GENDERS = {'女': 'Female', '男': 'Male'}
+
+# 合成重试用尽的单元跳过继续播放；连续这么多个单元失败（多半是断网）才停止
+MAX_CONSECUTIVE_FAILURES = 3
 
 # 支持的文件格式
 SUPPORTED_FORMATS = [
@@ -60,217 +89,416 @@ SUPPORTED_FORMATS = [
 ]
 
 
-def read_book_file(file_path):
-    """根据文件扩展名读取内容，返回 (纯文本, 章节列表)。
-    
-    章节列表格式: [(标题, 起始字符偏移), ...] 或 None
-    支持: .txt .md .html .htm .epub .mobi .pdf .docx
+class PreviewWindow:
+    """文本预览：大文本只在 Text 中放入全文的一段，滚动条映射到全文。
+
+    - 文本不超过 PREVIEW_WINDOW_CHARS 时整本放入；超过时窗口随播放高亮、章节跳转和滚动移动，
+      滚动条位置按全文字符比例计算
+    - 两种情况都可直接编辑：Text 的 insert / delete / replace 命令经过代理，记录累计的编辑区间并
+      增量维护行首偏移表；commit_edit() 只取编辑区间的文本，按窗口起点合入 content，
+      换窗口前有未合入的编辑时一律调用 flush_edits()，由应用经 commit_edit() 合入、增量断句并保存，
+      窗口自身从不直接合入
+    - content 为当前断句索引对应的全文（编辑生效后随之更新）
+    - 对外一律使用全文字符偏移；换算为 Text 的 "行.列" 索引时在行首偏移表中二分查找，
+      不让 Tk 从文首逐字计数，长书末尾的高亮与跳转同样快
     """
-    path = pathlib.Path(file_path)
-    ext = path.suffix.lower()
-    text = ""
-    chapters = None
-
-    if ext in ('.txt', '.md'):
-        text = path.read_text(encoding='utf-8')
-    elif ext in ('.html', '.htm'):
-        html = path.read_text(encoding='utf-8')
-        soup = BeautifulSoup(html, 'html.parser')
-        for tag in soup(['script', 'style']):
-            tag.decompose()
-        text = soup.get_text(separator='\n', strip=True)
-    elif ext == '.epub':
-        book = epub.read_epub(str(path))
-        chapters = []
-        texts = []
-        current_pos = 0
-        
-        # 使用 spine 保证阅读顺序
-        spine_items = []
-        for item_id, _ in book.spine:
-            item = book.get_item_with_id(item_id)
-            if item and isinstance(item, ebooklib.epub.EpubHtml):
-                spine_items.append(item)
-                
-        if not spine_items:
-            # 兜底
-            spine_items = list(book.get_items_of_type(ebooklib.ITEM_DOCUMENT))
 
-        for item in spine_items:
-            content = item.get_content()
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # 清理无关标签
-            for tag in soup(['script', 'style']):
-                tag.decompose()
-                
-            item_text = soup.get_text(separator='\n', strip=True)
-            if not item_text:
-                continue
-            
-            lines = [line.strip() for line in item_text.split('\n') if line.strip()]
-            
-            # 1. 尝试从 h1-h3 提取（合并前三个头，防止标题被拆分如 <h2>第一章</h2> <h2>惊蛰</h2>）
-            headers = soup.find_all(['h1', 'h2', 'h3'])
-            header_texts = [h.get_text().strip() for h in headers if h.get_text().strip()]
-            title_text = " ".join(header_texts[:3])
-            
-            # 2. 如果没有标题，尝试用 title 标签
-            if not title_text or len(title_text) > 100:
-                title_tag = soup.find('title')
-                title_text = title_tag.get_text().strip() if title_tag else ""
-                
-            # 3. 如果提取出来只有 "第N章" 等，尝试去正文找副标题
-            import re
-            is_simple_chapter = re.match(r'^第[零一二三四五六七八九十百千万\d]+[章节回卷部]$', title_text.strip())
-            if is_simple_chapter and lines:
-                # 往后找，寻找正文中第一章的下一行，考虑换行符和段落
-                for i in range(min(5, len(lines) - 1)):
-                    # 如果找到了这行，而且下一行不是很长，很可能就是具体的小标题
-                    if lines[i] == title_text.strip():
-                        if len(lines[i+1]) <= 20:
-                            title_text += " " + lines[i+1]
-                        break
-                        
-            # 4. 终极兜底策略：如果标题还是无效或空，截取正文
-            if not title_text or len(title_text) > 100 or title_text.lower().startswith('unknown'):
-                if lines:
-                    fallback = " ".join(lines[:2])
-                    title_text = fallback[:40] + ("..." if len(fallback) > 40 else "")
-                else:
-                    title_text = f"章节 {len(chapters) + 1}"
-            
-            chapters.append((title_text, current_pos))
-            texts.append(item_text)
-            current_pos += len(item_text) + 1 # +1 是因为后面用 \n join
-        text = '\n'.join(texts)
-    elif ext == '.mobi':
-        tmp_dir = tempfile.mkdtemp(prefix='mobi_extract_')
+    def __init__(self, text_widget, scrollbar, flush_edits):
+        self.text = text_widget
+        self.scrollbar = scrollbar
+        self.content = ''
+        self.start = 0          # 窗口在全文中的起止偏移
+        self.end = 0
+        self.windowed = False
+        self.read_only = False
+        self.edited = False     # 载入后是否被用户编辑过
+        self.flush_edits = flush_edits  # 换窗口前调用，让应用合入窗口中尚未生效的编辑
+        self._dirty = None      # 尚未合入 content 的编辑区间（窗口内偏移，含义同 edit_span）
+        self._loading = False   # 正在换入窗口内容，不记为编辑
+        self._highlight = None  # 当前高亮的全文偏移 (start, end, tag)
+        self._refill_pending = False
+        self._line_starts = [0]  # 窗口内各行的起始偏移
+        self._window_len = 0
+        text_widget.configure(yscrollcommand=self._on_text_scroll)
+        scrollbar.configure(command=self._on_scrollbar)
+        self._hook_widget_command()
+
+    def load(self, content, editable=True):
+        """显示新文本；editable=False 时只读"""
+        self.content = content
+        self.windowed = len(content) > PREVIEW_WINDOW_CHARS
+        self.read_only = not editable
+        self.edited = False
+        self._dirty = None
+        self._highlight = None
+        if self.windowed:
+            self._fill(0)
+        else:
+            self._replace(content)
+            self.start, self.end = 0, len(content)
+        self.text.configure(state='disabled' if self.read_only else 'normal')
+
+    def get_text(self):
+        """全文（包含窗口中尚未合入 content 的编辑）"""
+        if self._dirty is None:
+            return self.content
+        start, old_end, new_end = self._dirty
+        base = self.start
+        return (self.content[:base + start] + self.text.get(self.index(base + start), self.index(base + new_end))
+                + self.content[base + old_end:])
+
+    def has_pending_edit(self):
+        return self._dirty is not None
+
+    def commit_edit(self):
+        """把窗口中的编辑合入 content，返回编辑区间 (start, old_end, new_end)（全文偏移，同 edit_span）；
+        没有改动返回 None。只读取编辑区间内的文本"""
+        if self._dirty is None:
+            return None
+        start, old_end, new_end = (self.start + p for p in self._dirty)
+        self._dirty = None
+        new = self.text.get(self.index(start), self.index(new_end))
+        if new == self.content[start:old_end]:
+            return None
+        self.content = self.content[:start] + new + self.content[old_end:]
+        self.end += new_end - old_end
+        return start, old_end, new_end
+
+    def _build_line_starts(self, text):
+        self._line_starts = [0]
+        self._line_starts.extend(m.end() for m in NEWLINE_RE.finditer(text))
+        self._window_len = len(text)
+
+    # ---------- 编辑跟踪 ----------
+
+    def _hook_widget_command(self):
+        """把 Text 的 Tcl 命令换成代理：键盘输入、粘贴、剪切都经由 insert / delete 命令修改内容"""
+        widget = self.text
+        self._widget_cmd = widget._w + '_orig'
+        widget.tk.call('rename', widget._w, self._widget_cmd)
+        widget.tk.createcommand(widget._w, self._dispatch)
+
+    def _dispatch(self, *args):
+        call = self.text.tk.call
+        op = args[0] if args else None
+        if op not in ('insert', 'delete', 'replace') or self._loading \
+                or str(call(self._widget_cmd, 'cget', '-state')) == 'disabled':
+            return call((self._widget_cmd,) + args)
+        if op == 'insert' and len(args) >= 3:
+            a = b = self._window_offset(args[1])
+            chars = ''.join(args[2::2])
+        elif op == 'delete' and len(args) in (2, 3):
+            a = self._window_offset(args[1])
+            b = self._window_offset(args[2]) if len(args) == 3 else a + 1
+            b, chars = min(b, self._window_len), ''
+            if b <= a:
+                return call((self._widget_cmd,) + args)
+        elif op == 'replace' and len(args) >= 4:
+            a, b = self._window_offset(args[1]), self._window_offset(args[2])
+            chars = ''.join(args[3::2])
+        else:
+            # 不常见的形式（如一次删除多个区间）：整个窗口记为编辑区间
+            before = self._window_len
+            result = call((self._widget_cmd,) + args)
+            text = str(call(self._widget_cmd, 'get', '1.0', 'end-1c'))
+            self._build_line_starts(text)
+            self._mark_dirty(0, before, len(text))
+            return result
+        result = call((self._widget_cmd,) + args)
+        self._record(a, b, chars)
+        return result
+
+    def _window_offset(self, index):
+        """Text 索引 -> 窗口内偏移（经原始命令规范化，不触发编辑跟踪）"""
+        line, col = map(int, str(self.text.tk.call(self._widget_cmd, 'index', index)).split('.'))
+        lines = self._line_starts
+        if line > len(lines):
+            return self._window_len
+        return min(lines[line - 1] + col, self._window_len)
+
+    def _record(self, a, b, chars):
+        """窗口内 [a, b) 被替换为 chars：增量更新行首偏移表并合并编辑区间"""
+        delta = len(chars) - (b - a)
+        lines = self._line_starts
+        i, j = bisect.bisect_right(lines, a), bisect.bisect_right(lines, b)
+        added = [a + m.end() for m in NEWLINE_RE.finditer(chars)]
+        lines[i:j] = added
+        if delta:
+            k = i + len(added)
+            lines[k:] = [p + delta for p in lines[k:]]
+        self._window_len += delta
+        self._mark_dirty(a, b, a + len(chars))
+
+    def _mark_dirty(self, a, b, c):
+        """合并编辑区间：当前文本的 [a, b) 变为 [a, c)"""
+        self.edited = True
+        if self._dirty is None:
+            self._dirty = (a, b, c)
+            return
+        start, old_end, new_end = self._dirty
+        end = max(new_end, b)
+        self._dirty = (min(start, a), old_end + end - new_end, end + c - b)
+
+    def index(self, offset):
+        """全文偏移 -> Text 的 "行.列" 索引（调用前需保证偏移在窗口内）"""
+        offset = max(0, offset - self.start)
+        lines = self._line_starts
+        line = bisect.bisect_right(lines, offset) - 1
+        return f"{line + 1}.{offset - lines[line]}"
+
+    def offset(self, index):
+        """Text 索引 -> 全文偏移"""
+        line, col = map(int, self.text.index(index).split('.'))
+        lines = self._line_starts
+        return self.start + lines[min(line, len(lines)) - 1] + col
+
+    def see(self, offset):
+        self._ensure_visible(offset)
+        self.text.see(self.index(offset))
+
+    def highlight(self, start, end, tag='playing'):
+        """高亮全文区间 [start, end)，只移除上一次高亮的区间"""
+        self.clear_highlight()
+        self._ensure_visible(start)
+        self._highlight = (start, end, tag)
+        self._apply_highlight()
+        self.text.see(self.index(start))
+
+    def clear_highlight(self):
+        if self._highlight is None:
+            return
+        start, end, tag = self._highlight
+        self._highlight = None
+        if end > self.start and start < self.end:
+            self.text.tag_remove(tag, self.index(max(start, self.start)), self.index(min(end, self.end)))
+
+    # ---------- 窗口 ----------
+
+    def _replace(self, text):
+        self._loading = True
         try:
-            extracted_path, _ = mobi.extract(str(path), tmp_dir)
-            extracted = pathlib.Path(extracted_path)
-            html_files = list(extracted.rglob('*.html')) + list(extracted.rglob('*.htm'))
-            if not html_files:
-                html_files = [extracted] if extracted.is_file() else []
-            texts = []
-            for hf in html_files:
-                try:
-                    html = hf.read_text(encoding='utf-8', errors='ignore')
-                    soup = BeautifulSoup(html, 'html.parser')
-                    for tag in soup(['script', 'style']):
-                        tag.decompose()
-                    t = soup.get_text(separator='\n', strip=True)
-                    if t:
-                        texts.append(t)
-                except Exception:
-                    continue
-            text = '\n'.join(texts)
+            self.text.configure(state='normal')
+            self.text.delete('1.0', tk.END)
+            self.text.insert(tk.END, text)
+            self.text.edit_modified(False)
         finally:
-            shutil.rmtree(tmp_dir, ignore_errors=True)
-    elif ext == '.pdf':
-        reader = PdfReader(str(path))
-        texts = []
-        for page in reader.pages:
-            t = page.extract_text()
-            if t:
-                texts.append(t)
-        text = '\n'.join(texts)
-    elif ext == '.docx':
-        doc = DocxDocument(str(path))
-        texts = [p.text for p in doc.paragraphs if p.text.strip()]
-        text = '\n'.join(texts)
-    else:
-        text = path.read_text(encoding='utf-8')
-
-    return text, chapters
-
-
-def split_text_to_chunks(text, max_length=200):
-    """按标点断句，将文本拆为不超过 max_length 的片段列表。"""
-    text = text.strip()
-    if not text:
-        return []
-
-    raw_sentences = SENTENCE_DELIMITERS.split(text)
-    raw_sentences = [s for s in raw_sentences if s.strip()]
-
-    chunks = []
-    buffer = ""
-
-    for sentence in raw_sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-
-        if len(sentence) > max_length:
-            if buffer:
-                chunks.append(buffer)
-                buffer = ""
-            sub_parts = CLAUSE_DELIMITERS.split(sentence)
-            sub_buf = ""
-            for part in sub_parts:
-                part = part.strip()
-                if not part:
-                    continue
-                if len(sub_buf) + len(part) <= max_length:
-                    sub_buf += part
-                else:
-                    if sub_buf:
-                        chunks.append(sub_buf)
-                    while len(part) > max_length:
-                        chunks.append(part[:max_length])
-                        part = part[max_length:]
-                    sub_buf = part
-            if sub_buf:
-                buffer = sub_buf
-            continue
-
-        if len(buffer) + len(sentence) <= max_length:
-            buffer += sentence
-        else:
-            if buffer:
-                chunks.append(buffer)
-            buffer = sentence
+            self._loading = False
+        self._dirty = None
+        self._build_line_starts(text)
+        if self.read_only:
+            self.text.configure(state='disabled')
+
+    def _fill(self, center):
+        """以全文偏移 center 为中心重新取窗口"""
+        if self._dirty is not None:
+            self.flush_edits()
+        length = len(self.content)
+        start = max(0, min(center - PREVIEW_WINDOW_CHARS // 2, length - PREVIEW_WINDOW_CHARS))
+        end = min(length, start + PREVIEW_WINDOW_CHARS)
+        if start > 0:
+            # 从行首开始，避免首行折行与全文显示不一致
+            nl = self.content.rfind('\n', max(0, start - 2000), start)
+            if nl != -1:
+                start = nl + 1
+        self.start, self.end = start, end
+        self._replace(self.content[self.start:self.end])
+        self._apply_highlight()
+
+    def _ensure_visible(self, offset):
+        if not self.windowed:
+            return
+        margin = int(PREVIEW_WINDOW_CHARS * PREVIEW_EDGE_MARGIN)
+        low = self.start + margin if self.start > 0 else 0
+        high = self.end - margin if self.end < len(self.content) else self.end
+        if not low <= offset <= high:
+            self._fill(offset)
+
+    def _apply_highlight(self):
+        if self._highlight is None:
+            return
+        start, end, tag = self._highlight
+        if end > self.start and start < self.end:
+            self.text.tag_add(tag, self.index(max(start, self.start)), self.index(min(end, self.end)))
 
-    if buffer:
-        chunks.append(buffer)
+    def _top_offset(self):
+        """视图顶部对应的全文偏移"""
+        return self.offset('@0,0')
 
-    return chunks
+    # ---------- 滚动条映射 ----------
+
+    def _on_text_scroll(self, first, last):
+        if not self.windowed:
+            self.scrollbar.set(first, last)
+            return
+        first, last = float(first), float(last)
+        span, length = self.end - self.start, len(self.content) or 1
+        self.scrollbar.set((self.start + first * span) / length, (self.start + last * span) / length)
+        near_top = first < PREVIEW_EDGE_MARGIN and self.start > 0
+        near_bottom = last > 1 - PREVIEW_EDGE_MARGIN and self.end < len(self.content)
+        if (near_top or near_bottom) and not self._refill_pending:
+            # 不能在 yscrollcommand 回调中直接改内容，空闲时再换窗口
+            self._refill_pending = True
+            self.text.after_idle(self._refill_at_view)
+
+    def _refill_at_view(self):
+        self._refill_pending = False
+        top = self._top_offset()
+        self._fill(top)
+        self.text.yview(self.index(top))
+
+    def _on_scrollbar(self, *args):
+        if not self.windowed:
+            self.text.yview(*args)
+            return
+        if args[0] == 'moveto':
+            target = int(float(args[1]) * len(self.content))
+            target = max(0, min(target, len(self.content)))
+            self._ensure_visible(target)
+            self.text.yview(self.index(target))
+        else:
+            self.text.yview(*args)
 
 
-def find_chunk_positions(full_text, chunks):
-    """将每个 chunk 映射回原文中的 (start, end) 字符偏移。
+class GaplessPlayer:
+    """无缝播放：片段预先解码为 PCM（pygame Sound），排入专用混音通道。
 
-    返回 list[(start, end)]，长度与 chunks 相同。
+    - 通道上只有 正在播放 + 已排队 两个片段，当前片段播完由 SDL 音频线程直接接上排队的片段，
+      不再经过 mixer.music 的 load、解码启动与 100ms 轮询
+    - 片段时长取自 PCM 长度：等待片段结束时按剩余时长阻塞，暂停、继续、停止会立即唤醒，
+      到点后再以通道状态确认切换
     """
-    positions = []
-    search_start = 0
-
-    for chunk in chunks:
-        # 取 chunk 的前 20 个字符用于定位
-        needle = chunk[:min(20, len(chunk))]
-        pos = full_text.find(needle, search_start)
-
-        if pos == -1:
-            # 如果找不到，向后多找一段，或者向前回溯一点
-            fallback_start = max(0, search_start - 1000)
-            pos = full_text.find(needle, fallback_start, search_start + 10000)
-            if pos == -1:
-                pos = search_start
-
-        # 寻找 chunk 结束位置
-        end_needle = chunk[-min(20, len(chunk)):]
-        end_pos = full_text.find(end_needle, pos, pos + len(chunk) + 1000)
-        
-        if end_pos != -1:
-            end_pos += len(end_needle)
-        else:
-            end_pos = pos + len(chunk)
 
-        positions.append((pos, min(end_pos, len(full_text))))
-        search_start = positions[-1][1]
+    CHANNEL_ID = 0
+    # 到点后通道尚未切换（设备缓冲延迟）时每次补等的时长 (s)
+    SETTLE_STEP = 0.005
 
-    return positions
+    def __init__(self):
+        pygame.mixer.set_reserved(self.CHANNEL_ID + 1)
+        self.channel = pygame.mixer.Channel(self.CHANNEL_ID)
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._current = None    # 正在播放的 Sound
+        self._queued = None     # 排在其后的 Sound
+        self._end = 0.0         # 当前片段预计播完的 monotonic 时间
+        self._paused_at = None
+        self._volume = 1.0
+
+    @staticmethod
+    def decode(source):
+        """把 MP3（路径或内存池中的 PooledAudio）解码为 PCM；PooledAudio 解码后即归还内存池"""
+        if isinstance(source, PooledAudio):
+            try:
+                with source.open() as f:
+                    return pygame.mixer.Sound(file=f)
+            finally:
+                source.release()
+        return pygame.mixer.Sound(source)
+
+    def enqueue(self, sound):
+        """通道空闲时立即播放并返回 False；否则排在当前片段之后并返回 True（只能排一个）"""
+        sound.set_volume(self._volume)
+        with self._lock:
+            if self._current is not None and self.channel.get_busy():
+                self.channel.queue(sound)
+                self._queued = sound
+                queued = True
+            else:
+                self.channel.play(sound)
+                if self._paused_at is not None:
+                    self.channel.pause()
+                    self._paused_at = time.monotonic()
+                self._current, self._queued = sound, None
+                self._end = time.monotonic() + sound.get_length()
+                queued = False
+        self._changed.set()
+        return queued
+
+    def play_progressive(self, stream, stop_event, on_start=None):
+        """渐进播放合成中的片段：每次把已收到的 MP3 整体解码，只把新增的 PCM 排入通道。
+
+        已收到部分的解码结果与整段解码的开头一致，因此各段首尾相接没有缝隙。
+        开始发声时调用 on_start()；播放完最后一段前返回 True，停止时返回 False。
+        """
+        frequency, size, channels = pygame.mixer.get_init()
+        sample_bytes = channels * abs(size) // 8
+        margin = int(PROGRESSIVE_TAIL_MARGIN * frequency) * sample_bytes
+        need = int(PROGRESSIVE_HEAD_SECONDS * MP3_BYTES_PER_SECOND)
+        step = int(PROGRESSIVE_STEP_SECONDS * MP3_BYTES_PER_SECOND)
+        consumed = 0  # 已排入通道的 PCM 字节数
+        while True:
+            data, done = stream.wait(need, stop_event)
+            if data is None:
+                return False
+            pcm = pygame.mixer.Sound(file=io.BytesIO(data)).get_raw() if data else b''
+            end = len(pcm) if done else (len(pcm) - margin) // sample_bytes * sample_bytes
+            if end > consumed:
+                segment = pygame.mixer.Sound(buffer=pcm[consumed:end])
+                consumed = end
+                if self.enqueue(segment) and not self.wait_current(stop_event):
+                    return False
+                if on_start is not None:
+                    on_start()
+                    on_start = None
+            if done:
+                return True
+            need = len(data) + step
+
+    def _advanced(self):
+        """当前片段是否已播完；排队的片段已开始时将其作为当前片段"""
+        if self._queued is not None:
+            if self.channel.get_queue() is not None:
+                return False
+            self._end += self._queued.get_length()
+            self._current, self._queued = self._queued, None
+            return True
+        if self.channel.get_busy():
+            return False
+        self._current = None
+        return True
+
+    def wait_current(self, stop_event):
+        """阻塞到当前片段播完（排队的片段开始播放或通道空闲）返回 True，stop_event 置位时返回 False"""
+        while not stop_event.is_set():
+            with self._lock:
+                if self._paused_at is not None:
+                    timeout = None
+                else:
+                    timeout = self._end - time.monotonic()
+                    if timeout <= 0:
+                        if self._advanced():
+                            return True
+                        timeout = self.SETTLE_STEP
+                self._changed.clear()
+            self._changed.wait(timeout)
+        return False
+
+    def pause(self):
+        with self._lock:
+            if self._paused_at is None:
+                self.channel.pause()
+                self._paused_at = time.monotonic()
+        self._changed.set()
+
+    def resume(self):
+        with self._lock:
+            if self._paused_at is not None:
+                self.channel.unpause()
+                self._end += time.monotonic() - self._paused_at
+                self._paused_at = None
+        self._changed.set()
+
+    def stop(self):
+        with self._lock:
+            self.channel.stop()
+            self._current = self._queued = None
+            self._paused_at = None
+        self._changed.set()
+
+    def set_volume(self, volume):
+        self._volume = volume
+        for sound in (self._current, self._queued):
+            if sound is not None:
+                sound.set_volume(volume)
 
 
 class Application(tk.Tk):
@@ -291,12 +519,41 @@ class Application(tk.Tk):
         self.rate_var.trace_add('write', self.update_display_vars)
         self.volume_var.trace_add('write', self.update_display_vars)
 
-        # 语音列表（后台异步加载）
+        # 语音目录（启动时读磁盘缓存，过期时后台联网刷新）；self.voices 为当前筛选结果
+        self.voice_catalog = VoiceCatalog([])
         self.voices = []
         self.voice_var = tk.StringVar(value=DEFAULT_VOICE)
+        self.voice_locale_var = tk.StringVar(value=DEFAULT_VOICE_LOCALE)
+        self.voice_gender_var = tk.StringVar(value=ALL_VOICES_LABEL)
+        self._current_voice_name = DEFAULT_VOICE
 
         # 断句设置
         self.chunk_size_var = tk.IntVar(value=200)
+        # 播放时按实测合成速度自适应合成单元长度（片段编号不变）
+        self.adaptive_chunks_var = tk.BooleanVar(value=False)
+
+        # 音频缓存上限 (MB)
+        self.audio_cache_mb_var = tk.IntVar(value=DEFAULT_AUDIO_CACHE_MB)
+        self.book_cache_mb_var = tk.IntVar(value=DEFAULT_BOOK_CACHE_MB)
+        self.audio_cache = AudioCache(AUDIO_CACHE_DIR, DEFAULT_AUDIO_CACHE_MB * 1024 * 1024)
+
+        # 内存播放池 (MB)：大于 0 时播放合成的音频只放在内存中，超出上限才写音频缓存
+        self.audio_pool_mb_var = tk.IntVar(value=0)
+        self.audio_pool = AudioBufferPool(DEFAULT_AUDIO_POOL_MB * 1024 * 1024)
+        self._audio_pool_enabled = False  # 合成线程读取，界面修改上限时更新
+
+        # 播放历史与全局设置（启动时读入一次，修改延迟批量落盘）
+        self.history = HistoryStore()
+
+        # 编辑内容的延迟自动保存（后台写盘）
+        self.autosaver = AutoSaver(on_saved=self._on_autosaved)
+        self._autosave_job = None
+
+        # 预取片段数（同时合成的后续片段个数）
+        self.prefetch_depth_var = tk.IntVar(value=DEFAULT_PREFETCH_DEPTH)
+
+        # MP3 导出并发合成数
+        self.export_concurrency_var = tk.IntVar(value=DEFAULT_EXPORT_CONCURRENCY)
 
         # 起始片段（1-based, 显示给用户的）
         self.start_chunk_var = tk.IntVar(value=1)
@@ -304,17 +561,27 @@ class Application(tk.Tk):
         # 流式播放状态
         self._playback_stop = threading.Event()
         self._playback_thread = None
-        self._temp_dir = None
+        self._tts_loop = AsyncLoopThread()  # 常驻合成事件循环，所有播放会话共用
         self._is_playing = False
         self._is_paused = False
         self._current_chunk_index = 0  # 当前播放到的 chunk 索引 (0-based)
+        self._play_requested_at = 0.0  # 按下播放的时间，用于计算首音耗时
+        self.last_ttfa_ms = None       # 最近一次播放的首音耗时 (ms)
         self._chunk_positions = []     # chunk 在原文中的位置映射
         self._cached_chunks = []       # 当前缓存的片段列表
         self._cached_chunk_size = 0    # 生成 _cached_chunks 时使用的 max_length
-        self.chapters = []             # EPUB 章节信息 [(title, start_index), ...]
+        self._chunk_starts = []        # 各 chunk 起始偏移（升序），用于由字符偏移反查 chunk
+        self.chapters = []             # 章节信息 [(title, start_index), ...]（EPUB 目录或检测到的标题）
+        self._nav = None               # 章节 ↔ 片段导航索引 (NavigationIndex)
+        self._chapter_matches = range(0)  # 符合筛选的章节序号（升序），未筛选时为全部
+        self._chapter_view = range(0)  # 下拉列表中实际列出的章节序号（_chapter_matches 的一段）
+        self._section_starts = [0]     # 各分节（章节 / 页）在全文中的起始偏移
+        self._provisional = None       # 全书解析完成前，仅加载了优先分节时的状态
+        self._pending_full_book = None # 临时播放期间解析完成、等待切换的全书数据
 
         # 初始化 pygame mixer
         pygame.mixer.init()
+        self._player = GaplessPlayer()
 
         self.style = ttk.Style()
         self.style.theme_use('clam')
@@ -338,12 +605,26 @@ class Application(tk.Tk):
         # 关闭窗口时清理
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
+        # 窗口首次空闲时即可交互，记录冷启动耗时
+        self.after_idle(self._report_startup_time)
+
         # 尝试恢复上次打开的文件
         self.after(500, self._auto_load_last_file)
 
+    def _report_startup_time(self):
+        """统计从进程启动到窗口可交互的耗时，超出预算时在状态栏提示"""
+        self.startup_ms = (time.perf_counter() - _PROCESS_START) * 1000
+        if self.startup_ms > STARTUP_BUDGET_MS:
+            print(f"Warning: cold start took {self.startup_ms:.0f} ms (budget {STARTUP_BUDGET_MS} ms)")
+        self.status_var.set(f"{self.status_var.get()} (启动耗时 {self.startup_ms:.0f} ms)")
+
     def _on_close(self):
         """窗口关闭时停止播放并清理"""
         self.stop_playback()
+        self._tts_loop.close()
+        self._flush_autosave()
+        self.autosaver.close()
+        self.history.close()
         pygame.mixer.quit()
         self.destroy()
 
@@ -383,7 +664,7 @@ class Application(tk.Tk):
         self.display_rate_var.set(f"{self.rate_var.get():.2f}")
         self.display_volume_var.set(f"{self.volume_var.get():.2f}")
         try:
-            pygame.mixer.music.set_volume(self.volume_var.get() / 100.0)
+            self._player.set_volume(self.volume_var.get() / 100.0)
         except Exception:
             pass
 
@@ -418,6 +699,20 @@ class Application(tk.Tk):
                                         state='readonly', width=35)
         self.voice_combo.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
         self.voice_combo.set("加载中...")
+        self.voice_combo.bind("<<ComboboxSelected>>", self._on_voice_selected)
+
+        voice_filter_frame = ttk.Frame(voice_frame)
+        voice_filter_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(voice_filter_frame, text="地区:").pack(side=tk.LEFT)
+        self.voice_locale_combo = ttk.Combobox(voice_filter_frame, textvariable=self.voice_locale_var,
+                                               state='readonly', width=14)
+        self.voice_locale_combo.pack(side=tk.LEFT, padx=(5, 10))
+        self.voice_locale_combo.bind("<<ComboboxSelected>>", lambda e: self._render_voice_list())
+        ttk.Label(voice_filter_frame, text="性别:").pack(side=tk.LEFT)
+        gender_combo = ttk.Combobox(voice_filter_frame, textvariable=self.voice_gender_var, state='readonly',
+                                    values=[ALL_VOICES_LABEL, *VOICE_GENDERS], width=5)
+        gender_combo.pack(side=tk.LEFT, padx=(5, 0))
+        gender_combo.bind("<<ComboboxSelected>>", lambda e: self._render_voice_list())
 
         rate_frame = ttk.Frame(voice_frame)
         rate_frame.pack(fill=tk.X, pady=(5, 0))
@@ -446,6 +741,56 @@ class Application(tk.Tk):
                                          textvariable=self.chunk_size_var, width=8)
         self.chunk_spinbox.pack(side=tk.LEFT, padx=(5, 0))
         ttk.Label(chunk_inner, text="字", foreground='#999').pack(side=tk.LEFT, padx=(3, 0))
+        ttk.Checkbutton(chunk_inner, text="播放时自适应",
+                        variable=self.adaptive_chunks_var).pack(side=tk.LEFT, padx=(8, 0))
+
+        prefetch_inner = ttk.Frame(chunk_frame)
+        prefetch_inner.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(prefetch_inner, text="预取片段数:").pack(side=tk.LEFT)
+        self.prefetch_spinbox = ttk.Spinbox(prefetch_inner, from_=1, to=16, increment=1,
+                                            textvariable=self.prefetch_depth_var, width=8)
+        self.prefetch_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(prefetch_inner, text="个", foreground='#999').pack(side=tk.LEFT, padx=(3, 0))
+
+        export_inner = ttk.Frame(chunk_frame)
+        export_inner.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(export_inner, text="导出并发数:").pack(side=tk.LEFT)
+        self.export_concurrency_spinbox = ttk.Spinbox(export_inner, from_=1, to=16, increment=1,
+                                                      textvariable=self.export_concurrency_var, width=8)
+        self.export_concurrency_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(export_inner, text="路", foreground='#999').pack(side=tk.LEFT, padx=(3, 0))
+
+        cache_inner = ttk.Frame(chunk_frame)
+        cache_inner.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(cache_inner, text="音频缓存上限:").pack(side=tk.LEFT)
+        self.audio_cache_spinbox = ttk.Spinbox(cache_inner, from_=100, to=20000, increment=100,
+                                               textvariable=self.audio_cache_mb_var, width=8,
+                                               command=self._apply_audio_cache_limit)
+        self.audio_cache_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+        self.audio_cache_spinbox.bind('<FocusOut>', lambda e: self._apply_audio_cache_limit())
+        ttk.Label(cache_inner, text="MB", foreground='#999').pack(side=tk.LEFT, padx=(3, 0))
+        ttk.Button(cache_inner, text="清空", command=self._clear_audio_cache,
+                   style='Small.TButton', width=5).pack(side=tk.RIGHT)
+
+        pool_inner = ttk.Frame(chunk_frame)
+        pool_inner.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(pool_inner, text="内存播放池:").pack(side=tk.LEFT)
+        self.audio_pool_spinbox = ttk.Spinbox(pool_inner, from_=0, to=1024, increment=16,
+                                              textvariable=self.audio_pool_mb_var, width=8,
+                                              command=self._apply_audio_pool_limit)
+        self.audio_pool_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+        self.audio_pool_spinbox.bind('<FocusOut>', lambda e: self._apply_audio_pool_limit())
+        ttk.Label(pool_inner, text="MB (0 为关闭，播放音频不落盘)", foreground='#999').pack(side=tk.LEFT, padx=(3, 0))
+
+        book_cache_inner = ttk.Frame(chunk_frame)
+        book_cache_inner.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(book_cache_inner, text="解析缓存上限:").pack(side=tk.LEFT)
+        self.book_cache_spinbox = ttk.Spinbox(book_cache_inner, from_=50, to=20000, increment=50,
+                                              textvariable=self.book_cache_mb_var, width=8,
+                                              command=self._apply_book_cache_limit)
+        self.book_cache_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+        self.book_cache_spinbox.bind('<FocusOut>', lambda e: self._apply_book_cache_limit())
+        ttk.Label(book_cache_inner, text="MB", foreground='#999').pack(side=tk.LEFT, padx=(3, 0))
 
     def create_right_panel(self, parent):
         preview_frame = ttk.LabelFrame(parent, text="文本预览", padding=10)
@@ -457,6 +802,13 @@ class Application(tk.Tk):
         self.chapter_combo = ttk.Combobox(self.chapter_frame, state='readonly', font=('微软雅黑', 9))
         self.chapter_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
         self.chapter_combo.bind("<<ComboboxSelected>>", self.on_chapter_selected)
+        # 章节很多时按标题筛选下拉列表，回车跳转到第一个匹配章节
+        self.chapter_filter_var = tk.StringVar()
+        ttk.Label(self.chapter_frame, text="筛选:", font=('微软雅黑', 9)).pack(side=tk.LEFT, padx=(8, 3))
+        chapter_filter = ttk.Entry(self.chapter_frame, textvariable=self.chapter_filter_var, width=12)
+        chapter_filter.pack(side=tk.LEFT)
+        chapter_filter.bind('<Return>', self._jump_to_first_match)
+        self.chapter_filter_var.trace_add('write', self._on_chapter_filter)
 
         text_scroll_frame = ttk.Frame(preview_frame)
         text_scroll_frame.pack(fill=tk.BOTH, expand=True)
@@ -464,8 +816,7 @@ class Application(tk.Tk):
         scrollbar = ttk.Scrollbar(text_scroll_frame, orient=tk.VERTICAL)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        self.text_preview = tk.Text(text_scroll_frame, height=8, font=('微软雅黑', 10), wrap=tk.WORD,
-                                    yscrollcommand=scrollbar.set)
+        self.text_preview = tk.Text(text_scroll_frame, height=8, font=('微软雅黑', 10), wrap=tk.WORD)
         
         self.text_preview.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.text_preview.bind('<<Modified>>', self.on_text_modified)
@@ -473,7 +824,8 @@ class Application(tk.Tk):
         # 配置高亮标签
         self.text_preview.tag_configure('playing', background=HIGHLIGHT_BG, foreground=HIGHLIGHT_FG)
 
-        scrollbar.configure(command=self.text_preview.yview)
+        # 大文本窗口化显示，滚动条映射到全文
+        self.preview = PreviewWindow(self.text_preview, scrollbar, self._flush_autosave)
 
         convert_frame = ttk.Frame(parent)
         convert_frame.pack(fill=tk.X, pady=(10, 0))
@@ -589,47 +941,68 @@ class Application(tk.Tk):
     # ====================== 语音加载 ======================
 
     def load_voices_async(self):
-        """后台异步加载 edge-tts 语音列表"""
-        def _load():
-            try:
-                loop = asyncio.new_event_loop()
-                voices = loop.run_until_complete(edge_tts.list_voices())
-                loop.close()
-
-                zh_voices = [v for v in voices if v["Locale"].startswith("zh-")]
-                zh_voices.sort(key=lambda v: v["ShortName"])
-                self.voices = zh_voices
-
-                display_names = []
-                for v in zh_voices:
-                    gender = "女" if v["Gender"] == "Female" else "男"
-                    locale = v["Locale"]
-                    display_names.append(f"{v['ShortName']}  ({gender}, {locale})")
-
-                self.after(0, lambda: self._update_voice_ui(display_names))
-            except Exception as e:
-                self.after(0, lambda: self.status_var.set(f"加载语音列表失败: {str(e)}"))
-
-        threading.Thread(target=_load, daemon=True).start()
-
-    def _update_voice_ui(self, display_names):
-        self.voice_combo['values'] = display_names
+        """用磁盘缓存的语音目录立即填充下拉框（不等网络），缓存不存在或已过期时在后台联网刷新"""
+        self.voice_catalog, stale = load_voice_catalog()
+        self._update_locale_choices()
+        self._render_voice_list()
+        self.status_var.set(f"准备就绪 — 已加载 {len(self.voice_catalog)} 个语音")
+        if stale:
+            future = self._tts_loop.submit(fetch_voices())
+            future.add_done_callback(lambda f: self.after(0, lambda: self._on_voices_fetched(f)))
+
+    def _on_voices_fetched(self, future):
+        """后台刷新完成：写回磁盘缓存，与当前目录比较，有变化时才更新下拉框（保持当前选择）"""
+        try:
+            voices = future.result()
+        except Exception as e:
+            self.status_var.set(f"刷新语音列表失败，使用本地缓存: {e}")
+            return
+        threading.Thread(target=save_cached_voices, args=(voices,), daemon=True).start()
+        added, removed, changed = diff_voices(self.voice_catalog.voices, voices)
+        if not changed:
+            return
+        self.voice_catalog = VoiceCatalog(voices)
+        self._update_locale_choices()
+        self._render_voice_list()
+        self.status_var.set(f"语音列表已更新 — 共 {len(voices)} 个（新增 {len(added)}，移除 {len(removed)}）")
+
+    def _update_locale_choices(self):
+        """地区筛选的选项：全部、各语言及其下的地区"""
+        values = [ALL_VOICES_LABEL]
+        locales = self.voice_catalog.locales()
+        for language in self.voice_catalog.languages():
+            values.append(language)
+            values.extend(loc for loc in locales if loc.startswith(language + '-'))
+        self.voice_locale_combo['values'] = values
+
+    @staticmethod
+    def _voice_label(voice):
+        gender = "女" if voice["Gender"] == "Female" else "男"
+        return f"{voice['ShortName']}  ({gender}, {voice['Locale']})"
+
+    def _render_voice_list(self):
+        """按地区 / 性别筛选语音目录填入下拉框；当前选择的语音不变，即使被筛掉或不在目录中"""
+        locale = self.voice_locale_var.get()
+        self.voices = self.voice_catalog.filter(
+            None if locale == ALL_VOICES_LABEL else locale,
+            VOICE_GENDERS.get(self.voice_gender_var.get())
+        )
+        self.voice_combo['values'] = [self._voice_label(v) for v in self.voices]
+        name = self._current_voice_name
         for i, v in enumerate(self.voices):
-            if v["ShortName"] == getattr(self, '_current_voice_name', DEFAULT_VOICE):
+            if v["ShortName"] == name:
                 self.voice_combo.current(i)
-                break
-        else:
-            if display_names:
-                self.voice_combo.current(0)
-        self._current_voice_name = self.get_selected_voice()
-        self.voice_combo.bind("<<ComboboxSelected>>", lambda e: setattr(self, '_current_voice_name', self.get_selected_voice()))
-        self.status_var.set(f"准备就绪 — 已加载 {len(display_names)} 个中文语音")
+                return
+        voice = self.voice_catalog.get(name)
+        self.voice_combo.set(self._voice_label(voice) if voice else name)
 
-    def get_selected_voice(self):
+    def _on_voice_selected(self, event=None):
         idx = self.voice_combo.current()
         if 0 <= idx < len(self.voices):
-            return self.voices[idx]["ShortName"]
-        return DEFAULT_VOICE
+            self._current_voice_name = self.voices[idx]["ShortName"]
+
+    def get_selected_voice(self):
+        return self._current_voice_name
 
     # ====================== 参数映射 ======================
 
@@ -646,36 +1019,67 @@ class Application(tk.Tk):
         percent = int((volume - 50) / 50 * 50)
         return f"{percent:+d}%"
 
-    # ====================== 播放历史持久化 ======================
+    # ====================== 音频缓存 ======================
 
-    def _load_all_history(self):
-        """加载全部播放历史"""
+    def _apply_audio_cache_limit(self):
+        """将界面上的缓存上限应用到音频缓存（超出部分立即淘汰）"""
         try:
-            if os.path.exists(HISTORY_FILE):
-                with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return {}
+            mb = max(0, int(self.audio_cache_mb_var.get()))
+        except (tk.TclError, ValueError):
+            return
+        threading.Thread(target=self.audio_cache.set_max_bytes,
+                         args=(mb * 1024 * 1024,), daemon=True).start()
 
-    def _save_all_history(self, history):
-        """保存全部播放历史"""
+    def _clear_audio_cache(self):
+        if self._is_playing:
+            messagebox.showwarning("警告", "请先停止播放再清空音频缓存")
+            return
+        self.audio_cache.clear()
+        self.status_var.set("音频缓存已清空")
+
+    def _apply_audio_pool_limit(self):
+        """将界面上的内存播放池上限应用到缓冲池（0 为关闭内存模式）"""
         try:
-            with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
+            mb = max(0, int(self.audio_pool_mb_var.get()))
+        except (tk.TclError, ValueError):
+            return
+        if mb:
+            self.audio_pool.max_bytes = mb * 1024 * 1024
+        self._audio_pool_enabled = mb > 0
+
+    def _apply_book_cache_limit(self):
+        """将界面上的上限应用到解析缓存 (.book_cache)，并在后台按 LRU 淘汰超出部分"""
+        try:
+            mb = max(0, int(self.book_cache_mb_var.get()))
+        except (tk.TclError, ValueError):
+            return
+        set_cache_limits(max_bytes=mb * 1024 * 1024)
+        threading.Thread(target=prune_cache, daemon=True).start()
+
+    def _audio_cache_summary(self):
+        hits, misses = self.audio_cache.hits, self.audio_cache.misses
+        return f"音频缓存命中 {hits}/{hits + misses}"
+
+    # ====================== 播放历史持久化 ======================
+
+    # 历史记录由 self.history (HistoryStore) 保存在内存中，修改延迟合并后追加写入日志文件
 
     def _save_global_settings(self):
         """保存全局设置（如发音人、语速、音量）"""
-        history = self._load_all_history()
-        history['__GLOBAL_SETTINGS__'] = {
+        self.history.set('__GLOBAL_SETTINGS__', {
             'voice': self.get_selected_voice(),
+            'voice_locale': self.voice_locale_var.get(),
+            'voice_gender': VOICE_GENDERS.get(self.voice_gender_var.get(), ''),
             'rate': self.rate_var.get(),
             'volume': self.volume_var.get(),
-            'chunk_size': self.chunk_size_var.get()
-        }
-        self._save_all_history(history)
+            'chunk_size': self.chunk_size_var.get(),
+            'adaptive_chunks': self.adaptive_chunks_var.get(),
+            'audio_cache_mb': self.audio_cache_mb_var.get(),
+            'book_cache_mb': self.book_cache_mb_var.get(),
+            'audio_pool_mb': self.audio_pool_mb_var.get(),
+            'prefetch_depth': self.prefetch_depth_var.get(),
+            'export_concurrency': self.export_concurrency_var.get()
+        })
 
     def manual_save_progress(self):
         """手动触发保存当前进度和全局设置"""
@@ -694,60 +1098,106 @@ class Application(tk.Tk):
 
     def _load_global_settings(self):
         """加载全局设置"""
-        history = self._load_all_history()
-        settings = history.get('__GLOBAL_SETTINGS__')
+        settings = self.history.get('__GLOBAL_SETTINGS__')
         if settings:
-            voice_val = settings.get('voice', DEFAULT_VOICE)
-            self._current_voice_name = voice_val
-            # Ensure voice exists in combo values
-            if voice_val in self.voice_combo['values']:
-                self.voice_combo.set(voice_val)
+            self._current_voice_name = settings.get('voice', DEFAULT_VOICE)
+            self.voice_locale_var.set(settings.get('voice_locale', DEFAULT_VOICE_LOCALE))
+            genders = {v: k for k, v in VOICE_GENDERS.items()}
+            self.voice_gender_var.set(genders.get(settings.get('voice_gender'), ALL_VOICES_LABEL))
+            # 保存的语音不在缓存的目录中（如离线首次启动）时仍保持选中
+            self._render_voice_list()
             self.rate_var.set(settings.get('rate', 50.00))
             self.volume_var.set(settings.get('volume', 50.00))
             self.chunk_size_var.set(settings.get('chunk_size', 200))
+            self.adaptive_chunks_var.set(settings.get('adaptive_chunks', False))
+            self.audio_cache_mb_var.set(settings.get('audio_cache_mb', DEFAULT_AUDIO_CACHE_MB))
+            self._apply_audio_cache_limit()
+            self.book_cache_mb_var.set(settings.get('book_cache_mb', DEFAULT_BOOK_CACHE_MB))
+            self._apply_book_cache_limit()
+            self.audio_pool_mb_var.set(settings.get('audio_pool_mb', 0))
+            self._apply_audio_pool_limit()
+            self.prefetch_depth_var.set(settings.get('prefetch_depth', DEFAULT_PREFETCH_DEPTH))
+            self.export_concurrency_var.set(settings.get('export_concurrency', DEFAULT_EXPORT_CONCURRENCY))
             # Update labels
             self.display_rate_var.set(self.get_rate_string())
             self.display_volume_var.set(self.get_volume_string())
 
+    def _chunk_index_at(self, offset):
+        """返回包含字符偏移 offset 的 chunk 序号"""
+        return max(0, bisect.bisect_right(self._chunk_starts, offset) - 1)
+
+    def _section_position(self, chunk_index):
+        """将 chunk 序号换算为 (分节序号, 分节内偏移)；与断句字数无关，可用于优先解析该分节"""
+        if not 0 <= chunk_index < len(self._chunk_starts):
+            return None, None
+        offset = self._chunk_starts[chunk_index]
+        if self._provisional is not None:
+            return self._provisional['section_index'], offset
+        starts = self._section_starts or [0]
+        section_index = max(0, bisect.bisect_right(starts, offset) - 1)
+        return section_index, offset - starts[section_index]
+
+    def _history_chunk_index(self, info):
+        """由历史记录计算当前断句下的 chunk 序号，优先使用分节位置"""
+        section_index = info.get('section_index')
+        section_offset = info.get('section_offset')
+        if section_index is not None and section_offset is not None and self._chunk_starts:
+            if self._provisional is not None:
+                if section_index == self._provisional['section_index']:
+                    return self._chunk_index_at(section_offset)
+                return 0
+            if 0 <= section_index < len(self._section_starts):
+                return self._chunk_index_at(self._section_starts[section_index] + section_offset)
+        return info.get('chunk_index', 0)
+
     def _save_playback_position(self, file_path, chunk_index, total_chunks):
         """保存当前文件的播放位置（chunk_index 为 0-based）"""
-        history = self._load_all_history()
         key = os.path.abspath(file_path)
-        history[key] = {
-            'chunk_index': chunk_index,
-            'chapter_index': self.chapter_combo.current(),
-            'total_chunks': total_chunks,
-            'chunk_size': self.chunk_size_var.get(),
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
-        }
-        history['__LAST_FILE__'] = key
-        self._save_all_history(history)
+        entry = dict(self.history.get(key) or {})
+        if self._provisional is None:
+            entry.update({
+                'chunk_index': chunk_index,
+                'chapter_index': self._selected_chapter(),
+                'total_chunks': total_chunks,
+                'chunk_size': self.chunk_size_var.get(),
+            })
+        else:
+            # 仅加载了优先分节时，全书 chunk 序号未知，只更新分节位置，全书加载后再换算
+            entry.setdefault('chunk_index', 0)
+            entry.setdefault('total_chunks', 0)
+        section_index, section_offset = self._section_position(chunk_index)
+        if section_index is not None:
+            entry['section_index'] = section_index
+            entry['section_offset'] = section_offset
+        entry['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M')
+        self.history.set(key, entry)
+        self.history.set('__LAST_FILE__', key)
         self._save_global_settings()
 
     def _load_playback_position(self, file_path):
         """加载指定文件的上次播放位置，返回 dict 或 None"""
-        history = self._load_all_history()
         key = os.path.abspath(file_path)
         # 排除特殊键
         if key == '__LAST_FILE__':
             return None
-        return history.get(key)
+        return self.history.get(key)
 
     def _update_history_hint(self, file_path):
         """更新界面上的历史提示信息"""
         info = self._load_playback_position(file_path)
         if info:
-            ci = info['chunk_index'] + 1  # 转为 1-based 显示
-            total = info['total_chunks']
+            ci = self._history_chunk_index(info) + 1  # 转为 1-based 显示
+            total = len(self._chunk_starts) or info['total_chunks']
             ts = info.get('timestamp', '')
-            self.history_hint_var.set(f"📌 上次播放到 第{ci}/{total}片段  ({ts})")
+            scope = "本章" if self._provisional is not None else ""
+            self.history_hint_var.set(f"📌 上次播放到 {scope}第{ci}/{total}片段  ({ts})")
             self.start_chunk_var.set(ci)  # 自动设置起始位置
             
             # 恢复章节下拉框位置
             chapter_idx = info.get('chapter_index')
             if chapter_idx is not None and getattr(self, 'chapters', None):
                 if 0 <= chapter_idx < len(self.chapters):
-                    self.chapter_combo.current(chapter_idx)
+                    self._select_chapter(chapter_idx)
                     
             self.btn_resume.state(['!disabled'])
         else:
@@ -761,35 +1211,34 @@ class Application(tk.Tk):
         if file_path:
             info = self._load_playback_position(file_path)
             if info:
-                self.start_chunk_var.set(info['chunk_index'] + 1)
-                self.status_var.set(f"已设置起始位置: 第{info['chunk_index'] + 1}片段")
+                ci = self._history_chunk_index(info) + 1
+                self.start_chunk_var.set(ci)
+                self.status_var.set(f"已设置起始位置: 第{ci}片段")
 
     def _auto_load_last_file(self):
         """启动时自动加载上次打开的文件"""
-        history = self._load_all_history()
-        last_file = history.get('__LAST_FILE__')
+        last_file = self.history.get('__LAST_FILE__')
         if last_file and os.path.exists(last_file):
             self.status_var.set(f"正在自动恢复上次打开的文件...")
             self.load_file(last_file)
 
     # ====================== 文本高亮 ======================
 
-    def _highlight_chunk(self, chunk_index):
-        """在主线程中高亮指定 chunk 对应的文本区域"""
+    def _highlight_chunk(self, chunk_index, last_index=None):
+        """在主线程中高亮指定 chunk（或 chunk_index..last_index 连续多个）对应的文本区域"""
         def _do_highlight():
             self._clear_highlight()
-            if chunk_index < len(self._chunk_positions):
-                start_pos, end_pos = self._chunk_positions[chunk_index]
-                start_idx = f"1.0 + {start_pos}c"
-                end_idx = f"1.0 + {end_pos}c"
-                self.text_preview.tag_add('playing', start_idx, end_idx)
-                # 自动滚动到高亮区域
-                self.text_preview.see(start_idx)
+            last = chunk_index if last_index is None else last_index
+            if last < len(self._chunk_positions):
+                start_pos = self._chunk_positions[chunk_index][0]
+                end_pos = self._chunk_positions[last][1]
+                # 高亮并自动滚动到高亮区域（窗口化时必要时换窗口）
+                self.preview.highlight(start_pos, end_pos)
         self.after(0, _do_highlight)
 
     def _clear_highlight(self):
         """清除所有高亮"""
-        self.text_preview.tag_remove('playing', '1.0', tk.END)
+        self.preview.clear_highlight()
 
     # ====================== 文件操作 ======================
 
@@ -813,6 +1262,7 @@ class Application(tk.Tk):
         if not file_path or not os.path.exists(file_path):
             return
 
+        self._flush_autosave()
         self.file_path.set(file_path)
         file_dir = os.path.dirname(file_path)
         self.output_dir.set(file_dir)
@@ -823,93 +1273,208 @@ class Application(tk.Tk):
         self.btn_convert.state(['disabled'])
 
         chunk_size = self.chunk_size_var.get()
+        self._provisional = None
+        self._pending_full_book = None
         
         def _load_task():
             try:
-                file_hash = get_file_hash(file_path)
-                text_cache_path = os.path.join(CACHE_DIR, f"{file_hash}_text.txt")
-                meta_cache_path = os.path.join(CACHE_DIR, f"{file_hash}_meta.json")
-                
-                use_cache = False
-                if os.path.exists(text_cache_path) and os.path.exists(meta_cache_path):
-                    try:
-                        with open(meta_cache_path, 'r', encoding='utf-8') as f:
-                            meta = json.load(f)
-                        if meta.get('chunk_size') == chunk_size and meta.get('cache_version') == 2:
-                            use_cache = True
-                    except Exception:
-                        pass
-                
-                if use_cache:
-                    with open(text_cache_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    chapters = meta.get('chapters')
-                    chunks = meta.get('chunks')
-                    chunk_positions = meta.get('chunk_positions')
+                # 先等上一本书的自动保存写完（在后台线程中等待，不阻塞界面），
+                # 非纯文本格式有更新的旁路编辑文件时读取编辑后的文本
+                self.autosaver.flush(5)
+                source_path = resolve_source(file_path)
+                cached = load_cached_book(source_path, chunk_size)
+                if cached:
+                    content, chapters, chunks, chunk_positions, section_starts = cached
                     
+                    self.after(0, lambda: self._on_chunks_ready(file_path, chunks, chunk_positions, chunk_size, True,
+                                                                section_starts))
                     self.after(0, lambda: self._show_content(file_path, content, chapters))
-                    self.after(0, lambda: self._on_chunks_ready(file_path, chunks, chunk_positions, chunk_size, True))
                 else:
                     self.after(0, lambda: self.status_var.set(f"首次加载或结构已更新，正在解析全书..."))
-                    content, chapters = read_book_file(file_path)
+                    content, chapters, section_starts = self._read_sections_streaming(
+                        file_path, chunk_size, source_path
+                    )
+                    if source_path != file_path:
+                        # 旁路编辑文件按纯文本只解析出一个分节，恢复原书的分节与章节
+                        layout = load_layout(source_path, len(content))
+                        if layout:
+                            chapters, section_starts = layout
                     
-                    # 立即显示文本内容和章节
-                    self.after(0, lambda: self._show_content(file_path, content, chapters))
-                    self.after(0, lambda: self.status_var.set(f"解析完成，正在预处理断句，稍候即可极速播放..."))
-                    
-                    chunks = split_text_to_chunks(content, chunk_size)
-                    chunk_positions = find_chunk_positions(content, chunks)
+                    chunks, chunk_positions = split_text_with_positions(content, chunk_size)
                     
                     # 写入缓存
                     try:
-                        with open(text_cache_path, 'w', encoding='utf-8') as f:
-                            f.write(content)
-                        with open(meta_cache_path, 'w', encoding='utf-8') as f:
-                            json.dump({
-                                'cache_version': 2,
-                                'chunk_size': chunk_size,
-                                'chapters': chapters,
-                                'chunks': chunks,
-                                'chunk_positions': chunk_positions
-                            }, f, ensure_ascii=False)
+                        save_cached_book(source_path, chunk_size, content, chapters, chunks, chunk_positions,
+                                         section_starts)
                     except Exception as e:
                         print(f"Warning: Failed to write cache: {e}")
 
-                    self.after(0, lambda: self._on_chunks_ready(file_path, chunks, chunk_positions, chunk_size, False))
+                    self.after(0, lambda: self._on_full_book_ready(
+                        file_path, content, chapters, chunks, chunk_positions, section_starts, chunk_size
+                    ))
             except Exception as e:
                 self.after(0, lambda: self._on_file_load_error(str(e)))
                 
         threading.Thread(target=_load_task, daemon=True).start()
 
+    def _read_sections_streaming(self, file_path, chunk_size, source_path=None):
+        """在后台线程中逐分节解析文档，返回 (全文, 章节列表, 各分节起始偏移)。
+
+        有上次播放位置时先解析其所在分节（否则为第一个非空分节），断句后立即交给界面，
+        无需等待全书解析即可开始播放；其余分节随后按顺序补齐。
+        source_path 为实际读取的文件（如旁路编辑文件），默认即 file_path。
+        """
+        info = self._load_playback_position(file_path) or {}
+        with open_book_sections(source_path or file_path) as reader:
+            count = len(reader)
+            parts = [None] * count
+            if count > 1:
+                first = info.get('section_index')
+                if not isinstance(first, int) or not 0 <= first < count:
+                    first = 0
+                section_offset = (info.get('section_offset') or 0) if first == info.get('section_index') else 0
+                idx = first
+                while idx < count:
+                    parts[idx] = reader.read(idx)
+                    if parts[idx][1].strip():
+                        break
+                    idx += 1
+                    section_offset = 0
+                if idx < count:
+                    title, text = parts[idx]
+                    local_chunks, local_positions = split_text_with_positions(text, chunk_size)
+                    self.after(0, lambda: self._show_provisional_section(
+                        file_path, idx, title, text, local_chunks, local_positions, section_offset, chunk_size
+                    ))
+            remaining = [i for i in range(count) if parts[i] is None]
+            last_report = [0.0]
+
+            def _on_progress(done, total):
+                now = time.monotonic()
+                if done == total or now - last_report[0] >= 0.2:
+                    last_report[0] = now
+                    self.after(0, lambda: self.status_var.set(f"正在后台解析全书... {done}/{total}"))
+
+            # PDF 等格式在此多进程并行提取，并写入逐页缓存
+            for i, part in zip(remaining, reader.read_many(remaining, _on_progress if count > 1 else None)):
+                parts[i] = part
+            return assemble_sections(reader, parts)
+
+    def _show_provisional_section(self, file_path, section_index, title, text, chunks, chunk_positions,
+                                  section_offset, chunk_size):
+        """全书解析完成前，先显示并允许播放优先解析的分节"""
+        if self.file_path.get() != file_path:
+            return
+        self._provisional = {'section_index': section_index, 'text_len': len(text), 'continue': False}
+        # 临时内容只读，避免被自动保存写回源文件
+        self.preview.load(text, editable=False)
+        self.chapters = []
+        self._nav = None
+        self.chapter_frame.pack_forget()
+
+        self._cached_chunks = chunks
+        self._chunk_positions = chunk_positions
+        self._chunk_starts = span_starts(chunk_positions)
+        self._cached_chunk_size = chunk_size
+        self.start_chunk_var.set(self._chunk_index_at(section_offset) + 1)
+        self.total_chunks_label.configure(text=f"/ {len(chunks)} 片段 (本节)")
+        self.history_hint_var.set(f"📌 已优先加载「{title or f'第 {section_index + 1} 节'}」，其余内容后台解析中")
+        self.status_var.set("已可开始播放，全书仍在后台解析...")
+        self.btn_play.state(['!disabled'])
+
+    def _on_full_book_ready(self, file_path, content, chapters, chunks, chunk_positions, section_starts, chunk_size):
+        """全书解析与断句完成；若正在播放临时分节，则等本节播完再切换"""
+        if self.file_path.get() != file_path:
+            return
+        args = (file_path, content, chapters, chunks, chunk_positions, section_starts, chunk_size)
+        if self._provisional is not None and self._is_playing:
+            self._pending_full_book = args
+            self.status_var.set("全书解析完成，本节播完后自动切换到全书")
+            return
+        resume = self._provisional is not None and self._provisional['continue']
+        self._pending_full_book = args
+        if resume:
+            self._continue_after_provisional()
+        else:
+            self._apply_full_book()
+
+    def _apply_full_book(self):
+        """用解析完成的全书替换临时分节，返回原临时分节状态"""
+        file_path, content, chapters, chunks, chunk_positions, section_starts, chunk_size = self._pending_full_book
+        provisional = self._provisional
+        self._provisional = None
+        self._pending_full_book = None
+        self._on_chunks_ready(file_path, chunks, chunk_positions, chunk_size, False, section_starts)
+        self._show_content(file_path, content, chapters)
+        total = len(chunks)
+        self.start_chunk_spin.configure(to=max(total, 1))
+        self.total_chunks_label.configure(text=f"/ {total} 片段")
+        return provisional
+
+    def _apply_pending_full_book(self):
+        """临时分节未播完就结束播放（停止 / 出错）时，直接切换到已解析完成的全书，不继续播放；
+        本节中的播放位置换算为全书片段序号写回历史"""
+        if self._pending_full_book is None or self._provisional is None or self._is_playing:
+            return
+        file_path = self._pending_full_book[0]
+        self._apply_full_book()
+        info = self._load_playback_position(file_path)
+        if info:
+            self._save_playback_position(file_path, self._history_chunk_index(info), len(self._cached_chunks))
+        self._update_history_hint(file_path)
+        self.status_var.set("全书解析完成，已切换到全书")
+
+    def _continue_after_provisional(self):
+        """临时分节播完后，切换到全书并从下一片段继续播放"""
+        if self._provisional is None:
+            return
+        if self._pending_full_book is None:
+            self._provisional['continue'] = True
+            self.play_status_var.set("本节已播完，等待全书解析完成后继续...")
+            return
+        provisional = self._apply_full_book()
+        section_start = self._section_starts[provisional['section_index']]
+        next_index = bisect.bisect_left(self._chunk_starts, section_start + provisional['text_len'])
+        if next_index >= len(self._cached_chunks):
+            self.status_var.set("播放完毕")
+            return
+        self.start_chunk_var.set(next_index + 1)
+        self.start_playback()
+
     def _show_content(self, file_path, content, chapters):
         """立即显示文本内容和章节结构"""
-        self.text_preview.delete(1.0, tk.END)
-        self.text_preview.insert(tk.END, content)
-        self.text_preview.edit_modified(False)
-        
+        self.preview.load(content)
+        if self.preview.windowed:
+            self.status_var.set("文本较大，预览仅显示当前位置附近的内容")
+
+
         # 加载章节信息
         self.chapters = chapters or []
+        self._rebuild_navigation()
+        self._chapter_matches = range(len(self.chapters))
+        self._show_chapter_choices(0)
         if self.chapters:
-            display_names = [f"{c[0]}" for c in self.chapters]
-            self.chapter_combo['values'] = display_names
             self.chapter_combo.set("--- 选择章节 ---")
             self.chapter_frame.pack(fill=tk.X, pady=(0, 5))
         else:
             self.chapter_frame.pack_forget()
+        if self.chapter_filter_var.get():
+            self.chapter_filter_var.set('')
 
         # 加载历史记录并同步 UI，如果是恢复上次播放位置，会触发这里
         self._update_history_hint(file_path)
         
         # 保存为最后打开的文件
-        history = self._load_all_history()
-        history['__LAST_FILE__'] = os.path.abspath(file_path)
-        self._save_all_history(history)
+        self.history.set('__LAST_FILE__', os.path.abspath(file_path))
 
-    def _on_chunks_ready(self, file_path, chunks, chunk_positions, chunk_size, from_cache):
+    def _on_chunks_ready(self, file_path, chunks, chunk_positions, chunk_size, from_cache, section_starts=None):
         """后台断句完成，解除按钮禁用"""
         self._cached_chunks = chunks
         self._chunk_positions = chunk_positions
+        self._chunk_starts = span_starts(chunk_positions)
         self._cached_chunk_size = chunk_size
+        self._section_starts = section_starts or [0]
+        self._rebuild_navigation()
         
         status_msg = f"已加载文件: {pathlib.Path(file_path).name} (极速模式就绪)"
         if not from_cache:
@@ -943,50 +1508,189 @@ class Application(tk.Tk):
             self.status_var.set(f"输出目录设置为: {directory}")
 
     def on_text_modified(self, event):
-        if self.text_preview.edit_modified():
-            current_file = self.file_path.get()
-            if current_file and os.path.exists(current_file):
-                try:
-                    content = self.text_preview.get(1.0, tk.END)
-                    with open(current_file, 'w', encoding='utf8') as f:
-                        f.write(content)
-                    self.status_var.set(f"已自动保存修改到文件: {os.path.basename(current_file)}")
-                except Exception as e:
-                    self.status_var.set(f"自动保存失败: {str(e)}")
-            self.text_preview.edit_modified(False)
+        """编辑后只重置自动保存计时器，停止输入片刻后再在后台写盘"""
+        if not self.text_preview.edit_modified():
+            return
+        self.text_preview.edit_modified(False)
+        if not self.preview.has_pending_edit():
+            # 换入窗口内容或临时分节（只读）引起的改动，不需要保存
+            return
+        if self._autosave_job is not None:
+            self.after_cancel(self._autosave_job)
+        self._autosave_job = self.after(AUTOSAVE_DELAY_MS, self._autosave_now)
+
+    def _autosave_now(self):
+        """编辑停顿后：增量更新断句，并把当前文本交给后台写盘（纯文本写回源文件，其他格式写旁路 .edited.txt）"""
+        self._autosave_job = None
+        span = self.preview.commit_edit()
+        if span is None:
+            return
+        text = self.preview.content
+        self._rechunk_after_edit(text, span)
+        file_path = self.file_path.get()
+        if file_path:
+            target = save_target(file_path)
+            # 旁路编辑文件另存分节与章节偏移，重新打开时恢复
+            layout = (self._section_starts, self.chapters) if target != file_path else None
+            self.autosaver.submit(target, text, layout)
+
+    def _rechunk_after_edit(self, text, span):
+        """只对编辑区域 span = (start, old_end, new_end) 重新断句，其后的片段平移偏移；
+        片段编号、章节与已保存的进度随之平移"""
+        if not self._cached_chunks or self._provisional is not None:
+            return
+        start, old_end, new_end = span
+        positions, first, replaced, added = rechunk_edit(
+            text, self._chunk_positions, start, old_end, new_end, self._cached_chunk_size
+        )
+        delta, shift = new_end - old_end, added - replaced
+
+        def _moved(offset):
+            # 编辑区之后的偏移平移，编辑区内的收拢到编辑区末尾
+            if offset >= old_end:
+                return offset + delta
+            return min(offset, new_end) if offset > start else offset
+
+        file_path = self.file_path.get()
+        info = self._load_playback_position(file_path) if file_path else None
+        saved_offset = None
+        if info and info.get('section_index') is not None and info.get('section_offset') is not None \
+                and 0 <= info['section_index'] < len(self._section_starts):
+            saved_offset = self._section_starts[info['section_index']] + info['section_offset']
+
+        self._chunk_positions = positions
+        self._cached_chunks = ChunkTexts(text, positions)
+        self._chunk_starts = span_starts(positions)
+        self._section_starts = [_moved(p) for p in self._section_starts]
+        self.chapters = [(title, _moved(offset)) for title, offset in self.chapters]
+        self._rebuild_navigation()
+
+        # 起始片段与已保存的进度：编辑区之后的片段编号整体平移
+        current = self.start_chunk_var.get() - 1
+        if shift and current >= first + replaced:
+            self.start_chunk_var.set(current + shift + 1)
+        if info and (saved_offset is not None or info.get('chunk_index', 0) >= first + replaced):
+            entry = dict(info)
+            if entry.get('chunk_index', 0) >= first + replaced:
+                entry['chunk_index'] = entry['chunk_index'] + shift
+            if saved_offset is not None:
+                offset = _moved(saved_offset)
+                section_index = max(0, bisect.bisect_right(self._section_starts, offset) - 1)
+                entry['section_index'] = section_index
+                entry['section_offset'] = offset - self._section_starts[section_index]
+            entry['total_chunks'] = len(positions)
+            self.history.set(os.path.abspath(file_path), entry)
+
+        total = len(positions)
+        self.start_chunk_spin.configure(to=max(total, 1))
+        self.total_chunks_label.configure(text=f"/ {total} 片段")
+
+    def _flush_autosave(self):
+        """立即提交尚未生效的编辑（切换文件、导出、退出及预览换窗口前调用）。
+
+        编辑已记录但 <<Modified>> 尚未处理（还没有安排自动保存）时同样提交，不会漏掉断句与保存
+        """
+        if self._autosave_job is not None:
+            self.after_cancel(self._autosave_job)
+            self._autosave_job = None
+        if self.preview.has_pending_edit():
+            self._autosave_now()
+
+    def _on_autosaved(self, path, error):
+        """写盘线程回调"""
+        if error:
+            self.after(0, lambda: self.status_var.set(f"自动保存失败: {error}"))
+        else:
+            self.after(0, lambda: self.status_var.set(f"已自动保存修改到文件: {os.path.basename(path)}"))
+
+    def _rebuild_navigation(self):
+        """章节或断句变化后重建章节 ↔ 片段索引（断句缓存中已存各章节首个片段时直接使用）"""
+        self._nav = NavigationIndex.build(self.chapters, self._chunk_positions)
+
+    def _show_chapter_choices(self, around):
+        """下拉列表最多列出 CHAPTER_LIST_MAX 个匹配章节（章节序号 around 附近的一段），
+        其余以末尾的提示行代替，不在每次输入筛选词时把成千上万个标题交给 Tk"""
+        matches = self._chapter_matches
+        total = len(matches)
+        pos = bisect.bisect_left(matches, around)
+        start = max(0, min(pos - CHAPTER_LIST_MAX // 2, total - CHAPTER_LIST_MAX))
+        view = matches[start:start + CHAPTER_LIST_MAX]
+        values = [self.chapters[i][0] for i in view]
+        if total > len(view):
+            values.append(f"…… 共 {total} 个章节，仅列出 {len(view)} 个，请输入筛选词缩小范围")
+        self._chapter_view = view
+        self.chapter_combo['values'] = values
+
+    def _selected_chapter(self):
+        """下拉框当前选中的章节序号（换算回全部章节中的序号），未选中或选中提示行返回 -1"""
+        pos = self.chapter_combo.current()
+        if not 0 <= pos < len(self._chapter_view):
+            return -1
+        return self._chapter_view[pos]
+
+    def _select_chapter(self, idx):
+        """在下拉框中选中章节；不在当前筛选结果中时先清除筛选，不在列出的一段中时改列其附近的章节"""
+        matches = self._chapter_matches
+        pos = bisect.bisect_left(matches, idx)
+        if pos >= len(matches) or matches[pos] != idx:
+            self.chapter_filter_var.set('')
+        view = self._chapter_view
+        pos = bisect.bisect_left(view, idx)
+        if pos >= len(view) or view[pos] != idx:
+            self._show_chapter_choices(idx)
+            view = self._chapter_view
+            pos = bisect.bisect_left(view, idx)
+        if pos < len(view) and self.chapter_combo.current() != pos:
+            self.chapter_combo.current(pos)
+
+    def _on_chapter_filter(self, *args):
+        """按标题筛选章节下拉列表"""
+        current = self._selected_chapter()
+        matches = filter_chapters(self.chapters, self.chapter_filter_var.get())
+        self._chapter_matches = range(len(self.chapters)) if matches is None else matches
+        self._show_chapter_choices(max(current, 0))
+        if matches is None:
+            if current >= 0:
+                self.chapter_combo.current(bisect.bisect_left(self._chapter_view, current))
+            else:
+                self.chapter_combo.set("--- 选择章节 ---")
+        else:
+            self.chapter_combo.set(f"--- 匹配 {len(matches)} 个章节 ---" if matches else "--- 无匹配章节 ---")
+
+    def _jump_to_first_match(self, event=None):
+        if self.chapter_filter_var.get().strip() and self._chapter_matches:
+            self._show_chapter_choices(self._chapter_matches[0])
+            self.chapter_combo.current(0)
+            self.on_chapter_selected(None)
 
     def on_chapter_selected(self, event):
         """跳转到选定的章节"""
-        idx = self.chapter_combo.current()
+        idx = self._selected_chapter()
+        if idx < 0 and self.chapter_combo.current() >= 0:
+            self.status_var.set("章节较多，请在右侧输入筛选词缩小范围")
         if 0 <= idx < len(self.chapters):
             title, offset = self.chapters[idx]
-            # 计算 tkinter text 的索引
-            tk_index = f"1.0 + {offset}c"
-            self.text_preview.see(tk_index)
+            self.preview.see(offset)
             # 视觉反馈
             self._clear_highlight()
             
-            # 更新起始片段编号
-            # 如果已经生成了 chunks，尝试找到最近的 chunk
-            if self._chunk_positions:
-                found = False
-                for i, (start, end) in enumerate(self._chunk_positions):
-                    if start >= offset:
-                        self.start_chunk_var.set(i + 1)
-                        self.status_var.set(f"跳转到章节: {title} (第 {i+1} 片段)")
-                        found = True
-                        break
-                if not found:
-                    self.start_chunk_var.set(len(self._chunk_positions))
+            # 更新起始片段编号（导航索引二分查找章节的首个片段）
+            if self._nav is not None:
+                i = self._nav.chunk_for_chapter(idx)
+                self.start_chunk_var.set(i + 1)
+                self.status_var.set(f"跳转到章节: {title} (第 {i+1} 片段)")
             else:
                 self.status_var.set(f"已选择章节: {title}，点击播放开始更新片段")
 
     # ====================== 流式播放 ======================
 
     def start_playback(self):
-        """开始流式播放：断句 → 双缓冲生成+播放"""
-        text = self.text_preview.get(1.0, tk.END).strip()
-        if not text:
+        """开始流式播放：断句 → 并发预取生成+顺序播放"""
+        self._play_requested_at = time.perf_counter()
+        # 先让尚未生效的编辑完成增量断句
+        self._flush_autosave()
+        text = self.preview.get_text()
+        if not text.strip():
             messagebox.showwarning("警告", "没有可播放的文本内容!")
             return
 
@@ -1002,14 +1706,23 @@ class Application(tk.Tk):
         else:
             self.status_var.set("正在重新断句，请稍候...")
             self.update()
-            chunks = split_text_to_chunks(text, max_len)
+            cached = None
+            if self.file_path.get() and not self._provisional and not self.preview.edited:
+                # 文本未改动：复用解析缓存中的全文，只按新的断句字数取（或生成并缓存）断句索引
+                cached = load_cached_book(resolve_source(self.file_path.get()), max_len)
+            if cached:
+                chunks, chunk_positions = cached[2], cached[3]
+            else:
+                # 断句同时得到 chunk 在原文中的位置（用于高亮）
+                chunks, chunk_positions = split_text_with_positions(text, max_len)
             if not chunks:
                 messagebox.showwarning("警告", "文本断句后为空!")
                 return
-            # 计算 chunk 在原文中的位置（用于高亮）
-            self._chunk_positions = find_chunk_positions(text, chunks)
+            self._chunk_positions = chunk_positions
+            self._chunk_starts = span_starts(chunk_positions)
             self._cached_chunks = chunks
             self._cached_chunk_size = max_len
+            self._rebuild_navigation()
 
         # 获取起始片段（1-based → 0-based）
         start_index = max(0, self.start_chunk_var.get() - 1)
@@ -1022,8 +1735,6 @@ class Application(tk.Tk):
         self.start_chunk_spin.configure(to=total)
         self.total_chunks_label.configure(text=f"/ {total} 片段")
 
-        # 创建临时目录
-        self._temp_dir = tempfile.mkdtemp(prefix="tts_stream_")
         self._playback_stop.clear()
         self._is_playing = True
         self._current_chunk_index = start_index
@@ -1039,10 +1750,14 @@ class Application(tk.Tk):
         voice = self.get_selected_voice()
         rate = self.get_rate_string()
         volume = self.get_volume_string()
+        try:
+            prefetch_depth = max(1, self.prefetch_depth_var.get())
+        except tk.TclError:
+            prefetch_depth = DEFAULT_PREFETCH_DEPTH
 
         self._playback_thread = threading.Thread(
             target=self._playback_worker,
-            args=(chunks, voice, rate, volume, start_index),
+            args=(chunks, voice, rate, volume, start_index, prefetch_depth, self.adaptive_chunks_var.get()),
             daemon=True
         )
         self._playback_thread.start()
@@ -1052,12 +1767,12 @@ class Application(tk.Tk):
         if not self._is_playing:
             return
         if self._is_paused:
-            pygame.mixer.music.unpause()
+            self._player.resume()
             self._is_paused = False
             self.btn_pause.configure(text="⏸ 暂停")
             self.status_var.set("已恢复播放")
         else:
-            pygame.mixer.music.pause()
+            self._player.pause()
             self._is_paused = True
             self.btn_pause.configure(text="▶ 继续")
             self.status_var.set("已暂停")
@@ -1066,16 +1781,11 @@ class Application(tk.Tk):
         """当用户手动修改片段编号时，同步更新上方章节列表"""
         try:
             chunk_idx = self.start_chunk_var.get() - 1
-            if chunk_idx >= 0 and getattr(self, '_chunk_positions', None) and getattr(self, 'chapters', None):
-                offset = self._chunk_positions[chunk_idx][0]
-                target_chapter_idx = 0
-                # 从后往前找，第一个偏移量小于等于当前 chunk 偏移量的章节
-                for i in range(len(self.chapters) - 1, -1, -1):
-                    if offset >= self.chapters[i][1]:
-                        target_chapter_idx = i
-                        break
-                if self.chapter_combo.current() != target_chapter_idx:
-                    self.chapter_combo.current(target_chapter_idx)
+            nav = getattr(self, '_nav', None)
+            if nav is not None and 0 <= chunk_idx < len(self._chunk_starts):
+                current = self._selected_chapter()
+                if not (0 <= current < len(nav) and nav.contains(current, chunk_idx)):
+                    self._select_chapter(nav.chapter_for_chunk(chunk_idx))
         except Exception:
             pass
 
@@ -1084,7 +1794,7 @@ class Application(tk.Tk):
         self._playback_stop.set()
 
         try:
-            pygame.mixer.music.stop()
+            self._player.stop()
         except Exception:
             pass
 
@@ -1101,13 +1811,14 @@ class Application(tk.Tk):
                 self.after(0, lambda: self.start_chunk_var.set(self._current_chunk_index + 1))
                 self.after(0, lambda: self._update_history_hint(file_path))
 
-        self._cleanup_temp_dir()
         self._is_playing = False
         self._is_paused = False
 
         # 清除高亮、恢复 UI
         self.after(0, self._clear_highlight)
         self.after(0, self._reset_play_ui)
+        # 临时分节播放中全书已解析完成：切换到全书
+        self.after(0, self._apply_pending_full_book)
 
     def _reset_play_ui(self):
         self.btn_play.state(['!disabled'])
@@ -1117,105 +1828,148 @@ class Application(tk.Tk):
         self.btn_convert.state(['!disabled'])
         self.play_status_var.set("")
 
-    def _playback_worker(self, chunks, voice, rate, volume, start_index=0):
-        """后台线程：双缓冲生成+播放碎片，从 start_index 开始"""
-        loop = asyncio.new_event_loop()
+    def _playback_worker(self, chunks, voice, rate, volume, start_index=0, prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+                         adaptive=False):
+        """后台线程：常驻事件循环并发预取后续单元，从 start_index 开始按顺序无缝播放。
+
+        当前单元播放期间即取下一单元并解码、排入混音通道，播完时直接接上。
+        首个单元未缓存时边合成边播放，其余单元从下一个开始预取。
+        单元默认即片段；adaptive 为 True 时由 AdaptiveChunkPlan 按实测速度合并/截断片段，
+        进度、高亮与起始片段仍按片段编号。
+        合成失败（重试用尽）的单元跳过，连续 MAX_CONSECUTIVE_FAILURES 个失败才停止。
+        """
         total = len(chunks)
-        next_path = None
         file_path = self.file_path.get()
 
-        try:
-            # 预生成第一个片段
-            if self._playback_stop.is_set():
-                return
-            first_path = os.path.join(self._temp_dir, f"chunk_{start_index}.mp3")
-            self.after(0, lambda: self.play_status_var.set(
-                f"正在生成片段 {start_index + 1}/{total}..."
+        def _current_params():
+            # 动态读取最新的语音、语速和音量
+            return (getattr(self, '_current_voice_name', voice),
+                    getattr(self, '_current_rate_str', rate),
+                    getattr(self, '_current_volume_str', volume))
+
+        if adaptive:
+            # 已缓存的片段单独成为单元，直接命中缓存
+            units = AdaptiveChunkPlan(chunks, start_index,
+                                      max_chars=self._cached_chunk_size * ADAPTIVE_MAX_FACTOR,
+                                      is_cached=lambda text: self.audio_cache.contains(
+                                          make_audio_key(text, *_current_params())))
+        else:
+            units = FixedChunkPlan(chunks, start_index)
+
+        progressive = None
+        params = _current_params()
+        if not self.audio_cache.contains(make_audio_key(units[0], *params)):
+            progressive = ProgressiveAudio(self._tts_loop, self.audio_cache, units[0], *params,
+                                           persist=not self._audio_pool_enabled)
+        pipeline = PrefetchPipeline(
+            self._tts_loop, self._generate_chunk_audio, units,
+            int(progressive is not None), _current_params, depth=prefetch_depth,
+            on_synthesized=lambda idx, seconds, size: units.record(idx, seconds, size / MP3_BYTES_PER_SECOND)
+        )
+        units.buffer_seconds = pipeline.buffered_seconds
+        units.next_to_play = pipeline.next_to_take
+        player = self._player
+        player.stop()
+        continue_full = False
+        playing = None  # 正在播放的单元序号
+        failures = 0    # 连续合成失败的单元数
+
+        def _chunk_started(unit):
+            nonlocal playing
+            if playing is None:
+                self._report_first_audio(total)
+            else:
+                _chunk_finished(playing)
+            playing = unit
+            idx, last = units.chunk_range(unit)
+            self._current_chunk_index = idx
+
+            # 高亮当前单元覆盖的片段
+            self._highlight_chunk(idx, last)
+
+            # 更新播放状态
+            self.after(0, lambda ready=pipeline.ready_count(): self.play_status_var.set(
+                f"▶ 正在播放 {idx + 1}/{total} 片段... (已预取 {ready})"
+            ))
+            # 更新起始片段显示
+            self.after(0, lambda: self.start_chunk_var.set(idx + 1))
+
+        def _chunk_failed(unit, error):
+            # 合成客户端已重试用尽：跳过该单元，连续失败过多时停止（进度停在最后播完的片段）
+            nonlocal failures
+            failures += 1
+            idx = units.chunk_range(unit)[0]
+            if failures >= MAX_CONSECUTIVE_FAILURES:
+                self.after(0, lambda err=str(error): self.status_var.set(
+                    f"生成片段出错，已停止: {err}"
+                ))
+                return False
+            self.after(0, lambda err=str(error): self.status_var.set(
+                f"片段 {idx + 1} 生成失败，已跳过: {err}"
             ))
-            loop.run_until_complete(
-                self._generate_chunk_audio(chunks[start_index], first_path, voice, rate, volume)
-            )
+            return True
 
-            for i in range(start_index, total):
+        def _chunk_finished(unit):
+            # 播完一个单元，按其最后一个片段保存进度 (在主线程执行)
+            idx = units.chunk_range(unit)[1]
+            if file_path:
+                self.after(0, lambda: self._save_playback_position(file_path, idx, total))
+
+        try:
+            i = 0
+            while i < len(units):
                 if self._playback_stop.is_set():
                     return
 
-                self._current_chunk_index = i
-                current_path = first_path if i == start_index else next_path
-
-                # 异步预生成下一个片段
-                next_path = None
-                gen_thread = None
-                if i + 1 < total:
-                    next_path = os.path.join(self._temp_dir, f"chunk_{i + 1}.mp3")
-                    gen_done = threading.Event()
-                    gen_error = [None]
-
-                    def _gen_next(idx=i + 1, path=next_path):
-                        try:
-                            # 动态读取最新的语速和音量
-                            dyn_voice = getattr(self, '_current_voice_name', voice)
-                            dyn_rate = getattr(self, '_current_rate_str', rate)
-                            dyn_volume = getattr(self, '_current_volume_str', volume)
-                            
-                            gen_loop = asyncio.new_event_loop()
-                            gen_loop.run_until_complete(
-                                self._generate_chunk_audio(chunks[idx], path, dyn_voice, dyn_rate, dyn_volume)
-                            )
-                            gen_loop.close()
-                        except Exception as e:
-                            gen_error[0] = e
-                        finally:
-                            gen_done.set()
-
-                    gen_thread = threading.Thread(target=_gen_next, daemon=True)
-                    gen_thread.start()
-
-                # 高亮当前片段
-                self._highlight_chunk(i)
-
-                # 更新播放状态
-                self.after(0, lambda idx=i: self.play_status_var.set(
-                    f"▶ 正在播放 {idx + 1}/{total} 片段..."
-                ))
-                # 更新起始片段显示
-                self.after(0, lambda idx=i: self.start_chunk_var.set(idx + 1))
-
+                if playing is None and (progressive is not None or not pipeline.is_ready(i)):
+                    self.after(0, lambda idx=units.chunk_range(i)[0]: self.play_status_var.set(
+                        f"正在生成片段 {idx + 1}/{total}..."
+                    ))
+                if progressive is not None and i == 0:
+                    try:
+                        if not player.play_progressive(progressive, self._playback_stop,
+                                                       on_start=lambda idx=i: _chunk_started(idx)):
+                            return
+                        failures = 0
+                    except Exception as e:
+                        if not _chunk_failed(i, e):
+                            return
+                    i += 1
+                    continue
                 try:
-                    pygame.mixer.music.load(current_path)
-                    pygame.mixer.music.play()
+                    current_path = pipeline.get(i, self._playback_stop)
+                except Exception as e:
+                    if not _chunk_failed(i, e):
+                        return
+                    i += 1
+                    continue
+                if current_path is None:
+                    return
+                failures = 0
 
-                    while pygame.mixer.music.get_busy() or getattr(self, '_is_paused', False):
-                        if self._playback_stop.is_set():
-                            pygame.mixer.music.stop()
-                            return
-                        pygame.time.wait(100)
+                try:
+                    # 解码在上一片段播放期间完成，排队后等上一片段播完
+                    sound = player.decode(current_path)
+                    if player.enqueue(sound) and not player.wait_current(self._playback_stop):
+                        return
                 except Exception as e:
                     self.after(0, lambda err=str(e): self.status_var.set(f"播放出错: {err}"))
                     return
+                _chunk_started(i)
+                i += 1
 
-                # 播完一个 chunk，保存进度 (在主线程执行)
-                if file_path:
-                    self.after(0, lambda fp=file_path, idx=i, tot=total: self._save_playback_position(fp, idx, tot))
+            if playing is not None:
+                if not player.wait_current(self._playback_stop):
+                    return
+                _chunk_finished(playing)
 
-                # 删除已播放的临时文件
-                try:
-                    pygame.mixer.music.unload()
-                    os.remove(current_path)
-                except Exception:
-                    pass
-
-                # 等待下一个片段生成完成
-                if gen_thread:
-                    gen_done.wait()
-                    if gen_error[0]:
-                        self.after(0, lambda err=str(gen_error[0]): self.status_var.set(
-                            f"生成片段出错: {err}"
-                        ))
-                        return
+            if self._provisional is not None:
+                # 临时分节播完，切换到全书后继续（在 finally 恢复界面之后执行）
+                continue_full = True
+                return
 
             # 播放完毕
-            self.after(0, lambda: self.status_var.set("播放完毕"))
+            self.after(0, lambda: self.status_var.set(f"播放完毕 ({self._audio_cache_summary()})"))
             self.after(0, self._clear_highlight)
             # 播完全部，重置起始位置为 1
             if file_path:
@@ -1225,32 +1979,42 @@ class Application(tk.Tk):
         except Exception as e:
             self.after(0, lambda err=str(e): self.status_var.set(f"流式播放出错: {err}"))
         finally:
-            loop.close()
-            self._cleanup_temp_dir()
+            if progressive is not None:
+                progressive.cancel()
+            pipeline.close()
             self._is_playing = False
             self.after(0, self._reset_play_ui)
             if file_path:
                 self.after(0, lambda: self._update_history_hint(file_path))
+            if continue_full:
+                self.after(0, self._continue_after_provisional)
+            else:
+                self.after(0, self._apply_pending_full_book)
 
-    async def _generate_chunk_audio(self, text, output_path, voice, rate, volume):
-        communicate = edge_tts.Communicate(text, voice, rate=rate, volume=volume)
-        await communicate.save(output_path)
+    def _report_first_audio(self, total):
+        """记录并在状态栏显示从按下播放到开始发声的耗时 (time-to-first-audio)"""
+        self.last_ttfa_ms = (time.perf_counter() - self._play_requested_at) * 1000
+        self.after(0, lambda ms=self.last_ttfa_ms: self.status_var.set(
+            f"流式播放中 — 共 {total} 个片段 · 首音 {ms:.0f} ms"
+        ))
 
-    def _cleanup_temp_dir(self):
-        if self._temp_dir and os.path.isdir(self._temp_dir):
-            try:
-                shutil.rmtree(self._temp_dir, ignore_errors=True)
-            except Exception:
-                pass
-            self._temp_dir = None
+    async def _generate_chunk_audio(self, text, voice, rate, volume):
+        """返回该片段音频在缓存中的路径，未命中时调用 edge-tts 合成。
+
+        开启内存播放池时，新合成的音频直接留在内存中（PooledAudio），不写磁盘。
+        """
+        if self._audio_pool_enabled:
+            return await synthesize_pooled(self.audio_cache, self.audio_pool, text, voice, rate, volume)
+        return await synthesize_cached(self.audio_cache, text, voice, rate, volume)
 
     # ====================== 转换逻辑 ======================
 
     def convert_to_mp3(self):
-        text = self.text_preview.get(1.0, tk.END).strip()
+        text = self.preview.get_text().strip()
         if not text:
             messagebox.showwarning("警告", "没有可转换的文本内容!")
             return
+        self._flush_autosave()
 
         def convert_thread():
             try:
@@ -1264,16 +2028,29 @@ class Application(tk.Tk):
                 rate = self.get_rate_string()
                 volume = self.get_volume_string()
 
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_name = f"TTS_{timestamp}.mp3"
+                concurrency = self.export_concurrency_var.get()
+
                 output_dir = self.output_dir.get() or os.path.dirname(self.file_path.get()) or str(pathlib.Path.home())
-                output_path = pathlib.Path(output_dir) / output_name
+                # 等编辑内容写盘后按编辑后的文本导出；优先使用解析缓存，未命中时才解析
+                self.autosaver.flush(10)
+                _, _, chunks, _, _ = load_book(resolve_source(self.file_path.get()), self.chunk_size_var.get())
+
+                # 同一文本和语音参数有未完成的导出时，从断点继续
+                resume_path = find_resumable_export(output_dir, export_job_id(chunks, voice, rate, volume))
+                if resume_path:
+                    output_path = pathlib.Path(resume_path)
+                    self.status_var.set(f"发现未完成的导出，继续写入: {output_path.name}")
+                else:
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    output_path = pathlib.Path(output_dir) / f"TTS_{timestamp}.mp3"
 
-                loop = asyncio.new_event_loop()
-                text_to_convert, _ = read_book_file(self.file_path.get())
-                communicate = edge_tts.Communicate(text_to_convert, voice, rate=rate, volume=volume)
-                loop.run_until_complete(communicate.save(str(output_path)))
-                loop.close()
+                def _progress(done, total, audio_bytes):
+                    self.status_var.set(f"正在转换... {done}/{total} 片段")
+
+                self._tts_loop.run(export_chunks(
+                    self.audio_cache, chunks, str(output_path), voice, rate, volume, _progress,
+                    concurrency=concurrency
+                ))
 
                 self.progress.stop()
                 self.progress.pack_forget()
@@ -1306,38 +2083,40 @@ class Application(tk.Tk):
                 self.status_var.set("正在批量转换...")
                 self.update()
 
-                success_count = 0
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                voice = self.get_selected_voice()
-                rate = self.get_rate_string()
-                volume = self.get_volume_string()
-
-                loop = asyncio.new_event_loop()
-
+                jobs = []
                 for i, file_path in enumerate(files, 1):
                     if not file_path:
                         continue
-                    try:
-                        text, _ = read_book_file(file_path)
-                        text = text.strip()
-                        if not text:
-                            continue
-
-                        output_name = f"TTS_batch_{timestamp}_{i}.mp3"
-                        output_dir = self.output_dir.get() or os.path.dirname(file_path) or str(pathlib.Path.home())
-                        output_path = pathlib.Path(output_dir) / output_name
-
-                        communicate = edge_tts.Communicate(text, voice, rate=rate, volume=volume)
-                        loop.run_until_complete(communicate.save(str(output_path)))
+                    output_name = f"TTS_batch_{timestamp}_{i}.mp3"
+                    output_dir = self.output_dir.get() or os.path.dirname(file_path) or str(pathlib.Path.home())
+                    jobs.append((file_path, str(pathlib.Path(output_dir) / output_name)))
 
-                        success_count += 1
-                        self.status_var.set(f"正在批量转换... 已完成 {i}/{len(files)}")
-                        self.update()
-                    except Exception as e:
-                        self.status_var.set(f"转换 {os.path.basename(file_path)} 失败: {str(e)}")
-                        continue
+                last_update = [0.0]
 
-                loop.close()
+                def _on_progress(status, batch):
+                    # 进度回调在合成线程中触发，限频后交给主线程刷新
+                    now = time.monotonic()
+                    if status.state == 'synthesizing' and now - last_update[0] < 0.2:
+                        return
+                    last_update[0] = now
+                    if status.state == 'failed':
+                        msg = f"转换 {status.name} 失败: {status.error}"
+                    else:
+                        msg = (f"正在批量转换... 已完成 {batch.completed}/{len(jobs)} · "
+                               f"{status.name} {status.chunks_done}/{status.chunks_total} 片段 · "
+                               f"{batch.chars_per_second:.0f} 字/秒 · {batch.realtime_factor:.1f}x 实时")
+                    self.after(0, lambda m=msg: self.status_var.set(m))
+
+                converter = BatchConverter(
+                    self.audio_cache, read_book_file, split_text_to_chunks,
+                    self.get_selected_voice(), self.get_rate_string(), self.get_volume_string(),
+                    max_length=self.chunk_size_var.get(),
+                    concurrency=self.export_concurrency_var.get(),
+                    on_progress=_on_progress
+                )
+                self._tts_loop.run(converter.run(jobs))
+                success_count = converter.succeeded
 
                 self.progress.stop()
                 self.progress.pack_forget()
@@ -1381,7 +2160,7 @@ class Application(tk.Tk):
    - 在右侧预览区域可以查看和编辑内容（自动保存）
 
 2. 流式播放:
-   - 点击 ▶ 播放，文本自动断句并连续播放
+   - 点击 ▶ 播放，文本自动断句并连续播放（后台并发预取后续片段）
    - 播放时当前片段文字高亮显示
    - 点击 ■ 停止即可中断，自动保存播放位置
 
@@ -1395,10 +2174,11 @@ class Application(tk.Tk):
 4. 语音设置:
    - 语音: 从下拉框选择中文语音
    - 语速/音量: 滑块中间为正常值
+   - 音频缓存上限: 已合成的片段会缓存到本地，重听无需联网
 
 5. MP3导出:
-   - "转换为MP3"导出完整音频
-   - "批量转换"一次处理多个文件
+   - "转换为MP3"导出完整音频（分片并发合成，中断后再次转换会从断点继续）
+   - "批量转换"一次处理多个文件（多进程解析、多文件并发合成）
 
 6. 注意事项:
    - 需要网络连接（Microsoft Edge 在线 TTS）
@@ -1407,5 +2187,7 @@ class Application(tk.Tk):
 
 
 if __name__ == "__main__":
+    # 批量转换的解析进程池在打包后的可执行文件中需要此调用
+    multiprocessing.freeze_support()
     app = Application()
     app.mainloop()
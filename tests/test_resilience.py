@@ -0,0 +1,115 @@
+"""用本地模拟服务（fake_tts）验证 SynthesisClient 的重试、对冲与自适应并发"""
+import asyncio
+
+import pytest
+
+from edgetts_player import resilience, synth
+from edgetts_player.fake_tts import FakeTTSServer
+from edgetts_player.resilience import AdaptiveLimiter, SynthesisClient
+
+VOICE = 'zh-CN-XiaoxiaoNeural'
+RATE = '+0%'
+VOLUME = '+0%'
+# 足够长，保证音频分多条消息发送（stall / corrupt 才会在中途生效）
+TEXTS = [f"第{i}段用于验证容错的测试文本，内容随意。" for i in range(8)]
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def use_server(monkeypatch):
+    """把合成地址指向模拟服务"""
+    def use(server):
+        monkeypatch.setattr(synth, 'SYNTH_WSS_URL', server.url)
+    return use
+
+
+def test_synthesize_retries_until_complete(use_server):
+    """注入各类故障时，重试后仍返回完整音频"""
+    async def scenario():
+        async with FakeTTSServer(fail_rate=0.5, seed=1) as server:
+            use_server(server)
+            client = SynthesisClient(read_timeout=0.5, retries=10, base_delay=0.01, max_delay=0.05)
+            for text in TEXTS:
+                data = await client.synthesize(text, VOICE, RATE, VOLUME)
+                assert data == server.audio_for(text)
+            return client, server
+
+    client, server = _run(scenario())
+    assert sum(server.injected.values()) > 0
+    assert client.counters['retries'] > 0
+    assert client.counters['failures'] == client.counters['retries']
+
+
+def test_stream_retries_before_first_chunk(use_server):
+    """首块之前的失败（限流、断开）由 stream 自行重试，拼起来的音频完整"""
+    async def scenario():
+        async with FakeTTSServer(fail_rate=0.5, faults=('reject', 'drop'), seed=2) as server:
+            use_server(server)
+            client = SynthesisClient(retries=10, base_delay=0.01, max_delay=0.05)
+            for text in TEXTS:
+                chunks = [data async for data in client.stream(text, VOICE, RATE, VOLUME)]
+                assert len(chunks) > 1
+                assert b''.join(chunks) == server.audio_for(text)
+            return client, server
+
+    client, server = _run(scenario())
+    assert server.injected['reject'] + server.injected['drop'] > 0
+    assert client.counters['retries'] > 0
+    assert client.counters['throttled'] == server.injected['reject']
+
+
+def test_slow_request_is_hedged(use_server, monkeypatch):
+    """积累足够耗时样本后，明显变慢的请求会发起对冲，结果仍完整"""
+    monkeypatch.setattr(resilience, 'HEDGE_MIN_DELAY', 0.05)
+
+    async def scenario():
+        async with FakeTTSServer(seconds_per_char=0.01) as server:
+            use_server(server)
+            client = SynthesisClient(base_delay=0.01)
+            for i in range(resilience.HEDGE_MIN_SAMPLES):
+                await client.synthesize(TEXTS[i % len(TEXTS)], VOICE, RATE, VOLUME)
+            assert client.counters['hedges'] == 0
+            assert client.hedge_delay(TEXTS[0]) is not None
+
+            server.latency = 0.5
+            data = await client.synthesize(TEXTS[0], VOICE, RATE, VOLUME)
+            assert data == server.audio_for(TEXTS[0])
+            return client
+
+    client = _run(scenario())
+    assert client.counters['hedges'] == 1
+
+
+def test_failure_halves_concurrency_once_per_cooldown(use_server):
+    """限流时并发上限减半，同一波失败只减一次"""
+    async def scenario():
+        async with FakeTTSServer(fail_rate=1.0, faults=('reject',)) as server:
+            use_server(server)
+            client = SynthesisClient(retries=2, base_delay=0.01, max_delay=0.02,
+                                     limiter=AdaptiveLimiter(initial=8))
+            with pytest.raises(Exception) as info:
+                await client.synthesize(TEXTS[0], VOICE, RATE, VOLUME)
+            assert resilience.is_throttled(info.value)
+            return client
+
+    client = _run(scenario())
+    assert client.counters['failures'] == 3
+    assert client.limiter.limit == 4
+
+
+def test_limiter_aimd():
+    """乘性减、冷却期后再减、连续成功后加性增"""
+    limiter = AdaptiveLimiter(initial=8)
+    limiter.on_failure()
+    assert limiter.limit == 4
+    limiter.on_failure()
+    assert limiter.limit == 4
+    limiter._last_decrease -= resilience.DECREASE_COOLDOWN
+    limiter.on_failure()
+    assert limiter.limit == 2
+    for _ in range(2):
+        limiter.on_success()
+    assert limiter.limit == 3